@@ -22,6 +22,7 @@ from .risk import RiskManager
 from .execution import ExecContext, ExecutionManager
 from .router import StrategyRouter
 from .compliance import assert_whitelisted
+from .tickrec import TickReplay
 
 
 @dataclass
@@ -30,9 +31,9 @@ class BacktestResult:
     run_id: str
 
 
-def _annualization_factor(tf_seconds: int) -> float:
+def _annualization_factor(tf_seconds: float) -> float:
     # Approximate trading seconds per year
-    return math.sqrt((365 * 24 * 3600) / max(1, tf_seconds))
+    return math.sqrt((365 * 24 * 3600) / max(1e-3, tf_seconds))
 
 
 def run(
@@ -49,6 +50,8 @@ def run(
     out_dir: Optional[Path] = None,
     fast_mode: bool = False,
     early_target_trades_per_day: Optional[int] = None,
+    ticks_dir: Optional[Path] = None,
+    replay_speed: float = 0.0,
 ) -> BacktestResult:
     settings = load_settings()
     random.seed(seed)
@@ -120,6 +123,9 @@ def run(
     total_steps = 0
     start_equity = portfolio.equity()
     peak_equity = start_equity
+    # Tick replays have no fixed step: annualize by the observed spacing
+    first_ts: Optional[float] = None
+    last_ts: Optional[float] = None
 
     async def write_trade(event: Dict[str, Any]) -> None:
         if trades_fp is not None:
@@ -134,16 +140,32 @@ def run(
             trades, \
             exposure_steps, \
             total_steps, \
-            peak_equity
-        async for sym, bar in data_loader.multi_symbol_stream(
-            symbols, timeframe, start_ms, end_ms
-        ):
+            peak_equity, \
+            first_ts, \
+            last_ts
+        if ticks_dir is not None:
+            # Recorded live ticks instead of bars (see app.tickrec)
+            replay = TickReplay(ticks_dir, symbols, start_ms, end_ms)
+            source = (
+                (l1["symbol"], l1)
+                async for l1 in replay.stream(replay_speed)
+                # Quote-only ticks carry no trade price to mark equity at
+                if l1.get("last") is not None
+            )
+        else:
+            source = data_loader.multi_symbol_stream(
+                symbols, timeframe, start_ms, end_ms
+            )
+        async for sym, bar in source:
             # augment bar to l1 with symbol
             l1 = {**bar, "symbol": sym}
             # monitor exits and entries via router
             await router.on_tick(l1)
             # compute equity/metrics
             total_steps += 1
+            if first_ts is None:
+                first_ts = float(l1["ts"])
+            last_ts = float(l1["ts"])
             last_marks = {s: l1["last"] for s in symbols}
             eq = portfolio.equity(last_marks)
             eq_curve.append(eq)
@@ -208,7 +230,15 @@ def run(
         cur = eq_curve[i]
         if prev > 0:
             rets.append((cur / prev - 1.0))
-    ann = _annualization_factor(tf_sec)
+    step_sec = float(tf_sec)
+    if (
+        ticks_dir is not None
+        and first_ts is not None
+        and last_ts is not None
+        and last_ts > first_ts
+    ):
+        step_sec = (last_ts - first_ts) / max(1, total_steps - 1)
+    ann = _annualization_factor(step_sec)
     mean = (sum(rets) / len(rets)) if rets else 0.0
     std = (
         (sum((r - mean) ** 2 for r in rets) / max(1, len(rets))).__pow__(0.5)
@@ -268,6 +298,12 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument("--fees-taker-bps", type=int, default=5)
     p.add_argument("--slippage-bps", type=int, default=2)
     p.add_argument("--seed", type=int, default=42)
+    p.add_argument(
+        "--ticks", type=str, default="", help="Replay a tick recording directory"
+    )
+    p.add_argument(
+        "--replay-speed", type=float, default=0.0, help="x real time; 0 = max speed"
+    )
     return p.parse_args()
 
 
@@ -291,6 +327,8 @@ def main(argv: Optional[List[str]] = None) -> int:
         ns.fees_taker_bps,
         ns.slippage_bps,
         ns.seed,
+        ticks_dir=Path(ns.ticks) if ns.ticks else None,
+        replay_speed=ns.replay_speed,
     )
     return 0
 
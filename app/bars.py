@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from loguru import logger
+
+from .data_loader import DataLoader, timeframe_to_seconds
+
+
+@dataclass(slots=True)
+class Bar:
+    """One OHLCV bar; `start_ms` is the open time, as in the OHLCV cache.
+
+    `partial` marks a bar that started mid-period (the first one built
+    after startup), so its open and volume miss the period's early ticks.
+    """
+
+    symbol: str
+    timeframe: str
+    start_ms: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+    ticks: int = 1
+    partial: bool = False
+
+    def as_row(self) -> List[Any]:
+        return [self.start_ms, self.open, self.high, self.low, self.close, self.volume]
+
+
+class BarBuilder:
+    """Incremental multi-timeframe OHLCV bars per symbol from live L1 ticks.
+
+    Each tick updates the open bar of every timeframe in O(1); the first
+    tick of a new period closes the previous bar and fires `on_close`.
+    Periods without ticks produce no bar. Volume is the increase of the
+    feed's rolling (24h) volume between ticks; `volume_mode="sum"` adds
+    per-tick volumes instead. Conflated ticks contribute their ``high`` and
+    ``low``. Late ticks are folded into the current bar rather than
+    reopening a closed one.
+
+    With a `loader`, closed bars other than partial ones are buffered and appended to its OHLCV
+    cache at most every `flush_s` seconds (and on `flush`), so backtests
+    read the bars observed live instead of downloading them again;
+    `DataLoader.load_ohlcv` still fetches whatever range the cache lacks.
+    """
+
+    def __init__(
+        self,
+        timeframes: Iterable[str] = ("1s", "1m", "5m"),
+        on_close: Optional[Callable[[Bar], None]] = None,
+        loader: Optional[DataLoader] = None,
+        volume_mode: str = "delta",
+        flush_s: float = 10.0,
+    ) -> None:
+        self.timeframes: List[Tuple[str, int]] = [
+            (tf, timeframe_to_seconds(tf) * 1000) for tf in timeframes
+        ]
+        self._listeners: List[Callable[[Bar], None]] = []
+        if on_close is not None:
+            self._listeners.append(on_close)
+        self.loader = loader
+        self.volume_mode = volume_mode
+        self.flush_s = max(0.0, float(flush_s))
+        # symbol -> open bar per timeframe (same order as `timeframes`)
+        self._open: Dict[str, List[Optional[Bar]]] = {}
+        self._last_vol: Dict[str, float] = {}
+        self._seen: Set[Tuple[str, str]] = set()
+        self._pending: Dict[Tuple[str, str], List[List[Any]]] = {}
+        self._last_flush = time.monotonic()
+        self.closed = 0
+
+    def add_listener(self, fn: Callable[[Bar], None]) -> None:
+        self._listeners.append(fn)
+
+    def _tick_volume(self, sym: str, l1: Dict[str, Any]) -> float:
+        vol = l1.get("volume")
+        if vol is None:
+            return 0.0
+        v = float(vol)
+        if self.volume_mode == "sum":
+            return v
+        prev = self._last_vol.get(sym)
+        self._last_vol[sym] = v
+        # The rolling window also drops old trades: never count a decrease
+        return v - prev if prev is not None and v > prev else 0.0
+
+    def on_tick(self, l1: Dict[str, Any]) -> List[Bar]:
+        """Fold one tick in; returns the bars it closed (oldest timeframe first)."""
+        last = l1.get("last") or l1.get("bid") or l1.get("ask")
+        if last is None:
+            return []
+        sym = str(l1["symbol"])
+        px = float(last)
+        hi = float(l1.get("high", px) or px)
+        lo = float(l1.get("low", px) or px)
+        ts_ms = int(float(l1.get("ts", 0.0) or 0.0) * 1000)
+        vol = self._tick_volume(sym, l1)
+        bars = self._open.get(sym)
+        if bars is None:
+            bars = self._open[sym] = [None] * len(self.timeframes)
+        closed: List[Bar] = []
+        for i, (tf, span) in enumerate(self.timeframes):
+            start = ts_ms - ts_ms % span
+            bar = bars[i]
+            if bar is not None and start > bar.start_ms:
+                closed.append(bar)
+                bar = None
+            if bar is None:
+                # The first bar per timeframe may have missed the period's start
+                first = (sym, tf) not in self._seen
+                self._seen.add((sym, tf))
+                bars[i] = Bar(sym, tf, start, px, hi, lo, px, vol, partial=first)
+                continue
+            if hi > bar.high:
+                bar.high = hi
+            if lo < bar.low:
+                bar.low = lo
+            bar.close = px
+            bar.volume += vol
+            bar.ticks += 1
+        for bar in closed:
+            self._emit(bar)
+        return closed
+
+    def _emit(self, bar: Bar) -> None:
+        self.closed += 1
+        # Partial bars are not cached: a download can supply the full period.
+        # Listeners still get them; the router's ATR takes one short range.
+        if self.loader is not None and not bar.partial:
+            self._pending.setdefault((bar.symbol, bar.timeframe), []).append(
+                bar.as_row()
+            )
+            if time.monotonic() - self._last_flush >= self.flush_s:
+                self.flush()
+        for fn in self._listeners:
+            try:
+                fn(bar)
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Bar listener failed for {bar.symbol}: {e}")
+
+    def open_bar(self, symbol: str, timeframe: str) -> Optional[Bar]:
+        bars = self._open.get(symbol)
+        for i, (tf, _span) in enumerate(self.timeframes):
+            if tf == timeframe and bars is not None:
+                return bars[i]
+        return None
+
+    def flush(self) -> int:
+        """Append buffered closed bars to the OHLCV cache; returns rows written."""
+        self._last_flush = time.monotonic()
+        if self.loader is None or not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        written = 0
+        for (sym, tf), rows in pending.items():
+            try:
+                written += self.loader.append_bars(sym, tf, rows)
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"OHLCV cache append failed for {sym} {tf}: {e}")
+        return written
+
+    async def tap(
+        self, ticks: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Pass a tick stream through unchanged, building bars on the way."""
+        try:
+            async for l1 in ticks:
+                self.on_tick(l1)
+                yield l1
+        finally:
+            self.flush()
+
+
+__all__ = ["Bar", "BarBuilder"]
@@ -54,6 +54,30 @@ class Settings(BaseSettings):
     # Execution filters
     max_spread_bps: int = 0  # 0 disables; otherwise skip entries if spread>bps
     entry_cooldown_s: int = 0  # cooldown after SL before re-entry
+    # Live tick processing: 0 = serial on the feed loop, N = N sharded workers
+    tick_shards: int = 0
+    tick_queue_max: int = 1000
+    # Keep only the newest tick per symbol while the router is behind
+    tick_conflate: bool = True
+    # Market data: ws (ccxt.pro push) or REST polling: auto | bulk | concurrent
+    # WS mode reconnects after feed_stale_s without a message
+    feed_mode: str = "auto"
+    feed_concurrency: int = 8
+    feed_min_cycle_s: float = 1.0
+    feed_stale_s: float = 30.0
+    # Live bars built from ticks (comma-separated timeframes); the router's
+    # ATR uses bar_atr_timeframe; closed bars are appended to the OHLCV cache
+    bar_timeframes: str = "1s,1m,5m"
+    bar_atr_timeframe: str = "1m"
+    bar_cache: bool = True
+    # Record every live tick under this directory (empty disables)
+    tick_record_dir: str = ""
+    # Mark the portfolio into the API's equity store every N seconds (0 disables)
+    equity_mark_s: float = 60.0
+    # Explainability ledger: background group commit + fsync policy
+    ledger_group_commit: bool = True
+    ledger_fsync_every: int = 100
+    ledger_fsync_ms: int = 200
     # Sentiment gating/size (engine side)
     sentiment_enabled: bool = False
     sentiment_long_min: float = 0.0
@@ -116,6 +140,12 @@ def load_settings() -> Settings:
         ),
         max_spread_bps=int(os.getenv("MAX_SPREAD_BPS", "0")),
         entry_cooldown_s=int(os.getenv("ENTRY_COOLDOWN_S", "0")),
+        tick_shards=int(os.getenv("TICK_SHARDS", "0")),
+        tick_queue_max=int(os.getenv("TICK_QUEUE_MAX", "1000")),
+        tick_conflate=os.getenv("TICK_CONFLATE", "true").lower() == "true",
+        ledger_group_commit=os.getenv("LEDGER_GROUP_COMMIT", "true").lower() == "true",
+        ledger_fsync_every=int(os.getenv("LEDGER_FSYNC_EVERY", "100")),
+        ledger_fsync_ms=int(os.getenv("LEDGER_FSYNC_MS", "200")),
         sentiment_enabled=os.getenv("SENTIMENT_ENABLED", "false").lower() == "true",
         sentiment_long_min=float(os.getenv("SENTIMENT_LONG_MIN", "0.0")),
         sentiment_size_min=float(os.getenv("SENTIMENT_SIZE_MIN", "0.8")),
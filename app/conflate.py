@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from .metrics import METRICS
+
+
+class TickConflator:
+    """Latest-value buffer between the market-data feed and the router.
+
+    While the consumer is busy, further ticks for a symbol overwrite its pending
+    tick instead of queueing behind it, so the router always trades on the
+    newest quote. Skipped prices are folded into ``high``/``low`` and, with
+    ``sum_volume``, per-tick ``volume`` is accumulated so ATR and flash-crash
+    logic still see the extremes. Merged ticks carry ``conflated`` = number of
+    ticks folded in. With ``enabled=False`` every tick is delivered in order
+    (exact replay); `pump` then holds the source back once `maxsize` ticks
+    are queued, so a slow consumer cannot grow the buffer without bound.
+    If the source fails, `get` raises its error once the buffer is drained.
+    """
+
+    def __init__(
+        self, enabled: bool = True, sum_volume: bool = False, maxsize: int = 10_000
+    ) -> None:
+        self.enabled = enabled
+        self.maxsize = max(1, int(maxsize))
+        # Feeds such as ccxt tickers report rolling 24h volume: newest wins.
+        self.sum_volume = sum_volume
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._fifo: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.received: int = 0
+        self.conflated: Dict[str, int] = defaultdict(int)
+
+    def put(self, l1: Dict[str, Any]) -> None:
+        self.received += 1
+        if not self.enabled:
+            self._fifo.append(l1)
+        else:
+            sym = str(l1.get("symbol", ""))
+            prev = self._pending.get(sym)
+            if prev is None:
+                self._pending[sym] = l1
+            else:
+                # Re-assigning an existing key keeps the symbol's turn in line
+                self._pending[sym] = self._merge(prev, l1)
+                self.conflated[sym] += 1
+                METRICS.ticks_conflated += 1
+        self._ready.set()
+
+    def _merge(self, prev: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        out = dict(new)
+        highs = [
+            v
+            for v in (
+                prev.get("high", prev.get("last")),
+                new.get("high", new.get("last")),
+            )
+            if v is not None
+        ]
+        lows = [
+            v
+            for v in (
+                prev.get("low", prev.get("last")),
+                new.get("low", new.get("last")),
+            )
+            if v is not None
+        ]
+        if highs:
+            out["high"] = max(float(v) for v in highs)
+        if lows:
+            out["low"] = min(float(v) for v in lows)
+        if self.sum_volume:
+            pv, nv = prev.get("volume"), new.get("volume")
+            if pv is not None or nv is not None:
+                out["volume"] = float(pv or 0.0) + float(nv or 0.0)
+        out["conflated"] = int(prev.get("conflated", 0) or 0) + 1
+        return out
+
+    def pending(self) -> int:
+        return len(self._pending) + len(self._fifo)
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next tick, oldest symbol first; None once closed and drained."""
+        while True:
+            if self._fifo:
+                self._space.set()
+                return self._fifo.popleft()
+            if self._pending:
+                sym = next(iter(self._pending))
+                return self._pending.pop(sym)
+            if self._closed:
+                if self._error is not None:
+                    # The source died: fail the consumer instead of ending quietly
+                    err, self._error = self._error, None
+                    raise err
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+    async def pump(self, source: AsyncIterator[Dict[str, Any]]) -> None:
+        try:
+            async for l1 in source:
+                while not self.enabled and len(self._fifo) >= self.maxsize:
+                    self._space.clear()
+                    await self._space.wait()
+                self.put(l1)
+                # Give the consumer a turn even if the source never blocks
+                await asyncio.sleep(0)
+        except Exception as e:
+            self._error = e
+            raise
+        finally:
+            self.close()
+
+    def __aiter__(self) -> "TickConflator":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        l1 = await self.get()
+        if l1 is None:
+            raise StopAsyncIteration
+        return l1
+
+
+__all__ = ["TickConflator"]
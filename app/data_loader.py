@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
 import ccxt.async_support as ccxt
+from loguru import logger
 
 # Timeframe helpers
 TF_MAP_SEC: Dict[str, int] = {
@@ -41,10 +44,15 @@ class LoaderConfig:
     exchange: str = "bitget"
 
 
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
 class DataLoader:
     def __init__(self, cfg: LoaderConfig) -> None:
         self.cfg = cfg
         _ensure_dir(self.cfg.data_dir)
+        # Newest cached bar per file, to append without re-reading the CSV
+        self._cache_tail: Dict[Path, int] = {}
 
     def _symbol_path(self, symbol: str, timeframe: str) -> Path:
         sym = symbol.replace("/", "-")
@@ -52,6 +60,34 @@ class DataLoader:
         _ensure_dir(root)
         return root / f"{sym}_{timeframe}.csv"
 
+    @staticmethod
+    def _last_cached_ts(path: Path) -> int:
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, 2)
+                f.seek(max(0, f.tell() - 4096))
+                lines = f.read().splitlines()
+            return int(float(lines[-1].split(b",")[0])) if lines else -1
+        except (OSError, ValueError):
+            return -1
+
+    def append_bars(self, symbol: str, timeframe: str, rows: List[List[Any]]) -> int:
+        """Append OHLCV rows to the cache file; rows not newer than it are skipped."""
+        path = self._symbol_path(symbol, timeframe)
+        last = self._cache_tail.get(path)
+        if last is None:
+            last = self._last_cached_ts(path)
+        fresh = [r for r in rows if int(r[0]) > last]
+        if not fresh:
+            return 0
+        new_file = not path.exists() or path.stat().st_size == 0
+        with open(path, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write(",".join(OHLCV_COLUMNS) + "\n")
+            f.write("".join(",".join(str(v) for v in r) + "\n" for r in fresh))
+        self._cache_tail[path] = max(int(r[0]) for r in fresh)
+        return len(fresh)
+
     async def fetch_ohlcv_ccxt(
         self, symbol: str, timeframe: str, start_ms: int, end_ms: int
     ) -> pd.DataFrame:
@@ -81,6 +117,73 @@ class DataLoader:
         df = df[(df["timestamp"] >= start_ms) & (df["timestamp"] <= end_ms)]
         return df
 
+    async def _load_range(
+        self, symbol: str, timeframe: str, start_ms: int, end_ms: int
+    ) -> Tuple[pd.DataFrame, bool]:
+        """Bars for the range, and whether they are real (safe to cache).
+
+        Synthetic bars stand in for a failed download or a sub-minute
+        timeframe; they are returned for the run but never cached, so the
+        next load fetches the range again.
+        """
+        # If sub-minute timeframe, try synthesize from 1m cache
+        if timeframe.endswith("s"):
+            base_path = self._symbol_path(symbol, "1m")
+            if base_path.exists():
+                df1m = pd.read_csv(base_path)
+                return self._synthesize_subminute(df1m, timeframe), False
+            # Fallback: synthesize sub-minute directly
+            return self._synthesize_direct(symbol, timeframe, start_ms, end_ms), False
+        try:
+            return await self.fetch_ohlcv_ccxt(
+                symbol, timeframe, start_ms, end_ms
+            ), True
+        except Exception as e:  # noqa: BLE001
+            logger.warning(
+                f"OHLCV fetch failed for {symbol} {timeframe} "
+                f"[{start_ms}, {end_ms}]: {e}; using synthetic bars"
+            )
+            return self._synthesize_direct(symbol, timeframe, start_ms, end_ms), False
+
+    @staticmethod
+    def _missing_ranges(
+        df: pd.DataFrame, timeframe: str, start_ms: int, end_ms: int
+    ) -> List[Tuple[int, int]]:
+        """Bar-open ranges in [start_ms, end_ms] the cached frame does not cover.
+
+        Holes inside the cache count too (e.g. live bars appended after an
+        older download), except for sub-minute timeframes, whose live bars
+        legitimately skip periods without ticks. Ranges closer than 1000
+        bars are merged so a ragged cache costs few requests.
+        """
+        step = timeframe_to_seconds(timeframe) * 1000
+        if df.empty:
+            return [(start_ms, end_ms)]
+        ts = np.unique(df["timestamp"].to_numpy(dtype="int64"))
+        ranges: List[Tuple[int, int]] = []
+        if ts[0] - step >= start_ms:
+            ranges.append((start_ms, min(end_ms, int(ts[0]) - step)))
+        if not timeframe.endswith("s"):
+            inner = ts[(ts >= start_ms - step) & (ts <= end_ms)]
+            for i in np.nonzero(np.diff(inner) > step)[0]:
+                ranges.append((int(inner[i]) + step, int(inner[i + 1]) - step))
+        if ts[-1] + step <= end_ms:
+            ranges.append((max(start_ms, int(ts[-1]) + step), end_ms))
+        merged: List[Tuple[int, int]] = []
+        for a, b in sorted(ranges):
+            if merged and a - merged[-1][1] < 1000 * step:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+            else:
+                merged.append((a, b))
+        return merged
+
+    @staticmethod
+    def _write_cache(path: Path, df: pd.DataFrame) -> None:
+        # Replace atomically: the live trader may be appending bars
+        tmp = path.with_suffix(".csv.tmp")
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+
     async def load_ohlcv(
         self,
         symbol: str,
@@ -92,24 +195,27 @@ class DataLoader:
         path = self._symbol_path(symbol, timeframe)
         if use_cache and path.exists():
             df = pd.read_csv(path)
-        else:
-            # If sub-minute timeframe, try synthesize from 1m cache
-            if timeframe.endswith("s"):
-                base_path = self._symbol_path(symbol, "1m")
-                if base_path.exists():
-                    df1m = pd.read_csv(base_path)
-                    df = self._synthesize_subminute(df1m, timeframe)
-                else:
-                    # Fallback: synthesize sub-minute directly
-                    df = self._synthesize_direct(symbol, timeframe, start_ms, end_ms)
-            else:
-                try:
-                    df = await self.fetch_ohlcv_ccxt(
-                        symbol, timeframe, start_ms, end_ms
+            # The cache may hold only recent live bars: fetch what it lacks
+            missing = self._missing_ranges(df, timeframe, start_ms, end_ms)
+            parts = [df]
+            for a, b in missing:
+                part, real = await self._load_range(symbol, timeframe, a, b)
+                # Leave the range missing rather than mix fake bars into real ones
+                if real and not part.empty:
+                    parts.append(
+                        part[(part["timestamp"] >= a) & (part["timestamp"] <= b)]
                     )
-                except Exception:
-                    df = self._synthesize_direct(symbol, timeframe, start_ms, end_ms)
-            if not df.empty:
+            if len(parts) > 1:
+                df = (
+                    pd.concat([p for p in parts if not p.empty], ignore_index=True)
+                    .sort_values("timestamp", kind="stable")
+                    .drop_duplicates("timestamp")
+                )
+                self._write_cache(path, df)
+                self._cache_tail.pop(path, None)
+        else:
+            df, real = await self._load_range(symbol, timeframe, start_ms, end_ms)
+            if real and not df.empty:
                 df.to_csv(path, index=False)
         # Normalize
         if not df.empty:
@@ -155,8 +261,6 @@ class DataLoader:
         symbol: str, timeframe: str, start_ms: int, end_ms: int
     ) -> pd.DataFrame:
         # Deterministic synthetic OHLCV via seeded random walk
-        import numpy as np
-
         sec = timeframe_to_seconds(timeframe)
         if sec <= 0:
             sec = 60
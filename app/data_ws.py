@@ -2,56 +2,339 @@ from __future__ import annotations
 
 import asyncio
 import time
-from typing import Any, AsyncIterator, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+)
 
 import ccxt.async_support as ccxt
+import orjson
 from loguru import logger
 
+# One pushed message: (connection sequence number or None, ccxt-shaped tickers)
+StreamBatch = Tuple[Optional[int], List[Dict[str, Any]]]
+
+
+class StreamTransport(Protocol):
+    """Push market-data source used by `DataFeed` in ``ws`` mode."""
+
+    async def connect(self, symbols: List[str]) -> None: ...
+
+    async def recv(self) -> StreamBatch: ...
+
+    async def close(self) -> None: ...
+
+
+class CcxtProTransport:
+    """ccxt.pro subscriptions: ``watch_tickers``, else one ``watch_ticker`` per symbol.
+
+    The exchange instance (and its loaded markets) survives reconnects;
+    `close` only drops the sockets, the next watch call reopens them.
+    """
+
+    def __init__(self, exchange_id: str = "bitget") -> None:
+        self.exchange_id = exchange_id
+        self.exchange: Optional[Any] = None
+        self._symbols: List[str] = []
+        self._watches: Dict[str, asyncio.Task[Any]] = {}
+
+    async def connect(self, symbols: List[str]) -> None:
+        if self.exchange is None:
+            import ccxt.pro as ccxtpro
+
+            self.exchange = getattr(ccxtpro, self.exchange_id)()
+            await self.exchange.load_markets()
+        self._symbols = list(symbols)
+
+    async def recv(self) -> StreamBatch:
+        ex = self.exchange
+        assert ex is not None
+        if ex.has.get("watchTickers"):
+            tickers = await ex.watch_tickers(self._symbols)
+            return None, list(tickers.values())
+        for sym in self._symbols:
+            if sym not in self._watches:
+                self._watches[sym] = asyncio.ensure_future(ex.watch_ticker(sym))
+        done, _ = await asyncio.wait(
+            self._watches.values(), return_when=asyncio.FIRST_COMPLETED
+        )
+        out: List[Dict[str, Any]] = []
+        for sym, task in list(self._watches.items()):
+            if task in done:
+                del self._watches[sym]
+                out.append(task.result())
+        return None, out
+
+    async def close(self) -> None:
+        for task in self._watches.values():
+            task.cancel()
+        self._watches = {}
+        if self.exchange is not None:
+            try:
+                await self.exchange.close()
+            except Exception:
+                pass
+
+
+class WebSocketTransport:
+    """Plain JSON WebSocket source (venue adapters, local stand-in servers).
+
+    Sends ``subscribe(symbols)`` after connecting, then reads messages of
+    the form ``{"seq": n, "data": [ticker, ...]}`` (or a bare ticker).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        subscribe: Optional[Callable[[List[str]], Dict[str, Any]]] = None,
+    ) -> None:
+        self.url = url
+        self.subscribe = subscribe or (
+            lambda syms: {"op": "subscribe", "symbols": syms}
+        )
+        self._ws: Optional[Any] = None
+
+    async def connect(self, symbols: List[str]) -> None:
+        import websockets
+
+        self._ws = await websockets.connect(self.url)
+        await self._ws.send(orjson.dumps(self.subscribe(list(symbols))).decode())
+
+    async def recv(self) -> StreamBatch:
+        assert self._ws is not None
+        msg = orjson.loads(await self._ws.recv())
+        data = msg.get("data", msg) if isinstance(msg, dict) else msg
+        seq = msg.get("seq") if isinstance(msg, dict) else None
+        return seq, data if isinstance(data, list) else [data]
+
+    async def close(self) -> None:
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+
+class _Gap(Exception):
+    pass
+
 
 class DataFeed:
-    """Bitget spot L1 feed. Tries WS via ccxtpro if available; falls back to REST polling.
+    """Bitget spot L1 feed: pushed over WebSocket (``mode="ws"``) or REST-polled.
 
-    For simplicity and stability, this implementation uses REST polling at ~1s cadence
-    unless ccxtpro is available in the environment.
+    Streaming reads a `StreamTransport` (ccxt.pro by default, or any injected
+    transport) and reconnects with exponential backoff on errors. A message
+    whose ``seq`` skips ahead, or silence longer than `stale_s`, drops the
+    connection and resubscribes: L1 is state, so the fresh subscription's
+    first snapshot closes the gap. Ticks older than the last one seen for
+    their symbol are discarded. Without ccxt.pro it falls back to polling.
+
+    REST polling fetches every symbol per cycle with one ``fetch_tickers`` call
+    where the exchange supports it (``mode="auto"``/``"bulk"``), otherwise with
+    at most `concurrency` concurrent ``fetch_ticker`` calls. Ticks carry the
+    exchange timestamp (receive time when the venue sends none) and a ticker
+    whose timestamp has not moved since the last cycle is not re-emitted. The
+    cycle is the longer of `min_cycle_s` and the exchange's request budget
+    (``rateLimit`` per request), and stretches while the venue throttles us.
     """
 
-    def __init__(self, exchange_id: str = "bitget", use_testnet: bool = True) -> None:
+    def __init__(
+        self,
+        exchange_id: str = "bitget",
+        use_testnet: bool = True,
+        mode: str = "auto",
+        concurrency: int = 8,
+        min_cycle_s: float = 1.0,
+        exchange: Optional[Any] = None,
+        transport: Optional[StreamTransport] = None,
+        stale_s: float = 30.0,
+    ) -> None:
         self.exchange_id = exchange_id
         self.use_testnet = use_testnet
-        self.exchange: Optional[ccxt.Exchange] = None
+        self.mode = mode  # auto | bulk | concurrent | ws
+        self.concurrency = max(1, int(concurrency))
+        self.min_cycle_s = max(0.0, float(min_cycle_s))
+        self.exchange: Optional[ccxt.Exchange] = exchange
+        self._owns_exchange = exchange is None
         self._running = False
+        self._bulk: Optional[bool] = None
+        self._penalty = 1.0
+        self._last_ts: Dict[str, float] = {}
+        self.transport = transport
+        self.stale_s = max(0.01, float(stale_s))
+        self.connects = 0
+        self.gaps = 0
+
+    def _use_bulk(self, ex: Any) -> bool:
+        if self._bulk is None:
+            has = getattr(ex, "has", {}) or {}
+            self._bulk = self.mode == "bulk" or (
+                self.mode == "auto" and bool(has.get("fetchTickers"))
+            )
+        return self._bulk
+
+    @staticmethod
+    def _to_l1(sym: str, t: Dict[str, Any], recv_ts: float) -> Dict[str, Any]:
+        ex_ts = t.get("timestamp")
+        return {
+            "ts": float(ex_ts) / 1000.0 if ex_ts else recv_ts,
+            "symbol": sym,
+            "bid": t.get("bid"),
+            "ask": t.get("ask"),
+            "last": t.get("last"),
+            "volume": t.get("baseVolume"),
+        }
+
+    async def _fetch_bulk(self, ex: Any, symbols: List[str]) -> Dict[str, Any]:
+        return await ex.fetch_tickers(symbols)
+
+    async def _fetch_each(self, ex: Any, symbols: List[str]) -> Dict[str, Any]:
+        sem = asyncio.Semaphore(self.concurrency)
+        out: Dict[str, Any] = {}
+
+        async def one(sym: str) -> None:
+            async with sem:
+                try:
+                    out[sym] = await ex.fetch_ticker(sym)
+                except ccxt.RateLimitExceeded:
+                    raise
+                except Exception as e:  # noqa: BLE001
+                    logger.warning(f"Ticker fetch failed for {sym}: {e}")
+
+        await asyncio.gather(*(one(s) for s in symbols))
+        return out
+
+    async def poll_once(
+        self, ex: Any, symbols: List[str]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """One polling cycle: (new ticks, number of requests spent)."""
+        if self._use_bulk(ex):
+            try:
+                data, requests = await self._fetch_bulk(ex, symbols), 1
+            except ccxt.NotSupported:
+                logger.info(f"{self.exchange_id}: fetch_tickers unsupported")
+                self._bulk = False
+                data, requests = await self._fetch_each(ex, symbols), len(symbols)
+        else:
+            data, requests = await self._fetch_each(ex, symbols), len(symbols)
+        recv_ts = time.time()
+        ticks: List[Dict[str, Any]] = []
+        for sym in symbols:
+            t = data.get(sym)
+            if not t:
+                continue
+            l1 = self._to_l1(sym, t, recv_ts)
+            if t.get("timestamp") and self._last_ts.get(sym) == l1["ts"]:
+                continue  # unchanged since the previous cycle
+            self._last_ts[sym] = l1["ts"]
+            ticks.append(l1)
+        return ticks, requests
+
+    def _cycle_s(self, ex: Any, requests: int) -> float:
+        # ccxt spaces requests `rateLimit` ms apart: never plan a shorter cycle
+        rate_s = float(getattr(ex, "rateLimit", 0) or 0) / 1000.0
+        return max(self.min_cycle_s, requests * rate_s) * self._penalty
+
+    def _stream_transport(self) -> Optional[StreamTransport]:
+        if self.transport is None and self.mode == "ws":
+            try:
+                import ccxt.pro  # noqa: F401
+            except Exception:
+                logger.warning("ccxt.pro unavailable; falling back to REST polling")
+                return None
+            self.transport = CcxtProTransport(self.exchange_id)
+        return self.transport
+
+    async def _stream(
+        self, tr: StreamTransport, symbols: List[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        wanted = set(symbols)
+        backoff = 0.0
+        while self._running:
+            try:
+                await tr.connect(symbols)
+                self.connects += 1
+                last_seq: Optional[int] = None
+                while self._running:
+                    seq, tickers = await asyncio.wait_for(tr.recv(), self.stale_s)
+                    if seq is not None:
+                        if last_seq is not None and seq != last_seq + 1:
+                            self.gaps += 1
+                            raise _Gap(f"expected seq {last_seq + 1}, got {seq}")
+                        last_seq = seq
+                    recv_ts = time.time()
+                    for t in tickers:
+                        sym = t.get("symbol")
+                        if sym not in wanted:
+                            continue
+                        l1 = self._to_l1(sym, t, recv_ts)
+                        if l1["ts"] < self._last_ts.get(sym, 0.0):
+                            continue  # out of order
+                        self._last_ts[sym] = l1["ts"]
+                        backoff = 0.0
+                        yield l1
+            except _Gap as e:
+                logger.warning(f"Market-data gap, resubscribing: {e}")
+            except asyncio.TimeoutError:
+                logger.warning(f"No market data for {self.stale_s:g}s, reconnecting")
+            except Exception as e:  # noqa: BLE001
+                if self._running:
+                    logger.warning(f"Market-data stream failed: {e}")
+                    backoff = min(max(backoff * 2.0, 0.5), 30.0)
+            finally:
+                await tr.close()
+            if self._running and backoff:
+                await asyncio.sleep(backoff)
 
     async def start(self, symbols: List[str]) -> AsyncIterator[Dict[str, Any]]:
         self._running = True
-        ex = getattr(ccxt, self.exchange_id)()
+        tr = self._stream_transport()
+        if tr is not None:
+            logger.info(f"DataFeed streaming {symbols}")
+            async for l1 in self._stream(tr, symbols):
+                yield l1
+            return
+        ex = self.exchange
+        if ex is None:
+            ex = getattr(ccxt, self.exchange_id)()
+            self.exchange = ex
         if self.exchange_id == "bitget" and self.use_testnet:
             # Bitget testnet support is limited in ccxt; left as a flag for future use.
             pass
-        self.exchange = ex
         await ex.load_markets()
         logger.info(f"DataFeed started for {symbols}")
         try:
             while self._running:
-                now = time.time()
-                for sym in symbols:
-                    try:
-                        t = await ex.fetch_ticker(sym)
-                        yield {
-                            "ts": now,
-                            "symbol": sym,
-                            "bid": t.get("bid"),
-                            "ask": t.get("ask"),
-                            "last": t.get("last"),
-                            "volume": t.get("baseVolume"),
-                        }
-                    except Exception as e:
-                        logger.warning(f"Ticker fetch failed for {sym}: {e}")
-                await asyncio.sleep(1.0)
+                started = time.monotonic()
+                requests = 1
+                try:
+                    ticks, requests = await self.poll_once(ex, symbols)
+                    self._penalty = max(1.0, self._penalty / 2.0)
+                    for l1 in ticks:
+                        yield l1
+                except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+                    self._penalty = min(self._penalty * 2.0, 16.0)
+                    logger.warning(f"Rate limited; cycle x{self._penalty:g}: {e}")
+                except Exception as e:  # noqa: BLE001
+                    logger.warning(f"Ticker poll failed: {e}")
+                elapsed = time.monotonic() - started
+                await asyncio.sleep(max(0.0, self._cycle_s(ex, requests) - elapsed))
         finally:
-            try:
-                await ex.close()
-            except Exception:
-                pass
+            if self._owns_exchange:
+                try:
+                    await ex.close()
+                except Exception:
+                    pass
 
     async def stop(self) -> None:
         self._running = False
+        if self.transport is not None:
+            # Unblock a pending recv
+            await self.transport.close()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .conflate import TickConflator
+from .metrics import METRICS
+
+TickHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ShardedTickDispatcher:
+    """Route ticks to per-shard queues drained by independent worker tasks.
+
+    A symbol always hashes to the same shard, so ticks for one symbol are
+    handled strictly in arrival order, while a slow order round-trip on one
+    shard does not hold up exits on the others. Queues are bounded: when a
+    shard is full, `submit` awaits, pushing backpressure onto the feed.
+
+    With `conflate`, each shard instead keeps one latest-value slot per
+    symbol (a `TickConflator`): a busy shard folds newer ticks into the
+    pending one, so its backlog never exceeds its symbol count and `submit`
+    never waits. Lag is then the age of the oldest tick folded into the one
+    handled.
+    """
+
+    def __init__(
+        self,
+        handler: TickHandler,
+        shards: int = 4,
+        maxsize: int = 1000,
+        conflate: bool = False,
+        sum_volume: bool = False,
+    ):
+        self.handler = handler
+        self.shards = max(1, int(shards))
+        self.maxsize = max(0, int(maxsize))
+        self.conflate = conflate
+        self.sum_volume = sum_volume
+        self._queues: List[asyncio.Queue[Tuple[float, Dict[str, Any]]]] = []
+        self._slots: List[TickConflator] = []
+        # Conflating shards: symbol -> arrival time of its oldest pending tick
+        self._since: List[Dict[str, float]] = [{} for _ in range(self.shards)]
+        self._idle: List[asyncio.Event] = []
+        self._workers: List[asyncio.Task[None]] = []
+        self._lag: List[float] = [0.0] * self.shards
+        self._processed: List[int] = [0] * self.shards
+        self._errors: List[int] = [0] * self.shards
+
+    def shard_for(self, symbol: str) -> int:
+        return zlib.crc32(symbol.encode("utf-8")) % self.shards
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        run = self._run
+        if self.conflate:
+            self._slots = [
+                TickConflator(sum_volume=self.sum_volume) for _ in range(self.shards)
+            ]
+            self._idle = [asyncio.Event() for _ in range(self.shards)]
+            for ev in self._idle:
+                ev.set()
+            run = self._run_conflated
+        else:
+            self._queues = [
+                asyncio.Queue(maxsize=self.maxsize) for _ in range(self.shards)
+            ]
+        self._workers = [
+            asyncio.create_task(run(i), name=f"tick-shard-{i}")
+            for i in range(self.shards)
+        ]
+
+    async def submit(self, l1: Dict[str, Any]) -> None:
+        sym = str(l1.get("symbol", ""))
+        idx = self.shard_for(sym)
+        if self.conflate:
+            self._since[idx].setdefault(sym, time.monotonic())
+            self._idle[idx].clear()
+            slot = self._slots[idx]
+            slot.put(l1)
+            METRICS.update_tick_shard(idx, slot.pending(), self._lag[idx])
+            return
+        q = self._queues[idx]
+        await q.put((time.monotonic(), l1))
+        METRICS.update_tick_shard(idx, q.qsize(), self._lag[idx])
+
+    async def _run(self, idx: int) -> None:
+        q = self._queues[idx]
+        while True:
+            enq_ts, l1 = await q.get()
+            try:
+                await self.handler(l1)
+                self._processed[idx] += 1
+            except Exception as e:  # noqa: BLE001
+                self._errors[idx] += 1
+                logger.warning(f"Tick handler failed on shard {idx}: {e}")
+            finally:
+                self._lag[idx] = time.monotonic() - enq_ts
+                METRICS.update_tick_shard(idx, q.qsize(), self._lag[idx])
+                q.task_done()
+
+    async def _run_conflated(self, idx: int) -> None:
+        slot = self._slots[idx]
+        since = self._since[idx]
+        while True:
+            l1 = await slot.get()
+            if l1 is None:
+                return
+            enq_ts = since.pop(str(l1.get("symbol", "")), time.monotonic())
+            try:
+                await self.handler(l1)
+                self._processed[idx] += 1
+            except Exception as e:  # noqa: BLE001
+                self._errors[idx] += 1
+                logger.warning(f"Tick handler failed on shard {idx}: {e}")
+            finally:
+                self._lag[idx] = time.monotonic() - enq_ts
+                METRICS.update_tick_shard(idx, slot.pending(), self._lag[idx])
+                if slot.pending() == 0:
+                    self._idle[idx].set()
+
+    def _depth(self, idx: int) -> int:
+        if self.conflate:
+            return self._slots[idx].pending() if self._slots else 0
+        return self._queues[idx].qsize() if self._queues else 0
+
+    async def join(self) -> None:
+        """Wait until every queued tick has been handled."""
+        for q in self._queues:
+            await q.join()
+        for ev in self._idle:
+            await ev.wait()
+
+    async def stop(self, drain: bool = True, timeout: Optional[float] = 5.0) -> None:
+        if drain and self._workers:
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Tick dispatcher stop timed out; dropping queued ticks")
+        for slot in self._slots:
+            slot.close()
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict[int, Dict[str, float]]:
+        return {
+            i: {
+                "depth": float(self._depth(i)),
+                "lag_s": self._lag[i],
+                "processed": float(self._processed[i]),
+                "errors": float(self._errors[i]),
+            }
+            for i in range(self.shards)
+        }
+
+
+__all__ = ["ShardedTickDispatcher", "TickHandler"]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from loguru import logger
+
+from .portfolio import Portfolio
+
+
+class EquityMarker:
+    """Mark the portfolio to the latest tick prices at a fixed cadence.
+
+    Every tick updates the symbol's mark; at most every `interval_s`
+    seconds (tick time) the whole portfolio is valued at those marks and
+    passed to `sink(equity, ts)`, e.g. ``EquityStore.record`` so the API's
+    drawdown and VaR guardrails see the trading loop's equity.
+    """
+
+    def __init__(
+        self,
+        portfolio: Portfolio,
+        sink: Callable[[float, float], None],
+        interval_s: float = 60.0,
+    ) -> None:
+        self.portfolio = portfolio
+        self.sink = sink
+        self.interval_s = max(0.0, float(interval_s))
+        self.marks: Dict[str, float] = {}
+        self._last_ts: Optional[float] = None
+        self.recorded = 0
+
+    def on_tick(self, l1: Dict[str, Any]) -> Optional[float]:
+        """Update the mark; returns the equity when a point was recorded."""
+        px = l1.get("last") or l1.get("bid") or l1.get("ask")
+        if px:
+            self.marks[str(l1["symbol"])] = float(px)
+        ts = float(l1.get("ts") or time.time())
+        if self._last_ts is not None and ts - self._last_ts < self.interval_s:
+            return None
+        self._last_ts = ts
+        return self.mark(ts)
+
+    def mark(self, ts: Optional[float] = None) -> float:
+        eq = self.portfolio.equity(self.marks)
+        try:
+            self.sink(eq, time.time() if ts is None else ts)
+            self.recorded += 1
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Equity mark failed: {e}")
+        return eq
+
+    async def tap(
+        self, ticks: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Pass a tick stream through unchanged, marking equity on the way."""
+        try:
+            async for l1 in ticks:
+                self.on_tick(l1)
+                yield l1
+        finally:
+            if self.marks:
+                self.mark()
+
+
+__all__ = ["EquityMarker"]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Optional
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
@@ -23,11 +24,26 @@ class ExecContext:
     live_enabled: bool = False
     trades: int = 0
     fast_mode: bool = False
+    # Max in-flight live child orders per batch (ccxt rate limiter still applies)
+    live_concurrency: int = 4
+
+
+@dataclass
+class OrderSpec:
+    symbol: str
+    side: str
+    type_: str
+    qty: float
+    price: Optional[float] = None
+    strategy_id: str = ""
+    features: Dict[str, Any] = field(default_factory=dict)
+    checks_passed: Dict[str, bool] = field(default_factory=dict)
 
 
 class ExecutionManager:
     def __init__(self, ctx: ExecContext) -> None:
         self.ctx = ctx
+        self._live_sem: Optional[asyncio.Semaphore] = None
 
     async def submit(
         self,
@@ -41,71 +57,140 @@ class ExecutionManager:
         features: Dict[str, float],
         checks_passed: Dict[str, bool],
     ) -> Dict[str, object]:
-        assert_whitelisted(symbol, self.ctx.whitelist)
-        base_inv = self.ctx.portfolio.get_position(symbol).base
-        forbid_shorting(side, base_inv)
+        order = OrderSpec(
+            symbol, side, type_, qty, price, strategy_id, features, checks_passed
+        )
+        return (await self.submit_batch([order], l1))[0]
+
+    def _validate(self, orders: List[OrderSpec]) -> None:
+        # Compliance is evaluated once per (symbol, side) rather than per child
+        seen: set[tuple[str, str]] = set()
+        for o in orders:
+            key = (o.symbol, o.side)
+            if key in seen:
+                continue
+            seen.add(key)
+            assert_whitelisted(o.symbol, self.ctx.whitelist)
+            forbid_shorting(o.side, self.ctx.portfolio.get_position(o.symbol).base)
         enforce_spot_only({})
 
+    async def submit_batch(
+        self, orders: List[OrderSpec], l1: Dict[str, float]
+    ) -> List[Dict[str, object]]:
+        """Submit a burst of orders (e.g. micro-slices) against one quote.
+
+        Live child orders are dispatched concurrently (bounded by
+        `live_concurrency`); paper orders fill in a single pass. Ledger records
+        for the whole batch are written with one append.
+        """
+        if not orders:
+            return []
+        self._validate(orders)
         if self.ctx.live_enabled and self.ctx.live_broker is not None:
-            res = await self.ctx.live_broker.place_order(
-                symbol, side, type_, qty, price
-            )
-            px = res.get("price") or price
-            if not self.ctx.fast_mode:
-                self.ctx.ledger.append(
-                    {
-                        "ts": res.get("timestamp"),
-                        "symbol": symbol,
-                        "side": side,
-                        "qty": qty,
-                        "px": px,
-                        "fees": None,
-                        "pnl": None,
-                        "strategy_id": strategy_id,
-                        "features": features,
-                        "checks_passed": checks_passed,
-                        "mode": "live",
-                    }
+            return await self._submit_live(orders)
+        return self._submit_paper(orders, l1)
+
+    async def _submit_live(self, orders: List[OrderSpec]) -> List[Dict[str, object]]:
+        broker = self.ctx.live_broker
+        assert broker is not None
+        if self._live_sem is None:
+            self._live_sem = asyncio.Semaphore(max(1, int(self.ctx.live_concurrency)))
+        sem = self._live_sem
+
+        async def _place(o: OrderSpec) -> Dict[str, Any]:
+            async with sem:
+                return await broker.place_order(
+                    o.symbol, o.side, o.type_, o.qty, o.price
                 )
-            return res
-        else:
-            order = self.ctx.paper.place_order(symbol, side, type_, qty, price, l1)
-            px = price
-            if order.type == "market":
-                px = (l1.get("ask") if side == "buy" else l1.get("bid")) or l1.get(
-                    "last"
+
+        results = await asyncio.gather(
+            *(_place(o) for o in orders), return_exceptions=True
+        )
+        records: List[Dict[str, Any]] = []
+        first_error: Optional[BaseException] = None
+        for o, res in zip(orders, results):
+            if isinstance(res, BaseException):
+                first_error = first_error or res
+                continue
+            records.append(
+                {
+                    "ts": res.get("timestamp"),
+                    "symbol": o.symbol,
+                    "side": o.side,
+                    "qty": o.qty,
+                    "px": res.get("price") or o.price,
+                    "fees": None,
+                    "pnl": None,
+                    "strategy_id": o.strategy_id,
+                    "features": o.features,
+                    "checks_passed": o.checks_passed,
+                    "mode": "live",
+                }
+            )
+        if not self.ctx.fast_mode:
+            self.ctx.ledger.append_many(records)
+        if first_error is not None:
+            raise first_error
+        return list(results)  # type: ignore[arg-type]
+
+    def _submit_paper(
+        self, orders: List[OrderSpec], l1: Dict[str, float]
+    ) -> List[Dict[str, object]]:
+        out: List[Dict[str, object]] = []
+        records: List[Dict[str, Any]] = []
+        fills: List[Dict[str, Any]] = []
+        try:
+            for o in orders:
+                order = self.ctx.paper.place_order(
+                    o.symbol, o.side, o.type_, o.qty, o.price, l1
                 )
-            if not self.ctx.fast_mode:
-                self.ctx.ledger.append(
+                px = o.price
+                if order.type == "market":
+                    px = (
+                        l1.get("ask") if o.side == "buy" else l1.get("bid")
+                    ) or l1.get("last")
+                if not self.ctx.fast_mode:
+                    records.append(
+                        {
+                            "ts": l1.get("ts"),
+                            "symbol": o.symbol,
+                            "side": o.side,
+                            "qty": o.qty,
+                            "px": px,
+                            "fees": "included",  # fees applied in portfolio
+                            "pnl": self.ctx.portfolio.get_position(
+                                o.symbol
+                            ).realized_pnl,
+                            "strategy_id": o.strategy_id,
+                            "features": o.features,
+                            "checks_passed": o.checks_passed,
+                            "mode": "paper",
+                        }
+                    )
+                    if o.strategy_id == "ml" and o.side == "buy":
+                        try:
+                            ML_EXEC_BUYS.labels(o.symbol).inc()
+                        except Exception:
+                            pass
+                fills.append(
                     {
-                        "ts": l1.get("ts"),
-                        "symbol": symbol,
-                        "side": side,
-                        "qty": qty,
+                        "order_id": order.id,
+                        "symbol": o.symbol,
+                        "side": o.side,
+                        "qty": o.qty,
                         "px": px,
-                        "fees": "included",  # fees applied in portfolio
-                        "pnl": self.ctx.portfolio.get_position(symbol).realized_pnl,
-                        "strategy_id": strategy_id,
-                        "features": features,
-                        "checks_passed": checks_passed,
-                        "mode": "paper",
+                        "type": o.type_,
                     }
                 )
-                if strategy_id == "ml" and side == "buy":
-                    try:
-                        ML_EXEC_BUYS.labels(symbol).inc()
-                    except Exception:
-                        pass
-            logger.bind(event="exec_submit").info(
-                {
-                    "order_id": order.id,
-                    "symbol": symbol,
-                    "side": side,
-                    "qty": qty,
-                    "px": px,
-                    "type": type_,
-                }
-            )
-            if order.status == "filled":
-                self.ctx.trades += 1
-            return {"id": order.id, "status": order.status}
+                if order.status == "filled":
+                    self.ctx.trades += 1
+                out.append({"id": order.id, "status": order.status})
+        finally:
+            # Record whatever filled, even if a later child was rejected
+            if records:
+                self.ctx.ledger.append_many(records)
+            if fills:
+                logger.bind(event="exec_submit").info(
+                    fills[0] if len(fills) == 1 else {"batch": fills}
+                )
+        return out
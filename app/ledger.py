@@ -1,20 +1,205 @@
 from __future__ import annotations
 
 import hashlib
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import orjson
 from loguru import logger
 
 
+class GroupCommitWriter:
+    """Background thread that appends queued ledger lines in batches.
+
+    Producers only enqueue pre-serialized lines; the thread writes everything
+    pending with one `write` and fsyncs when `fsync_every` records or
+    `fsync_ms` milliseconds have accumulated since the last sync (0 disables
+    that trigger). `flush()` blocks until all enqueued lines are on disk.
+
+    A failed write is rolled back to the last complete line and retried
+    every `retry_s` seconds, ahead of newer lines; the failure is raised
+    once from the next `flush()`/`close()`. Records still failing at close
+    are logged as lost.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync_every: int = 0,
+        fsync_ms: int = 0,
+        retry_s: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.fsync_every = max(0, int(fsync_every))
+        self.fsync_s = max(0, int(fsync_ms)) / 1000.0
+        self.retry_s = max(0.0, float(retry_s))
+        self._cv = threading.Condition()
+        self._buf: List[bytes] = []
+        self._enqueued = 0
+        self._written = 0
+        self._synced = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_req = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._fh = self.path.open("ab")
+        self._thread = threading.Thread(
+            target=self._run, name="ledger-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, lines: List[bytes]) -> None:
+        with self._cv:
+            if self._closed:
+                raise RuntimeError("ledger writer is closed")
+            self._buf.extend(lines)
+            self._enqueued += len(lines)
+            self._cv.notify_all()
+
+    def _sync_due(self) -> bool:
+        if not self._unsynced:
+            return False
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            return True
+        return bool(self.fsync_s) and (
+            time.monotonic() - self._last_sync >= self.fsync_s
+        )
+
+    def _wait_timeout(self) -> Optional[float]:
+        if self._unsynced and self.fsync_s:
+            return max(0.0, self.fsync_s - (time.monotonic() - self._last_sync))
+        return None
+
+    def _write(self, batch: List[bytes]) -> None:
+        if self._fh.closed:
+            self._fh = self.path.open("ab")
+        pos = self._fh.tell()
+        try:
+            self._fh.write(b"".join(batch))
+            self._fh.flush()
+        except Exception:
+            # Drop any partial line so the retry appends the batch cleanly
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = self.path.open("ab")
+            os.truncate(self.path, pos)
+            raise
+
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                while not (self._buf or self._closed or self._sync_req):
+                    timeout = self._wait_timeout()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cv.wait(timeout)
+                batch, self._buf = self._buf, []
+                closing = self._closed
+                sync_req, self._sync_req = self._sync_req, False
+            written = 0
+            err: Optional[BaseException] = None
+            try:
+                if batch:
+                    self._write(batch)
+                    written = len(batch)
+                    self._unsynced += written
+                if self._unsynced and (sync_req or closing or self._sync_due()):
+                    os.fsync(self._fh.fileno())
+                    self._unsynced = 0
+                    self._last_sync = time.monotonic()
+            except Exception as e:  # noqa: BLE001
+                err = e
+                logger.error(f"Ledger group commit failed for {self.path}: {e}")
+            with self._cv:
+                if err is not None:
+                    self._error = err
+                    self._sync_req = self._sync_req or sync_req
+                    if batch and not written and not closing:
+                        # Keep the records in order ahead of newer ones
+                        self._buf[:0] = batch
+                else:
+                    self._error = None
+                self._written += written
+                if self._unsynced == 0:
+                    self._synced = self._written
+                self._cv.notify_all()
+                if closing and (err is not None or not self._buf):
+                    break
+                if err is not None:
+                    # Back off; only close cuts the wait short
+                    self._cv.wait_for(lambda: self._closed, self.retry_s)
+            if written:
+                logger.bind(event="ledger_write").debug(
+                    {"path": str(self.path), "records": written}
+                )
+        if self._enqueued > self._written:
+            logger.error(
+                f"Ledger writer for {self.path} closed with "
+                f"{self._enqueued - self._written} unwritten records"
+            )
+        self._fh.close()
+
+    def _raise_error(self) -> None:
+        # Report a failure once; the writer keeps retrying the records
+        err, self._error = self._error, None
+        if err is not None:
+            raise err
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        with self._cv:
+            target = self._enqueued
+            self._sync_req = True
+            self._cv.notify_all()
+            self._cv.wait_for(
+                lambda: (
+                    self._synced >= target
+                    or self._error is not None
+                    or not self._thread.is_alive()
+                ),
+                timeout,
+            )
+            self._raise_error()
+
+    def close(self) -> None:
+        with self._cv:
+            if self._closed:
+                return
+            self._closed = True
+            self._cv.notify_all()
+        self._thread.join()
+        self._raise_error()
+
+
 class ExplainabilityLedger:
-    """Append-only JSONL with hash chaining for tamper-evident logs."""
+    """Append-only JSONL with hash chaining for tamper-evident logs.
+
+    With `group_commit=True`, records are chained on the caller's thread (so
+    chain order is append order) and handed to a `GroupCommitWriter`; call
+    `flush()`/`close()` before exit.
+    """
 
-    def __init__(self, path: str = "logs/ledger.jsonl") -> None:
+    def __init__(
+        self,
+        path: str = "logs/ledger.jsonl",
+        group_commit: bool = False,
+        fsync_every: int = 0,
+        fsync_ms: int = 0,
+    ) -> None:
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._last_hash: str = self._load_last_hash()
+        self._lock = threading.Lock()
+        self._writer: Optional[GroupCommitWriter] = (
+            GroupCommitWriter(self.path, fsync_every=fsync_every, fsync_ms=fsync_ms)
+            if group_commit
+            else None
+        )
 
     def _load_last_hash(self) -> str:
         if not self.path.exists():
@@ -41,13 +226,42 @@ class ExplainabilityLedger:
         h.update(orjson.dumps(record))
         return h.hexdigest()
 
-    def append(self, record: Dict[str, Any]) -> None:
+    def _chain(self, prev_hash: str, record: Dict[str, Any]) -> Dict[str, Any]:
         # Do not allow mutation of provided dict
         payload = dict(record)
-        payload["prev_hash"] = self._last_hash
-        payload["hash"] = self._hash_record(self._last_hash, record)
-        line = orjson.dumps(payload).decode("utf-8")
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(line + "\n")
-        self._last_hash = payload["hash"]
-        logger.bind(event="ledger_write").info(payload)
+        payload["prev_hash"] = prev_hash
+        payload["hash"] = self._hash_record(prev_hash, record)
+        return payload
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Chain and write several records with a single file append."""
+        with self._lock:
+            payloads: List[Dict[str, Any]] = []
+            head = self._last_hash
+            for record in records:
+                payload = self._chain(head, record)
+                payloads.append(payload)
+                head = payload["hash"]
+            if not payloads:
+                return
+            lines = [orjson.dumps(p) + b"\n" for p in payloads]
+            if self._writer is not None:
+                self._writer.submit(lines)
+            else:
+                with self.path.open("ab") as f:
+                    f.write(b"".join(lines))
+            self._last_hash = head
+        if self._writer is None:
+            for payload in payloads:
+                logger.bind(event="ledger_write").info(payload)
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
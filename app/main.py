@@ -4,14 +4,19 @@ import asyncio
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
 from dotenv import load_dotenv
 from loguru import logger
 import uvicorn
 
 from .config import load_settings
+from .bars import BarBuilder
+from .conflate import TickConflator
+from .data_loader import DataLoader, LoaderConfig
 from .data_ws import DataFeed
+from .equity import EquityMarker
+from .dispatch import ShardedTickDispatcher
 from .portfolio import Portfolio
 from .broker_paper import PaperBroker
 from .broker_ccxt import CCXTBroker
@@ -20,6 +25,7 @@ from .ledger import ExplainabilityLedger
 from .risk import RiskManager
 from .router import StrategyRouter
 from .server import create_app
+from .tickrec import TickRecorder
 
 
 def setup_logging(log_dir: str, level: str) -> None:
@@ -45,7 +51,12 @@ async def run_trader() -> None:
         maker_bps=settings.fees.maker_bps, taker_bps=settings.fees.taker_bps
     )
     paper = PaperBroker(portfolio, slippage_bps=settings.fees.slippage_bps)
-    ledger = ExplainabilityLedger(path=os.path.join(settings.log_dir, "ledger.jsonl"))
+    ledger = ExplainabilityLedger(
+        path=os.path.join(settings.log_dir, "ledger.jsonl"),
+        group_commit=settings.ledger_group_commit,
+        fsync_every=settings.ledger_fsync_every,
+        fsync_ms=settings.ledger_fsync_ms,
+    )
 
     # Markets & symbols
     # Load and filter by exchange markets using ccxt
@@ -337,11 +348,90 @@ async def run_trader() -> None:
         await server.serve()
 
     async def trading_loop() -> None:
-        feed = DataFeed(settings.exchange, use_testnet=settings.use_testnet)
-        async for l1 in feed.start(symbols):
-            await router.on_tick(l1)
+        feed = DataFeed(
+            settings.exchange,
+            use_testnet=settings.use_testnet,
+            mode=settings.feed_mode,
+            concurrency=settings.feed_concurrency,
+            min_cycle_s=settings.feed_min_cycle_s,
+            stale_s=settings.feed_stale_s,
+        )
+        ticks: AsyncIterator[Dict[str, Any]] = feed.start(symbols)
+        # Live OHLCV bars from every tick: real high/low for the router's ATR,
+        # appended to the OHLCV cache the backtester reads
+        tfs = [tf.strip() for tf in settings.bar_timeframes.split(",") if tf.strip()]
+        if tfs:
+            loader = (
+                DataLoader(
+                    LoaderConfig(Path(settings.data_dir), exchange=settings.exchange)
+                )
+                if settings.bar_cache
+                else None
+            )
+            bars = BarBuilder(tfs, on_close=router.on_bar, loader=loader)
+            if settings.bar_atr_timeframe in tfs:
+                router.bar_timeframe = settings.bar_atr_timeframe
+            ticks = bars.tap(ticks)
+        if settings.tick_record_dir:
+            ticks = TickRecorder(settings.tick_record_dir).tap(ticks)
+        if settings.equity_mark_s > 0:
+            # The API's drawdown/VaR guardrails read this equity series
+            from src.risk.equity_store import get_equity_store
+
+            store = get_equity_store()
+            ticks = EquityMarker(portfolio, store.record, settings.equity_mark_s).tap(
+                ticks
+            )
+        pump = None
+        if settings.tick_conflate and settings.tick_shards <= 0:
+            # Router trades on the newest quote rather than a backlog
+            conflator = TickConflator()
+            pump = asyncio.create_task(conflator.pump(ticks))
+            ticks = conflator
+        dispatcher = None
+        if settings.tick_shards > 0:
+            # Per-symbol ordering, cross-symbol concurrency; the backlog
+            # builds in the shards, so that is where ticks are conflated
+            dispatcher = ShardedTickDispatcher(
+                router.on_tick,
+                shards=settings.tick_shards,
+                maxsize=settings.tick_queue_max,
+                conflate=settings.tick_conflate,
+            )
+            dispatcher.start()
+        try:
+            async for l1 in ticks:
+                if dispatcher is not None:
+                    await dispatcher.submit(l1)
+                else:
+                    await router.on_tick(l1)
+        finally:
+            if dispatcher is not None:
+                await dispatcher.stop()
+            if pump is not None:
+                pump.cancel()
+                # A source failure was re-raised by the conflator above
+                await asyncio.gather(pump, return_exceptions=True)
+
+    # Sentiment is fetched in the background; the router only reads memory
+    refresher = None
+    if settings.sentiment_enabled:
+        try:
+            from src.data.sentiment import fetch_enabled, get_sentiment_refresher
 
-    await asyncio.gather(http_server(), trading_loop())
+            if fetch_enabled():
+                refresher = get_sentiment_refresher()
+                refresher.start()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Sentiment refresher unavailable: {e}")
+
+    try:
+        await asyncio.gather(http_server(), trading_loop())
+    finally:
+        if refresher is not None:
+            await refresher.stop()
+        # Drain queued ledger records to disk before exiting
+        ledger.close()
 
 
 def main() -> None:
@@ -3,7 +3,7 @@ from __future__ import annotations
 import time
 from dataclasses import dataclass, field
 from collections import deque
-from typing import Deque, List
+from typing import Deque, Dict, List, Tuple
 
 
 @dataclass
@@ -15,9 +15,12 @@ class Metrics:
     realized_pnl: float = 0.0
     max_drawdown: float = 0.0
     current_equity: float = 0.0
+    ticks_conflated: int = 0
     # Rolling samples for MFE/MAE percentiles (pct returns)
     _mfe_samples: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
     _mae_samples: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    # Sharded tick dispatch: shard -> (queue depth, last handled tick lag seconds)
+    _tick_shards: Dict[int, Tuple[int, float]] = field(default_factory=dict)
 
     def record_mfe_mae(self, mfe_pct: float, mae_pct: float) -> None:
         try:
@@ -32,6 +35,9 @@ class Metrics:
         except Exception:
             pass
 
+    def update_tick_shard(self, shard: int, depth: int, lag_s: float) -> None:
+        self._tick_shards[shard] = (int(depth), float(lag_s))
+
     @staticmethod
     def _percentile(samples: List[float], q: float) -> float:
         if not samples:
@@ -57,11 +63,15 @@ class Metrics:
             f"intradyne_realized_pnl {self.realized_pnl}",
             f"intradyne_max_drawdown {self.max_drawdown}",
             f"intradyne_equity {self.current_equity}",
+            f"intradyne_ticks_conflated_total {self.ticks_conflated}",
             f"intradyne_mfe_pct_p50 {mfe_p50}",
             f"intradyne_mfe_pct_p90 {mfe_p90}",
             f"intradyne_mae_pct_p50 {mae_p50}",
             f"intradyne_mae_pct_p90 {mae_p90}",
         ]
+        for shard, (depth, lag_s) in sorted(self._tick_shards.items()):
+            lines.append(f'intradyne_tick_queue_depth{{shard="{shard}"}} {depth}')
+            lines.append(f'intradyne_tick_shard_lag_seconds{{shard="{shard}"}} {lag_s}')
         return "\n".join(lines) + "\n"
 
 
@@ -68,9 +68,14 @@ class RiskManager:
             self._register_breach(now)
         self._update_kill_switch(now)
 
-    def flash_crash_check(self, symbol: str, ts: float, price: float) -> bool:
+    def flash_crash_check(
+        self, symbol: str, ts: float, price: float, high: Optional[float] = None
+    ) -> bool:
         win = self.state.symbol_windows.setdefault(symbol, deque())
         cutoff = ts - 3600.0
+        # `high` covers prices skipped by tick conflation since the last check
+        if high is not None and high > price:
+            win.append((ts, high))
         win.append((ts, price))
         while win and win[0][0] < cutoff:
             win.popleft()
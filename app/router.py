@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from typing import Deque, Dict, List, Optional, Tuple
-from collections import defaultdict, deque
+import asyncio
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass, field
 
 from loguru import logger
 
-from .execution import ExecutionManager
+from .execution import ExecutionManager, OrderSpec
 from .risk import RiskManager
 from .portfolio import Portfolio
 from .strategies.momentum import MomentumStrategy
@@ -22,6 +24,34 @@ except Exception:  # pragma: no cover
         return 0.0
 
 
+@dataclass(slots=True)
+class TradeState:
+    """Entry/exit bookkeeping for one open position; dropped as a unit on exit."""
+
+    sl: float
+    tp: float
+    entry_ts: float
+    entry_price: float
+    entry_high: float
+    mfe_pct: float = 0.0
+    mae_pct: float = 0.0
+    pyramids_done: int = 0
+    partial_stage: int = 0
+
+
+@dataclass(slots=True)
+class SymbolState:
+    """Per-symbol router state, resolved with a single dict lookup per tick."""
+
+    ohlc: Deque[Tuple[float, float, float]]
+    ema_fast: Optional[float] = None
+    ema_slow: Optional[float] = None
+    atr_out_count: int = 0
+    atr_block_until: float = 0.0
+    cooldown_until: float = 0.0
+    trade: Optional[TradeState] = field(default=None)
+
+
 class StrategyRouter:
     def __init__(
         self,
@@ -39,13 +69,9 @@ class StrategyRouter:
         self.meanrev = {s: MeanRevStrategy(symbol=s) for s in symbols}
         self.ml: dict[str, MLStrategy] = {}
 
-        # Position/entry state
-        self.stops: dict[str, tuple[float, float]] = {}
-        self.entry_ts: dict[str, float] = {}
-        self._entry_high: Dict[str, float] = {}
-        self._entry_price: Dict[str, float] = {}
-        self._mfe_pct: Dict[str, float] = defaultdict(float)
-        self._mae_pct: Dict[str, float] = defaultdict(float)
+        # Per-symbol state (indicators, filters and the open trade, if any)
+        self._state: Dict[str, SymbolState] = {}
+        self._entry_lock = asyncio.Lock()
 
         # Execution controls
         self.micro_slices: int = 3
@@ -53,30 +79,23 @@ class StrategyRouter:
         self.trail_atr_k: float = 0.0
         self.pyramid_max: int = 0
         self.pyramid_step_pct: float = 0.0
-        self._pyramids_done: Dict[str, int] = defaultdict(int)
         self.partial_r1: float = 0.0
         self.partial_r2: float = 0.0
-        self._partial_stage: Dict[str, int] = defaultdict(int)
 
         # ATR and EMA tracking
         self._atr_window: int = int(risk.atr_window or 0)
-        self._ohlc: Dict[str, Deque[Tuple[float, float, float]]] = defaultdict(
-            lambda: deque(maxlen=max(2, self._atr_window + 1))
-        )
         self.ema_fast_n: int = 0
         self.ema_slow_n: int = 0
-        self._ema_fast: Dict[str, float] = {}
-        self._ema_slow: Dict[str, float] = {}
         self.min_atr_pct: float = 0.0
         self.max_atr_pct: float = 0.0
         self.atr_block_consec: int = 0
         self.atr_block_cooldown_s: int = 0
-        self._atr_out_count: Dict[str, int] = defaultdict(int)
-        self._atr_block_until: Dict[str, float] = defaultdict(float)
+        # Live: ATR from closed bars of this timeframe (see on_bar); None feeds
+        # it from ticks, whose high/low are real bars in a backtest
+        self.bar_timeframe: Optional[str] = None
         # Entry hygiene
         self._max_spread_bps: int = 0
         self._entry_cooldown_s: int = 0
-        self._cooldown_until: Dict[str, float] = defaultdict(float)
 
         # Apply parameter overrides if provided
         params = params or {}
@@ -129,6 +148,16 @@ class StrategyRouter:
                 flt.get("atr_block_cooldown_s", self.atr_block_cooldown_s)
             )
 
+    def _open_positions(self) -> int:
+        return sum(1 for p in self.portfolio.positions.values() if p.base > 0)
+
+    def _symbol_state(self, sym: str) -> SymbolState:
+        st = self._state.get(sym)
+        if st is None:
+            st = SymbolState(ohlc=deque(maxlen=max(2, self._atr_window + 1)))
+            self._state[sym] = st
+        return st
+
     async def on_tick(self, l1: Dict[str, object]) -> None:
         sym = l1["symbol"]  # type: ignore[index]
         last = l1.get("last") or l1.get("bid") or l1.get("ask")
@@ -136,72 +165,77 @@ class StrategyRouter:
             return
         last_f = float(last)
         now_ts = float(l1.get("ts", 0.0) or 0.0)
+        st = self._symbol_state(sym)  # type: ignore[arg-type]
 
         # Update EMAs
         if self.ema_fast_n > 1:
             kf = 2.0 / (self.ema_fast_n + 1.0)
-            self._ema_fast[sym] = (
+            st.ema_fast = (
                 last_f
-                if sym not in self._ema_fast
-                else last_f * kf + self._ema_fast[sym] * (1.0 - kf)
+                if st.ema_fast is None
+                else last_f * kf + st.ema_fast * (1.0 - kf)
             )
         if self.ema_slow_n > 1:
             ks = 2.0 / (self.ema_slow_n + 1.0)
-            self._ema_slow[sym] = (
+            st.ema_slow = (
                 last_f
-                if sym not in self._ema_slow
-                else last_f * ks + self._ema_slow[sym] * (1.0 - ks)
+                if st.ema_slow is None
+                else last_f * ks + st.ema_slow * (1.0 - ks)
             )
 
         # Update ATR buffers
-        if self._atr_window > 0:
+        if self._atr_window > 0 and self.bar_timeframe is None:
             try:
                 hi = float(l1.get("high", last_f))
                 lo = float(l1.get("low", last_f))
                 cl = float(l1.get("last", last_f))
-                self._ohlc[sym].append((hi, lo, cl))
+                st.ohlc.append((hi, lo, cl))
             except Exception:
                 pass
 
-        # Risk shield
-        if self.risk.flash_crash_check(sym, now_ts, last_f):
+        # Risk shield (conflated ticks carry the extremes of skipped quotes)
+        seen_high = l1.get("high") if l1.get("conflated") else None
+        if self.risk.flash_crash_check(
+            sym,
+            now_ts,
+            last_f,
+            high=float(seen_high) if seen_high is not None else None,  # type: ignore[arg-type]
+        ):
             logger.warning(f"Flash-crash shield halted {sym}")
             return
 
         # Position state
         pos = self.portfolio.get_position(sym)
-        if pos.base > 0 and sym in self._entry_price:
-            ep = self._entry_price.get(sym, last_f)
+        tr = st.trade
+        if pos.base > 0 and tr is not None:
+            ep = tr.entry_price
             if ep > 0:
                 dp = (last_f / ep) - 1.0
-                self._mfe_pct[sym] = max(self._mfe_pct.get(sym, 0.0), dp)
-                self._mae_pct[sym] = min(self._mae_pct.get(sym, 0.0), dp)
+                tr.mfe_pct = max(tr.mfe_pct, dp)
+                tr.mae_pct = min(tr.mae_pct, dp)
 
         # Handle exits for open position
-        if pos.base > 0 and sym in self.stops:
-            sl, tp = self.stops[sym]
+        if pos.base > 0 and tr is not None:
+            sl, tp = tr.sl, tr.tp
             # Trailing stop update
             try:
-                self._entry_high[sym] = max(self._entry_high.get(sym, 0.0), last_f)
+                tr.entry_high = max(tr.entry_high, last_f)
                 if self.trail_atr_k > 0:
-                    atr_val = self._compute_atr(sym)
+                    atr_val = self._compute_atr(st)
                     if atr_val and atr_val > 0:
-                        trail_sl = self._entry_high[sym] - self.trail_atr_k * atr_val
+                        trail_sl = tr.entry_high - self.trail_atr_k * atr_val
                         if trail_sl < last_f:
                             sl = max(sl, trail_sl)
-                            self.stops[sym] = (sl, tp)
+                            tr.sl = sl
             except Exception:
                 pass
 
-            timed_out = False
-            ent_ts = self.entry_ts.get(sym)
-            if ent_ts is not None and (now_ts - ent_ts) >= self.time_stop_s:
-                timed_out = True
+            timed_out = (now_ts - tr.entry_ts) >= self.time_stop_s
 
             # Partial take-profits
             try:
-                stage = self._partial_stage.get(sym, 0)
-                ep = self._entry_price.get(sym, last_f)
+                stage = tr.partial_stage
+                ep = tr.entry_price
                 r_unit = max(1e-9, ep - sl)
                 if (
                     self.partial_r1 > 0
@@ -221,7 +255,7 @@ class StrategyRouter:
                             {"target": "R1"},
                             {"whitelist": True, "spot_only": True, "long_only": True},
                         )
-                        self._partial_stage[sym] = 1
+                        tr.partial_stage = 1
                 elif (
                     self.partial_r2 > 0
                     and stage == 1
@@ -240,7 +274,7 @@ class StrategyRouter:
                             {"target": "R2"},
                             {"whitelist": True, "spot_only": True, "long_only": True},
                         )
-                        self._partial_stage[sym] = 2
+                        tr.partial_stage = 2
             except Exception:
                 pass
 
@@ -251,40 +285,34 @@ class StrategyRouter:
                 )
                 features = {"exit_reason": reason}
                 checks = {"whitelist": True, "spot_only": True, "long_only": True}
-                # Micro-sliced exits
-                slice_qty = max(qty / max(1, self.micro_slices), 0.0)
-                remaining = qty
-                for i in range(self.micro_slices):
-                    q = slice_qty if i < self.micro_slices - 1 else remaining
-                    if q <= 0:
-                        break
-                    await self.execman.submit(
-                        sym,
-                        "sell",
-                        "market",
-                        q,
-                        None,
-                        l1,
-                        "stop_exit",
-                        features,
-                        checks,
-                    )
-                    remaining -= q
+                # Micro-sliced exits, submitted as one batch
+                await self.execman.submit_batch(
+                    [
+                        OrderSpec(
+                            sym,
+                            "sell",
+                            "market",
+                            q,
+                            None,
+                            "stop_exit",
+                            features,
+                            checks,
+                        )
+                        for q in self._slices(qty)
+                    ],
+                    l1,  # type: ignore[arg-type]
+                )
                 # Cooldown after SL exits
                 if reason == "sl" and self._entry_cooldown_s > 0:
-                    try:
-                        self._cooldown_until[sym] = max(
-                            self._cooldown_until.get(sym, 0.0),
-                            now_ts + float(self._entry_cooldown_s),
-                        )
-                    except Exception:
-                        pass
+                    st.cooldown_until = max(
+                        st.cooldown_until, now_ts + float(self._entry_cooldown_s)
+                    )
                 # Log MFE/MAE
                 try:
-                    ep = self._entry_price.get(sym, last_f)
+                    ep = tr.entry_price
                     r_pct = (ep - sl) / ep if ep > 0 else 0.0
-                    mfe = self._mfe_pct.get(sym, 0.0)
-                    mae = self._mae_pct.get(sym, 0.0)
+                    mfe = tr.mfe_pct
+                    mae = tr.mae_pct
                     self.execman.ctx.ledger.append(
                         {
                             "ts": now_ts,
@@ -306,23 +334,15 @@ class StrategyRouter:
                 except Exception:
                     pass
                 # Clear state
-                self.stops.pop(sym, None)
-                self.entry_ts.pop(sym, None)
-                self._entry_high.pop(sym, None)
-                self._entry_price.pop(sym, None)
-                self._mfe_pct.pop(sym, None)
-                self._mae_pct.pop(sym, None)
-                self._pyramids_done.pop(sym, None)
-                self._partial_stage.pop(sym, None)
+                st.trade = None
                 return
 
-        # Max open positions
-        open_positions = sum(1 for p in self.portfolio.positions.values() if p.base > 0)
-        if not self.risk.can_open_new_position(open_positions):
+        # Max open positions (re-checked under the entry lock before buying)
+        if not self.risk.can_open_new_position(self._open_positions()):
             return
 
         # ATR filters & no-trade window
-        atr_val = self._compute_atr(sym)
+        atr_val = self._compute_atr(st)
         atr_pct = (atr_val / last_f) if (atr_val and last_f > 0) else 0.0
         out = False
         if self.min_atr_pct and atr_pct < self.min_atr_pct:
@@ -330,36 +350,28 @@ class StrategyRouter:
         if self.max_atr_pct and atr_pct > self.max_atr_pct:
             out = True
         if out:
-            self._atr_out_count[sym] = self._atr_out_count.get(sym, 0) + 1
-            if (
-                self.atr_block_consec > 0
-                and self._atr_out_count[sym] >= self.atr_block_consec
-            ):
-                self._atr_block_until[sym] = now_ts + float(
-                    max(0, self.atr_block_cooldown_s)
-                )
-                self._atr_out_count[sym] = 0
+            st.atr_out_count += 1
+            if self.atr_block_consec > 0 and st.atr_out_count >= self.atr_block_consec:
+                st.atr_block_until = now_ts + float(max(0, self.atr_block_cooldown_s))
+                st.atr_out_count = 0
             return
         else:
             # Normalize: reduce or reset counters; early unblock if in band long enough
-            self._atr_out_count[sym] = 0
-            if (
-                self._atr_block_until.get(sym, 0.0) > now_ts
-                and self.atr_block_consec > 0
-            ):
+            st.atr_out_count = 0
+            if st.atr_block_until > now_ts and self.atr_block_consec > 0:
                 # Require half the threshold in-band to unblock
                 unblock_need = max(1, self.atr_block_consec // 2)
-                cnt = abs(self._atr_out_count.get(sym, 0)) + 1
-                self._atr_out_count[sym] = -cnt
+                cnt = abs(st.atr_out_count) + 1
+                st.atr_out_count = -cnt
                 if cnt >= unblock_need:
-                    self._atr_block_until[sym] = now_ts
-        if self._atr_block_until.get(sym, 0.0) > now_ts:
+                    st.atr_block_until = now_ts
+        if st.atr_block_until > now_ts:
             return
 
         # EMA confirmation
         if self.ema_fast_n > 1 and self.ema_slow_n > 1:
-            ef = self._ema_fast.get(sym)
-            es = self._ema_slow.get(sym)
+            ef = st.ema_fast
+            es = st.ema_slow
             if ef is None or es is None or not (ef > es):
                 return
 
@@ -388,13 +400,8 @@ class StrategyRouter:
             except Exception:
                 pass
             # Entry cooldown gate
-            try:
-                if self._entry_cooldown_s > 0 and now_ts < self._cooldown_until.get(
-                    sym, 0.0
-                ):
-                    continue
-            except Exception:
-                pass
+            if self._entry_cooldown_s > 0 and now_ts < st.cooldown_until:
+                continue
             if sig.get("action") == "buy":
                 # Sentiment gate and sizing throttle (optional)
                 s_score = 0.0
@@ -428,76 +435,88 @@ class StrategyRouter:
                         )
                     except Exception:
                         pass
-                qty = self.risk.sizer(self.portfolio.equity({sym: last_f}), last_f)
-                if (
-                    hasattr(self, "_sentiment_enabled")
-                    and self._sentiment_enabled
-                    and qty > 0
-                ):
+                # Entries are serialized up to the fill: with sharded dispatch,
+                # ticks of other symbols could otherwise pass the max-open
+                # check and size off the same equity before either order is in
+                async with self._entry_lock:
+                    if not self.risk.can_open_new_position(self._open_positions()):
+                        break
+                    qty = self.risk.sizer(self.portfolio.equity({sym: last_f}), last_f)
+                    if (
+                        hasattr(self, "_sentiment_enabled")
+                        and self._sentiment_enabled
+                        and qty > 0
+                    ):
+                        try:
+                            a = float(getattr(self, "_sentiment_size_min", 0.8))
+                            b = float(getattr(self, "_sentiment_size_max", 1.2))
+                            f = a + (b - a) * (s_score + 1.0) / 2.0
+                            qty *= max(0.0, f)
+                        except Exception:
+                            pass
+                    if qty <= 0:
+                        continue
+                    sl, tp = self.risk.sl_tp_levels(
+                        last_f, atr=atr_val if atr_val else None
+                    )
+                    features = (
+                        sig.get("features", {})
+                        if isinstance(sig.get("features"), dict)
+                        else {}
+                    )
                     try:
-                        a = float(getattr(self, "_sentiment_size_min", 0.8))
-                        b = float(getattr(self, "_sentiment_size_max", 1.2))
-                        f = a + (b - a) * (s_score + 1.0) / 2.0
-                        qty *= max(0.0, f)
+                        features.update(
+                            {
+                                "sl": sl,
+                                "tp": tp,
+                                "sentiment": s_score,
+                            }
+                        )
                     except Exception:
-                        pass
-                if qty <= 0:
-                    continue
-                sl, tp = self.risk.sl_tp_levels(
-                    last_f, atr=atr_val if atr_val else None
-                )
-                features = (
-                    sig.get("features", {})
-                    if isinstance(sig.get("features"), dict)
-                    else {}
-                )
-                try:
-                    features.update(
-                        {
-                            "sl": sl,
-                            "tp": tp,
-                            "sentiment": s_score,
-                        }
-                    )
-                except Exception:
-                    features.update({"sl": sl, "tp": tp})
-                checks = {"whitelist": True, "spot_only": True, "long_only": True}
-                slice_qty = max(qty / max(1, self.micro_slices), 0.0)
-                remaining = qty
-                for i in range(self.micro_slices):
-                    q = slice_qty if i < self.micro_slices - 1 else remaining
-                    if q <= 0:
-                        break
-                    await self.execman.submit(
-                        sym,
-                        "buy",
-                        "market",
-                        q,
-                        None,
-                        l1,
-                        getattr(strat, "id", ""),
-                        features,
-                        checks,
+                        features.update({"sl": sl, "tp": tp})
+                    checks = {"whitelist": True, "spot_only": True, "long_only": True}
+                    strat_id = getattr(strat, "id", "")
+                    await self.execman.submit_batch(
+                        [
+                            OrderSpec(
+                                sym,
+                                "buy",
+                                "market",
+                                q,
+                                None,
+                                strat_id,
+                                features,
+                                checks,
+                            )
+                            for q in self._slices(qty)
+                        ],
+                        l1,  # type: ignore[arg-type]
                     )
-                    remaining -= q
-                self.stops[sym] = (sl, tp)
-                self.entry_ts.setdefault(sym, now_ts)
-                self._entry_high[sym] = last_f
-                self._entry_price.setdefault(sym, last_f)
-                self._mfe_pct[sym] = 0.0
-                self._mae_pct[sym] = 0.0
-                # Pyramids counter reset
-                self._pyramids_done[sym] = 0
-                break
+                    if st.trade is None:
+                        st.trade = TradeState(
+                            sl=sl,
+                            tp=tp,
+                            entry_ts=now_ts,
+                            entry_price=last_f,
+                            entry_high=last_f,
+                        )
+                    else:
+                        # Adding to an existing trade keeps its entry anchor
+                        tr = st.trade
+                        tr.sl, tr.tp = sl, tp
+                        tr.entry_high = last_f
+                        tr.mfe_pct = 0.0
+                        tr.mae_pct = 0.0
+                        tr.pyramids_done = 0
+                    break
 
         # Pyramiding logic
         pos = self.portfolio.get_position(sym)
-        if self.pyramid_max > 0 and pos.base > 0 and sym in self._entry_price:
-            done = self._pyramids_done.get(sym, 0)
+        tr = st.trade
+        if self.pyramid_max > 0 and pos.base > 0 and tr is not None:
+            done = tr.pyramids_done
             if done < self.pyramid_max and self.pyramid_step_pct > 0:
-                trigger_px = self._entry_price[sym] * (
-                    1.0 + self.pyramid_step_pct * (done + 1)
-                )
+                trigger_px = tr.entry_price * (1.0 + self.pyramid_step_pct * (done + 1))
                 if last_f >= trigger_px:
                     add_qty = max(
                         self.risk.sizer(self.portfolio.equity({sym: last_f}), last_f)
@@ -516,18 +535,41 @@ class StrategyRouter:
                             {"trigger_px": trigger_px},
                             {"whitelist": True, "spot_only": True, "long_only": True},
                         )
-                        self._pyramids_done[sym] = done + 1
+                        tr.pyramids_done = done + 1
         # Update equity metric (approximate with current symbol price)
         try:
             METRICS.update_equity(self.portfolio.equity({sym: last_f}))
         except Exception:
             pass
 
-    def _compute_atr(self, sym: str) -> Optional[float]:
+    def on_bar(self, bar: Any) -> None:
+        """Bar-close event: feed the ATR buffer and strategies that take bars."""
+        if bar.timeframe == self.bar_timeframe and self._atr_window > 0:
+            self._symbol_state(bar.symbol).ohlc.append((bar.high, bar.low, bar.close))
+        for strats in (self.momo, self.meanrev, self.ml):
+            strat = strats.get(bar.symbol)
+            handler = getattr(strat, "on_bar", None)
+            if handler is not None:
+                handler(bar)
+
+    def _slices(self, qty: float) -> List[float]:
+        """Split `qty` into `micro_slices` children; the last takes the remainder."""
+        out: List[float] = []
+        slice_qty = max(qty / max(1, self.micro_slices), 0.0)
+        remaining = qty
+        for i in range(self.micro_slices):
+            q = slice_qty if i < self.micro_slices - 1 else remaining
+            if q <= 0:
+                break
+            out.append(q)
+            remaining -= q
+        return out
+
+    def _compute_atr(self, st: SymbolState) -> Optional[float]:
         if self._atr_window <= 0:
             return None
-        dq = self._ohlc.get(sym)
-        if not dq or len(dq) < self._atr_window + 1:
+        dq = st.ohlc
+        if len(dq) < self._atr_window + 1:
             return None
         it = iter(dq)
         prev_hi, prev_lo, prev_close = next(it)
@@ -612,4 +654,4 @@ class StrategyRouter:
             )
 
 
-__all__ = ["StrategyRouter"]
+__all__ = ["StrategyRouter", "SymbolState", "TradeState"]
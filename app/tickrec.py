@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+# Fixed-width columns of one chunk; each is stored contiguously (column-major)
+COLUMNS: List[Tuple[str, str]] = [
+    ("ts", "<f8"),
+    ("sym", "<u2"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("last", "<f8"),
+    ("volume", "<f8"),
+]
+RECORD_BYTES = sum(np.dtype(t).itemsize for _, t in COLUMNS)
+
+# Chunk frame: magic, records, symbol table bytes, compressed payload bytes
+_FRAME = struct.Struct("<4sIII")
+_MAGIC = b"TCK1"
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class TickRecorder:
+    """Append L1 ticks to compressed, chunked per-day files under `root`.
+
+    Ticks are buffered per column and written every `chunk_records`
+    records, `flush_s` seconds or UTC day change as one self-contained
+    frame (symbol table + zlib-compressed fixed-width columns) appended to
+    ``<root>/<YYYY-MM-DD>.ticks``. A frame cut short by a crash is ignored
+    on replay. Missing bid/ask/volume are stored as NaN.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        chunk_records: int = 4096,
+        flush_s: float = 5.0,
+        level: int = 1,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_records = max(1, int(chunk_records))
+        self.flush_s = max(0.0, float(flush_s))
+        self.level = int(level)
+        self.records = 0
+        self.bytes_written = 0
+        self._reset()
+        self._day: Optional[str] = None
+        self._last_flush = time.monotonic()
+
+    def _reset(self) -> None:
+        self._cols: Dict[str, List[float]] = {name: [] for name, _ in COLUMNS}
+        self._syms: Dict[str, int] = {}
+
+    def record(self, l1: Dict[str, Any]) -> None:
+        ts = float(l1.get("ts", 0.0) or 0.0)
+        day = _day(ts)
+        if day != self._day:
+            self.flush()
+            self._day = day
+        sym = str(l1["symbol"])
+        sid = self._syms.get(sym)
+        if sid is None:
+            sid = self._syms[sym] = len(self._syms)
+        cols = self._cols
+        cols["ts"].append(ts)
+        cols["sym"].append(sid)
+        for name in ("bid", "ask", "last", "volume"):
+            v = l1.get(name)
+            cols[name].append(np.nan if v is None else v)
+        self.records += 1
+        if (
+            len(cols["ts"]) >= self.chunk_records
+            or time.monotonic() - self._last_flush >= self.flush_s
+        ):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered ticks as one frame; returns the records written."""
+        self._last_flush = time.monotonic()
+        n = len(self._cols["ts"])
+        if n == 0 or self._day is None:
+            return 0
+        payload = b"".join(
+            np.asarray(self._cols[name], dtype=dt).tobytes() for name, dt in COLUMNS
+        )
+        packed = zlib.compress(payload, self.level)
+        symtab = "\n".join(self._syms).encode("utf-8")
+        frame = _FRAME.pack(_MAGIC, n, len(symtab), len(packed)) + symtab + packed
+        with open(self.root / f"{self._day}.ticks", "ab") as f:
+            f.write(frame)
+        self.bytes_written += len(frame)
+        self._reset()
+        return n
+
+    def close(self) -> None:
+        self.flush()
+
+    async def tap(
+        self, ticks: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Pass a tick stream through unchanged, recording every tick."""
+        try:
+            async for l1 in ticks:
+                self.record(l1)
+                yield l1
+        finally:
+            self.close()
+
+
+class TickReplay:
+    """Stream recorded ticks back in time order, optionally filtered.
+
+    Chunks are decoded whole with ``np.frombuffer`` (no per-record
+    parsing); records are materialized as L1 dicts only on the way out.
+    `stream` paces them at `speed` x real time (0 = as fast as possible).
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        symbols: Optional[List[str]] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.symbols = set(symbols) if symbols else None
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+
+    def files(self) -> List[Path]:
+        lo = _day(self.start_ms / 1000.0) if self.start_ms is not None else ""
+        hi = _day(self.end_ms / 1000.0) if self.end_ms is not None else "~"
+        return [p for p in sorted(self.root.glob("*.ticks")) if lo <= p.stem <= hi]
+
+    @staticmethod
+    def _frames(path: Path) -> Iterator[Tuple[List[str], Dict[str, np.ndarray]]]:
+        data = path.read_bytes()
+        pos = 0
+        while pos + _FRAME.size <= len(data):
+            magic, n, sym_len, pay_len = _FRAME.unpack_from(data, pos)
+            end = pos + _FRAME.size + sym_len + pay_len
+            if magic != _MAGIC or end > len(data):
+                logger.warning(f"{path.name}: stopping at damaged frame @{pos}")
+                return
+            body = pos + _FRAME.size
+            syms = data[body : body + sym_len].decode("utf-8").split("\n")
+            raw = zlib.decompress(data[body + sym_len : end])
+            cols: Dict[str, np.ndarray] = {}
+            off = 0
+            for name, dt in COLUMNS:
+                cols[name] = np.frombuffer(raw, dtype=dt, count=n, offset=off)
+                off += n * np.dtype(dt).itemsize
+            yield syms, cols
+            pos = end
+
+    def chunks(self) -> Iterator[List[Dict[str, Any]]]:
+        """Filtered ticks, one decoded chunk at a time."""
+        for path in self.files():
+            for syms, cols in self._frames(path):
+                mask = np.ones(len(cols["ts"]), dtype=bool)
+                if self.start_ms is not None:
+                    mask &= cols["ts"] * 1000.0 >= self.start_ms
+                if self.end_ms is not None:
+                    mask &= cols["ts"] * 1000.0 <= self.end_ms
+                if self.symbols is not None:
+                    keep = [i for i, s in enumerate(syms) if s in self.symbols]
+                    mask &= np.isin(cols["sym"], keep)
+                if not mask.any():
+                    continue
+                out = {name: cols[name][mask] for name, _ in COLUMNS}
+                lists: Dict[str, List[Any]] = {}
+                for name in ("bid", "ask", "last", "volume"):
+                    arr = out[name]
+                    lst = arr.tolist()
+                    if np.isnan(arr).any():
+                        lst = [None if v != v else v for v in lst]
+                    lists[name] = lst
+                names = [syms[i] for i in out["sym"].tolist()]
+                yield [
+                    {
+                        "ts": ts,
+                        "symbol": sym,
+                        "bid": bid,
+                        "ask": ask,
+                        "last": last,
+                        "volume": vol,
+                    }
+                    for ts, sym, bid, ask, last, vol in zip(
+                        out["ts"].tolist(),
+                        names,
+                        lists["bid"],
+                        lists["ask"],
+                        lists["last"],
+                        lists["volume"],
+                    )
+                ]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self.chunks():
+            yield from chunk
+
+    async def stream(self, speed: float = 0.0) -> AsyncIterator[Dict[str, Any]]:
+        """Replay at `speed` x the recorded pace; 0 yields as fast as possible."""
+        t0: Optional[Tuple[float, float]] = None  # (first tick ts, wall start)
+        for chunk in self.chunks():
+            if speed <= 0:
+                for l1 in chunk:
+                    yield l1
+                await asyncio.sleep(0)  # let other tasks run between chunks
+                continue
+            for l1 in chunk:
+                if t0 is None:
+                    t0 = (l1["ts"], time.monotonic())
+                delay = t0[1] + (l1["ts"] - t0[0]) / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                yield l1
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Replay recorded ticks (load generator)")
+    p.add_argument("root", type=str, help="Tick recording directory")
+    p.add_argument("--symbols", type=str, default="", help="Comma-separated filter")
+    p.add_argument("--speed", type=float, default=0.0, help="x real time; 0 = max")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ns = _parse_args(argv)
+    symbols = [s.strip() for s in ns.symbols.split(",") if s.strip()] or None
+    replay = TickReplay(ns.root, symbols=symbols)
+
+    async def drain() -> int:
+        n = 0
+        async for _ in replay.stream(ns.speed):
+            n += 1
+        return n
+
+    t = time.perf_counter()
+    n = asyncio.run(drain())
+    dt = time.perf_counter() - t
+    print(f"{n} ticks in {dt:.3f}s ({n / max(dt, 1e-9):,.0f} ticks/s)")
+    return 0
+
+
+__all__ = ["COLUMNS", "RECORD_BYTES", "TickRecorder", "TickReplay"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import datetime as dt
-from typing import Any, Dict
+from typing import Any, Dict, List
 import os as _os
 
 from fastapi import Body, Depends, FastAPI, Response
 from fastapi.responses import ORJSONResponse
 from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
-from intradyne.api.deps import require_api_key
+from intradyne.api.deps import is_halted, require_api_key
+from intradyne.api.deps import set_halt as _set_shared_halt
 from intradyne.api.ratelimit import general_rate_limit
+from intradyne.core.config import get_settings, install_reload_signal
 from intradyne.core.logging import setup_logging
+from src.data.price_hub import HubSubscription, watch_prices
+from src.data.sentiment import fetch_enabled as sentiment_fetch_enabled
+from src.data.sentiment import get_sentiment_refresher
 
 from .. import __version__
 
@@ -25,8 +30,6 @@ from .routes import research as research_routes  # type: ignore
 
 app = FastAPI(title="Intradyne API", default_response_class=ORJSONResponse)
 
-_halt_enabled = False
-
 
 @app.get("/version")
 async def version() -> Dict[str, Any]:
@@ -49,14 +52,14 @@ async def readyz() -> Dict[str, Any]:
 
 @app.get("/admin/halt")
 async def get_halt() -> Dict[str, Any]:
-    return {"enabled": _halt_enabled}
+    return {"enabled": is_halted()}
 
 
 @app.post("/admin/halt")
 async def set_halt(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
-    global _halt_enabled
-    _halt_enabled = bool(payload.get("enabled", False))
-    return {"enabled": _halt_enabled}
+    # Shared with the order routes (and other workers, per STATE_BACKEND)
+    _set_shared_halt(bool(payload.get("enabled", False)))
+    return {"enabled": is_halted()}
 
 
 @app.get("/metrics")
@@ -65,10 +68,30 @@ async def metrics() -> Response:
     return Response(content=data, media_type=CONTENT_TYPE_LATEST)
 
 
+# Whitelist price subscription held for the app's lifetime
+_WATCH: List[HubSubscription] = []
+
+
 # Logging setup and dependencies
 @app.on_event("startup")
 def _startup_logging() -> None:
     setup_logging(_os.getenv("LOG_LEVEL"))
+    # SIGHUP reloads the cached settings snapshot
+    install_reload_signal()
+    if sentiment_fetch_enabled():
+        get_sentiment_refresher().start()
+    # Guardrail price checks read the history this keeps filled
+    settings = get_settings()
+    sub = watch_prices(settings.allowed_crypto_list(), settings.PRICE_WATCH_S)
+    if sub is not None:
+        _WATCH.append(sub)
+
+
+@app.on_event("shutdown")
+def _stop_price_watch() -> None:
+    while _WATCH:
+        sub = _WATCH.pop()
+        sub.hub.unsubscribe(sub)
 
 
 # API auth: default-on in production, else env-driven
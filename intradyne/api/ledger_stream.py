@@ -0,0 +1,4 @@
+"""Compatibility shim routing to src implementation."""
+
+# ruff: noqa: F401, F403
+from src.intradyne.api.ledger_stream import *
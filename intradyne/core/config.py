@@ -1,7 +1,15 @@
 """Forwarder to canonical config in src/core/config.py.
 
-Keeps public API: `load_settings()` and `Settings` type for compatibility.
+Keeps public API: `load_settings()` and `Settings` type for compatibility,
+plus the cached snapshot helpers (`get_settings`, `reload_settings`).
 """
 
 # ruff: noqa: F401
-from src.core.config import Settings, load_settings
+from src.core.config import (
+    Settings,
+    get_settings,
+    install_reload_signal,
+    load_settings,
+    reload_settings,
+    settings_version,
+)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import threading
 from typing import List, Optional
 
 
@@ -44,6 +45,7 @@ class Settings(BaseSettings):  # type: ignore[misc]
     FLASH_CRASH_PCT: float = 0.30
     VAR_1D_MAX: float = 0.05
     KILL_SWITCH_BREACHES: int = 3
+    BATCH_NOTIONAL_MAX: float = 0.0
 
     # Allowed symbols (comma-separated). Accepts either BASE or BASE/QUOTE.
     # Default Shariah-compliant crypto whitelist (spot-only)
@@ -56,12 +58,35 @@ class Settings(BaseSettings):  # type: ignore[misc]
     LOG_LEVEL: str = "INFO"
     EXPLAIN_LEDGER_PATH: str = "explainability_ledger.jsonl"
 
+    # In-process price history backing the guardrail PriceFeed
+    PRICE_HISTORY_RETENTION_S: float = 7200.0
+    PRICE_HISTORY_MAX_POINTS: int = 20000
+    # Optional JSONL tick file replayed into the history at startup
+    PRICE_REPLAY_PATH: str = ""
+    # Last-price lookups (/data/price, price hub) are cached this long
+    PRICE_CACHE_TTL_S: float = 1.0
+    # The API polls the whitelist into the price history this often (0: off)
+    PRICE_WATCH_S: float = 5.0
+    # Equity time series (raw points + rollups) backing the guardrail RiskData
+    EQUITY_DB_PATH: str = "data/equity.sqlite"
+    # Pre-trade portfolio VaR: bar width sampled from the price history
+    # (0 disables) and bars of returns needed before it replaces equity VaR
+    PORTFOLIO_VAR_BAR_S: float = 3600.0
+    PORTFOLIO_VAR_MIN_BARS: int = 24
+    # Cross-worker state (halt, kill-switch, breach sequence, limiter):
+    # memory (per process) | sqlite (single host) | redis (uses REDIS_URL)
+    STATE_BACKEND: str = "memory"
+    STATE_SQLITE_PATH: str = "data/state.sqlite"
+
     # API and rate limits
     RATE_LIMIT_WINDOW: int = 60
     RATE_LIMIT_REQS: int = 120
     # AI endpoints can override rate limits; fallback to global if unset
     AI_RATE_LIMIT_WINDOW: int | None = None
     AI_RATE_LIMIT_REQS: int | None = None
+    # WebSocket send token bucket (tokens/s, bucket size)
+    WS_BUCKET_RATE: float = 50.0
+    WS_BUCKET_BURST: float = 100.0
 
     # Broker creds (env only; never commit secrets)
     BITGET_API_KEY: Optional[str] = None
@@ -134,6 +159,8 @@ class Settings(BaseSettings):  # type: ignore[misc]
     SENTIMENT_SIZE_MIN: float = 0.8
     SENTIMENT_SIZE_MAX: float = 1.2
     SENTIMENT_SMOOTH_N: int = 12
+    # Background Fear & Greed refresh cadence (fetching needs SENTIMENT_FETCH=1)
+    SENTIMENT_REFRESH_S: float = 300.0
 
 
 def load_settings() -> Settings:
@@ -153,6 +180,7 @@ def load_settings() -> Settings:
                 self.FLASH_CRASH_PCT = float(env.get("FLASH_CRASH_PCT", "0.30"))
                 self.VAR_1D_MAX = float(env.get("VAR_1D_MAX", "0.05"))
                 self.KILL_SWITCH_BREACHES = int(env.get("KILL_SWITCH_BREACHES", "3"))
+                self.BATCH_NOTIONAL_MAX = float(env.get("BATCH_NOTIONAL_MAX", "0"))
                 self.ALLOWED_SYMBOLS = env.get(
                     "ALLOWED_SYMBOLS",
                     "BTC,ETH,SOL,XRP,ADA,LTC,AVAX,DOT,MATIC,USDT",
@@ -163,6 +191,24 @@ def load_settings() -> Settings:
                 self.EXPLAIN_LEDGER_PATH = env.get(
                     "EXPLAIN_LEDGER_PATH", "explainability_ledger.jsonl"
                 )
+                self.PRICE_HISTORY_RETENTION_S = float(
+                    env.get("PRICE_HISTORY_RETENTION_S", "7200")
+                )
+                self.PRICE_HISTORY_MAX_POINTS = int(
+                    env.get("PRICE_HISTORY_MAX_POINTS", "20000")
+                )
+                self.PRICE_REPLAY_PATH = env.get("PRICE_REPLAY_PATH", "")
+                self.PRICE_CACHE_TTL_S = float(env.get("PRICE_CACHE_TTL_S", "1.0"))
+                self.PRICE_WATCH_S = float(env.get("PRICE_WATCH_S", "5.0"))
+                self.EQUITY_DB_PATH = env.get("EQUITY_DB_PATH", "data/equity.sqlite")
+                self.PORTFOLIO_VAR_BAR_S = float(env.get("PORTFOLIO_VAR_BAR_S", "3600"))
+                self.PORTFOLIO_VAR_MIN_BARS = int(
+                    env.get("PORTFOLIO_VAR_MIN_BARS", "24")
+                )
+                self.STATE_BACKEND = env.get("STATE_BACKEND", "memory")
+                self.STATE_SQLITE_PATH = env.get(
+                    "STATE_SQLITE_PATH", "data/state.sqlite"
+                )
                 self.RATE_LIMIT_WINDOW = int(env.get("RATE_LIMIT_WINDOW", "60"))
                 self.RATE_LIMIT_REQS = int(env.get("RATE_LIMIT_REQS", "120"))
                 self.AI_RATE_LIMIT_WINDOW = (
@@ -171,6 +217,8 @@ def load_settings() -> Settings:
                 self.AI_RATE_LIMIT_REQS = (
                     int(env.get("AI_RATE_LIMIT_REQS", "0")) or None
                 )
+                self.WS_BUCKET_RATE = float(env.get("WS_BUCKET_RATE", "50"))
+                self.WS_BUCKET_BURST = float(env.get("WS_BUCKET_BURST", "100"))
                 self.BITGET_API_KEY = env.get("BITGET_API_KEY")
                 self.BITGET_API_SECRET = env.get("BITGET_API_SECRET")
                 self.BITGET_API_PASSPHRASE = env.get("BITGET_API_PASSPHRASE")
@@ -184,6 +232,7 @@ def load_settings() -> Settings:
                 self.SENTIMENT_SIZE_MIN = float(env.get("SENTIMENT_SIZE_MIN", "0.8"))
                 self.SENTIMENT_SIZE_MAX = float(env.get("SENTIMENT_SIZE_MAX", "1.2"))
                 self.SENTIMENT_SMOOTH_N = int(env.get("SENTIMENT_SMOOTH_N", "12"))
+                self.SENTIMENT_REFRESH_S = float(env.get("SENTIMENT_REFRESH_S", "300"))
 
         s = _Manual()
         return s
@@ -194,4 +243,78 @@ def load_settings() -> Settings:
     return s
 
 
-__all__ = ["Settings", "load_settings"]
+_SNAPSHOT: Optional[Settings] = None
+_VERSION = 0
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Process-wide settings snapshot, loaded on first use.
+
+    Hot paths (rate limiters, status routes) read this instead of calling
+    `load_settings()`, which re-parses env and .env files. Treat the object as
+    read-only; `reload_settings()` swaps in a new one.
+    """
+    s = _SNAPSHOT
+    if s is None:
+        with _SNAPSHOT_LOCK:
+            if _SNAPSHOT is None:
+                _swap(load_settings())
+            s = _SNAPSHOT
+    return s  # type: ignore[return-value]
+
+
+def _swap(s: Settings) -> None:
+    global _SNAPSHOT, _VERSION
+    _SNAPSHOT = s
+    _VERSION += 1
+
+
+def reload_settings() -> Settings:
+    """Re-read env/.env and replace the snapshot; bumps `settings_version()`.
+
+    If loading fails (e.g. missing credentials in production) the error
+    propagates and the previous snapshot stays in place.
+    """
+    s = load_settings()
+    with _SNAPSHOT_LOCK:
+        _swap(s)
+    return s
+
+
+def settings_version() -> int:
+    """Increments on every snapshot swap; 0 until settings are first loaded."""
+    return _VERSION
+
+
+def install_reload_signal() -> bool:
+    """Reload the settings snapshot on SIGHUP (POSIX, main thread only)."""
+    import signal
+
+    if not hasattr(signal, "SIGHUP"):
+        return False
+
+    def _on_hup(_signum, _frame) -> None:  # type: ignore[no-untyped-def]
+        from loguru import logger
+
+        try:
+            reload_settings()
+            logger.info(f"Settings reloaded (version {_VERSION})")
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Settings reload failed, keeping previous: {e}")
+
+    try:
+        signal.signal(signal.SIGHUP, _on_hup)
+    except ValueError:  # not the main thread (e.g. under a test client)
+        return False
+    return True
+
+
+__all__ = [
+    "Settings",
+    "get_settings",
+    "install_reload_signal",
+    "load_settings",
+    "reload_settings",
+    "settings_version",
+]
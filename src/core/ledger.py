@@ -2,52 +2,317 @@ from __future__ import annotations
 
 import hashlib
 import os
-from datetime import datetime
-from typing import Any, Dict, Iterable, Optional
+import struct
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import orjson
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+# Windows byte-range locks are mandatory; lock a byte far past EOF so that
+# readers of the ledger are never blocked.
+_WIN_LOCK_OFFSET = 2**31 - 2
+
+# Sidecar index entry: (record ts in epoch ms, byte offset of the record)
+_IDX_ENTRY = struct.Struct("<qq")
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _ts_ms(value: Any) -> Optional[int]:
+    """Parse a ledger ``ts`` (ISO-8601, optional ``Z``) to naive-UTC epoch ms."""
+    try:
+        dt = datetime.fromisoformat(str(value).rstrip("Z"))
+    except Exception:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((dt - _EPOCH).total_seconds() * 1000)
+
+
+@contextmanager
+def _exclusive(f: IO[bytes]) -> Iterator[None]:
+    """Advisory cross-process lock held for the duration of one append."""
+    fd = f.fileno()
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    os.lseek(fd, _WIN_LOCK_OFFSET, os.SEEK_SET)  # pragma: no cover
+    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # pragma: no cover
+    try:  # pragma: no cover
+        yield
+    finally:  # pragma: no cover
+        os.lseek(fd, _WIN_LOCK_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def iter_lines_reverse(
+    f: IO[bytes], end: Optional[int] = None, block_size: int = 64 * 1024
+) -> Iterator[bytes]:
+    """Yield non-empty lines of a binary file from `end` (default EOF) backwards.
+
+    Reads fixed-size blocks from the end, so cost depends on how many lines
+    the caller consumes rather than on the file size.
+    """
+    if end is None:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+    pos = end
+    partial = b""
+    while pos > 0:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step) + partial
+        lines = chunk.split(b"\n")
+        # The first piece may continue in the previous block
+        partial = lines.pop(0) if pos > 0 else b""
+        for line in reversed(lines):
+            if line.strip():
+                yield line
+    if partial.strip():
+        yield partial
+
 
 class Ledger:
-    """Append-only JSONL ledger with hash chaining."""
+    """Append-only JSONL ledger with hash chaining.
+
+    The chain head is kept in memory and recovered at startup by reading the
+    file backwards, so appends cost O(1) regardless of ledger size. Appends
+    take an advisory file lock and re-read the head if the file grew since
+    our last write, which lets several API worker processes share one file.
 
-    def __init__(self, path: str = "guardrails_ledger.jsonl") -> None:
+    A sparse sidecar index (``<path>.idx``) records the timestamp and byte
+    offset of one record every ``index_stride`` bytes. Time-range reads
+    binary-search it and seek straight to the window, so their cost depends
+    on the window rather than on the total history. Records are assumed to
+    be appended in time order.
+
+    `tail(n)` serves the most recent records from a cached view keyed by
+    file size: our own appends extend it in place, appends by other
+    processes force a reverse re-read of just the last `n` lines.
+    """
+
+    # A whole-file tail view stops growing past this many records
+    TAIL_CACHE_MAX = 1000
+
+    def __init__(
+        self, path: str = "guardrails_ledger.jsonl", index_stride: int = 64 * 1024
+    ) -> None:
         self.path = path
+        self.index_path = f"{path}.idx"
+        self.index_stride = max(1, int(index_stride))
         if not os.path.exists(self.path):
             open(self.path, "a", encoding="utf-8").close()
+        self._lock = threading.Lock()
+        self._size = os.path.getsize(self.path)
+        self._head: Optional[str] = self._read_head(self._size)
+        # Offset of the last indexed record (-1: none yet)
+        self._idx_last = -1
+        self._idx_cache: Tuple[int, List[int], List[int]] = (-1, [], [])
+        # (file size, holds the whole file, records oldest first)
+        self._tail_cache: Tuple[int, bool, List[Dict[str, Any]]] = (-1, False, [])
+        self._sync_index()
 
-    def _last_hash(self) -> Optional[str]:
-        last = None
+    # --- sidecar index ----------------------------------------------------
+
+    def _read_last_index_offset(self) -> int:
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            last = orjson.loads(line).get("hash")
-                        except Exception:
-                            continue
+            with open(self.index_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                end = f.tell() - f.tell() % _IDX_ENTRY.size
+                if end <= 0:
+                    return -1
+                f.seek(end - _IDX_ENTRY.size)
+                return _IDX_ENTRY.unpack(f.read(_IDX_ENTRY.size))[1]
+        except FileNotFoundError:
+            return -1
+
+    def _sync_index(self) -> None:
+        """Bring the sidecar index up to date with the ledger file.
+
+        Only the part of the ledger after the last indexed record is read, so
+        this is cheap except for the first run against a legacy ledger.
+        """
+        try:
+            idx_size = os.path.getsize(self.index_path)
+            if idx_size % _IDX_ENTRY.size:
+                # Drop a torn entry left by an interrupted write
+                os.truncate(self.index_path, idx_size - idx_size % _IDX_ENTRY.size)
+        except FileNotFoundError:
+            pass
+        last = self._read_last_index_offset()
+        if last >= self._size:
+            # Ledger was truncated or replaced: start the index over
+            open(self.index_path, "wb").close()
+            last = -1
+        entries: List[bytes] = []
+        pos = max(last, 0)
+        with open(self.path, "rb") as f:
+            f.seek(pos)
+            for line in f:
+                start, pos = pos, pos + len(line)
+                if pos > self._size:
+                    break
+                if last >= 0 and start - last < self.index_stride:
+                    continue
+                try:
+                    ms = _ts_ms(orjson.loads(line).get("ts"))
+                except Exception:
+                    ms = None
+                if ms is None:
+                    continue
+                entries.append(_IDX_ENTRY.pack(ms, start))
+                last = start
+        if entries:
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(entries))
+        self._idx_last = last
+
+    def _load_index(self) -> Tuple[List[int], List[int]]:
+        try:
+            size = os.path.getsize(self.index_path)
+        except OSError:
+            return [], []
+        size -= size % _IDX_ENTRY.size
+        if size != self._idx_cache[0]:
+            with open(self.index_path, "rb") as f:
+                data = f.read(size)
+            ts: List[int] = []
+            offs: List[int] = []
+            for ms, off in _IDX_ENTRY.iter_unpack(data):
+                ts.append(ms)
+                offs.append(off)
+            self._idx_cache = (size, ts, offs)
+        return self._idx_cache[1], self._idx_cache[2]
+
+    def _seek_offset(self, since_ms: int) -> int:
+        """Byte offset of the last indexed record strictly before ``since``."""
+        ts, offs = self._load_index()
+        i = bisect_left(ts, since_ms)
+        return offs[i - 1] if i > 0 else 0
+
+    def _read_head(self, end: int) -> Optional[str]:
+        try:
+            with open(self.path, "rb") as f:
+                for line in iter_lines_reverse(f, end):
+                    try:
+                        return orjson.loads(line).get("hash")
+                    except Exception:
+                        continue
         except FileNotFoundError:
             return None
-        return last
+        return None
+
+    def _last_hash(self) -> Optional[str]:
+        with self._lock:
+            size = os.path.getsize(self.path)
+            if size != self._size:
+                self._head = self._read_head(size)
+                self._size = size
+            return self._head
+
+    def head(self) -> Optional[str]:
+        """Hash of the newest record (None for an empty ledger)."""
+        return self._last_hash()
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """The last `n` records, oldest first. Callers must not mutate them."""
+        n = max(0, int(n))
+        if n == 0:
+            return []
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        with self._lock:
+            csize, whole, cached = self._tail_cache
+            if csize == size and (whole or len(cached) >= n):
+                return cached[-n:]
+        out: List[Dict[str, Any]] = []
+        with open(self.path, "rb") as f:
+            for line in iter_lines_reverse(f, size):
+                try:
+                    out.append(orjson.loads(line))
+                except Exception:
+                    continue
+                if len(out) >= n:
+                    break
+        out.reverse()
+        with self._lock:
+            if size >= self._tail_cache[0]:
+                self._tail_cache = (size, len(out) < n, out)
+        return out
 
     def append(self, event: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        prev = self._last_hash()
-        rec: Dict[str, Any] = {
-            "ts": datetime.utcnow().isoformat() + "Z",
-            "event": event,
-        }
-        rec.update(payload)
-        rec["hash_prev"] = prev or ""
-        rec["hash"] = self._hash_record(rec)
-        with open(self.path, "a", encoding="utf-8") as f:
-            f.write(
-                orjson.dumps(rec, option=orjson.OPT_SORT_KEYS).decode("utf-8") + "\n"
-            )
-        return rec
+        return self.append_many([(event, payload)])[0]
 
-    def iter_recent(self, since: datetime) -> Iterable[Dict[str, Any]]:
+    def append_many(
+        self, items: Sequence[Tuple[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Chain and write several (event, payload) records in one locked append."""
+        if not items:
+            return []
+        now = datetime.utcnow().isoformat() + "Z"
+        recs: List[Dict[str, Any]] = []
+        for event, payload in items:
+            rec: Dict[str, Any] = {"ts": now, "event": event}
+            rec.update(payload)
+            recs.append(rec)
+        with self._lock, open(self.path, "ab") as f, _exclusive(f):
+            size = os.fstat(f.fileno()).st_size
+            if size != self._size:
+                # Another writer appended since our last record
+                self._head = self._read_head(size)
+                self._idx_last = self._read_last_index_offset()
+            lines: List[bytes] = []
+            entries: List[bytes] = []
+            head, pos = self._head, size
+            for rec in recs:
+                rec["hash_prev"] = head or ""
+                rec["hash"] = head = self._hash_record(rec)
+                line = orjson.dumps(rec, option=orjson.OPT_SORT_KEYS) + b"\n"
+                if self._idx_last < 0 or pos - self._idx_last >= self.index_stride:
+                    ms = _ts_ms(rec["ts"])
+                    if ms is not None:
+                        entries.append(_IDX_ENTRY.pack(ms, pos))
+                        self._idx_last = pos
+                lines.append(line)
+                pos += len(line)
+            f.write(b"".join(lines))
+            f.flush()
+            self._head, self._size = head, pos
+            csize, whole, cached = self._tail_cache
+            if csize == size:
+                # Extend the tail view with what we wrote, keeping its length
+                keep = len(cached)
+                cached = cached + [orjson.loads(line) for line in lines]
+                if whole and len(cached) > self.TAIL_CACHE_MAX:
+                    whole, keep = False, self.TAIL_CACHE_MAX
+                if not whole:
+                    cached = cached[-keep:]
+                self._tail_cache = (pos, whole, cached)
+            if entries:
+                with open(self.index_path, "ab") as idx:
+                    idx.write(b"".join(entries))
+        return recs
+
+    def _iter_from(self, since: datetime) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        since_ms = _ts_ms(since.isoformat()) or 0
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
+            with open(self.path, "rb") as f:
+                f.seek(self._seek_offset(since_ms))
                 for line in f:
                     if not line.strip():
                         continue
@@ -55,15 +320,35 @@ class Ledger:
                         rec = orjson.loads(line)
                     except Exception:
                         continue
-                    try:
-                        ts = datetime.fromisoformat(str(rec.get("ts", "")).rstrip("Z"))
-                    except Exception:
-                        continue
-                    if ts >= since:
-                        yield rec
+                    ms = _ts_ms(rec.get("ts", ""))
+                    if ms is not None and ms >= since_ms:
+                        yield ms, rec
         except FileNotFoundError:
             return
 
+    def iter_recent(self, since: datetime) -> Iterable[Dict[str, Any]]:
+        for _ms, rec in self._iter_from(since):
+            yield rec
+
+    def count_since(
+        self, sinces: Sequence[datetime], event: Optional[str] = None
+    ) -> List[int]:
+        """Count records newer than each cut-off in one pass over the widest window.
+
+        With ``event`` set, only records of that event type are counted.
+        """
+        if not sinces:
+            return []
+        cuts = [_ts_ms(s.isoformat()) or 0 for s in sinces]
+        counts = [0] * len(cuts)
+        for ms, rec in self._iter_from(min(sinces)):
+            if event is not None and rec.get("event") != event:
+                continue
+            for i, cut in enumerate(cuts):
+                if ms >= cut:
+                    counts[i] += 1
+        return counts
+
     @staticmethod
     def _hash_record(rec: Dict[str, Any]) -> str:
         # Exclude self-hash if present to compute stable content hash
@@ -75,4 +360,4 @@ class Ledger:
         return hashlib.sha256(data).hexdigest()
 
 
-__all__ = ["Ledger"]
+__all__ = ["Ledger", "iter_lines_reverse"]
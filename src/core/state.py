@@ -0,0 +1,480 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+
+class StateBackend:
+    """Key/value store shared by all API workers.
+
+    `version()` must be cheap (no network round trip): it changes whenever
+    any process sets a key or makes a notifying increment, and
+    `SharedState` uses it to decide when its local cache is stale.
+    """
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def incr(
+        self,
+        key: str,
+        amount: int = 1,
+        ttl: Optional[float] = None,
+        notify: bool = False,
+    ) -> int:
+        """Atomically add `amount`; a new key expires after `ttl` seconds.
+
+        Only `set` and `notify=True` increments advance `version()`, so
+        high-rate counters (rate limiting) do not invalidate reader caches.
+        """
+        raise NotImplementedError
+
+    def items(self, prefix: str) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def version(self) -> int:
+        raise NotImplementedError
+
+    def gcra(self, key: str, interval: float, tolerance: float) -> float:
+        """Atomic GCRA check on the theoretical arrival time stored at `key`.
+
+        Returns 0.0 when the request is allowed (and advances the state by
+        `interval`), else the seconds until it would be. Never notifies.
+        """
+        raise NotImplementedError
+
+
+def gcra_step(
+    tat: Optional[float], now: float, interval: float, tolerance: float
+) -> Tuple[Optional[float], float]:
+    """One GCRA decision: (new theoretical arrival time or None, retry-after)."""
+    tat = now if tat is None or tat < now else tat
+    if tat - now > tolerance + 1e-9:  # float slack
+        return None, tat - now - tolerance
+    return tat + interval, 0.0
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local backend (single worker, tests)."""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, str] = {}
+        self._expires: Dict[str, float] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float) -> bool:
+        exp = self._expires.get(key)
+        if exp is not None and exp <= now:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return False
+        return key in self._data
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._data.get(key) if self._live(key, time.time()) else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._expires.pop(key, None)
+            self._version += 1
+
+    def incr(
+        self,
+        key: str,
+        amount: int = 1,
+        ttl: Optional[float] = None,
+        notify: bool = False,
+    ) -> int:
+        now = time.time()
+        with self._lock:
+            if not self._live(key, now):
+                self._data[key] = "0"
+                if ttl:
+                    self._expires[key] = now + ttl
+            val = int(self._data[key]) + int(amount)
+            self._data[key] = str(val)
+            if notify:
+                self._version += 1
+            return val
+
+    def items(self, prefix: str) -> Dict[str, str]:
+        now = time.time()
+        with self._lock:
+            return {
+                k: v
+                for k, v in list(self._data.items())
+                if k.startswith(prefix) and self._live(k, now)
+            }
+
+    def version(self) -> int:
+        return self._version
+
+    def gcra(self, key: str, interval: float, tolerance: float) -> float:
+        now = time.time()
+        with self._lock:
+            raw = self._data.get(key) if self._live(key, now) else None
+            tat, retry = gcra_step(
+                float(raw) if raw is not None else None, now, interval, tolerance
+            )
+            if tat is not None:
+                self._data[key] = repr(tat)
+                self._expires[key] = tat
+            return retry
+
+
+class SQLiteStateBackend(StateBackend):
+    """Single-host backend: a WAL-mode SQLite file shared by all workers.
+
+    Notifying writes bump a ``meta:version`` row in the same transaction.
+    `version()` first checks `PRAGMA data_version`, which is answered from
+    the local WAL index; only when some process committed does it re-read
+    the version row.
+    """
+
+    _META = "meta:version"
+
+    def __init__(self, path: str = "data/state.sqlite") -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires REAL)"
+        )
+        self._data_version: Optional[int] = None
+        self._version = 0
+        self._incrs = 0
+
+    def _bump_meta(self) -> None:
+        self._conn.execute(
+            "INSERT INTO kv (key, value, expires) VALUES (?, '1', NULL)"
+            " ON CONFLICT(key) DO UPDATE SET value = CAST(kv.value AS INTEGER) + 1",
+            (self._META,),
+        )
+        # data_version ignores this connection's own commits
+        self._data_version = None
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO kv (key, value, expires) VALUES (?, ?, NULL)"
+                    " ON CONFLICT(key) DO UPDATE SET value = excluded.value,"
+                    " expires = NULL",
+                    (key, value),
+                )
+                self._bump_meta()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def incr(
+        self,
+        key: str,
+        amount: int = 1,
+        ttl: Optional[float] = None,
+        notify: bool = False,
+    ) -> int:
+        now = time.time()
+        exp = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "INSERT INTO kv (key, value, expires) VALUES (?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET"
+                    " value = CASE WHEN kv.expires IS NOT NULL AND kv.expires <= ?"
+                    "   THEN excluded.value ELSE CAST(kv.value AS INTEGER) + ? END,"
+                    " expires = CASE WHEN kv.expires IS NOT NULL AND kv.expires <= ?"
+                    "   THEN excluded.expires ELSE kv.expires END"
+                    " RETURNING value",
+                    (key, str(int(amount)), exp, now, int(amount), now),
+                ).fetchone()
+                if notify:
+                    self._bump_meta()
+                self._incrs += 1
+                if self._incrs % 1000 == 0:
+                    self._conn.execute("DELETE FROM kv WHERE expires <= ?", (now,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return int(row[0])
+
+    def items(self, prefix: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE key >= ? AND key < ?"
+                " AND (expires IS NULL OR expires > ?)",
+                (prefix, prefix + "\uffff", time.time()),
+            ).fetchall()
+        return {k: v for k, v in rows}
+
+    def gcra(self, key: str, interval: float, tolerance: float) -> float:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM kv WHERE key = ?", (key,)
+                ).fetchone()
+                tat, retry = gcra_step(
+                    float(row[0]) if row else None, now, interval, tolerance
+                )
+                if tat is not None:
+                    # The key is idle (equivalent to absent) once its TAT passes
+                    self._conn.execute(
+                        "INSERT INTO kv (key, value, expires) VALUES (?, ?, ?)"
+                        " ON CONFLICT(key) DO UPDATE SET value = excluded.value,"
+                        " expires = excluded.expires",
+                        (key, repr(tat), tat),
+                    )
+                self._incrs += 1
+                if self._incrs % 1000 == 0:
+                    self._conn.execute("DELETE FROM kv WHERE expires <= ?", (now,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return retry
+
+    def version(self) -> int:
+        with self._lock:
+            dv = int(self._conn.execute("PRAGMA data_version").fetchone()[0])
+            if dv != self._data_version:
+                row = self._conn.execute(
+                    "SELECT value FROM kv WHERE key = ?", (self._META,)
+                ).fetchone()
+                self._version = int(row[0]) if row else 0
+                self._data_version = dv
+            return self._version
+
+
+_INCR_LUA = """
+local v = redis.call('INCRBY', KEYS[1], ARGV[1])
+if v == tonumber(ARGV[1]) and tonumber(ARGV[2]) > 0 then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return v
+"""
+
+
+# GCRA in one round trip. Server time keeps workers on different hosts
+# consistent; floats travel as strings (Lua numbers truncate on return).
+GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tat < now then tat = now end
+if tat - now > tolerance + 1e-9 then
+  return tostring(tat - now - tolerance)
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return '0'
+"""
+
+
+class RedisStateBackend(StateBackend):
+    """Multi-host backend on Redis.
+
+    Writes publish on ``<namespace>:state``; a listener thread bumps a local
+    version counter, so `version()` normally never leaves the process.
+    Notifying writes also increment a ``meta:version`` key, which
+    `version()` re-reads at most every `poll_s` seconds: a message lost
+    while the subscriber reconnects delays a refresh, it does not lose it.
+    """
+
+    _META = "meta:version"
+
+    def __init__(
+        self, url: str, namespace: str = "intradyne", poll_s: float = 5.0
+    ) -> None:
+        import redis  # optional dependency
+
+        self._r = redis.Redis.from_url(url, decode_responses=True)
+        self._ns = namespace
+        self._channel = f"{namespace}:state"
+        self._incr = self._r.register_script(_INCR_LUA)
+        self._gcra = self._r.register_script(GCRA_LUA)
+        self._version = 0
+        self.poll_s = max(0.0, float(poll_s))
+        self._meta: Optional[str] = None
+        self._polled = float("-inf")
+        self._pubsub = self._r.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self._channel: self._on_message})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _on_message(self, _msg: object) -> None:
+        self._version += 1
+
+    def _k(self, key: str) -> str:
+        return f"{self._ns}:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        return self._r.get(self._k(key))
+
+    def set(self, key: str, value: str) -> None:
+        pipe = self._r.pipeline()
+        pipe.set(self._k(key), value)
+        pipe.incr(self._k(self._META))
+        pipe.publish(self._channel, key)
+        pipe.execute()
+        self._version += 1
+
+    def incr(
+        self,
+        key: str,
+        amount: int = 1,
+        ttl: Optional[float] = None,
+        notify: bool = False,
+    ) -> int:
+        ms = int(ttl * 1000) if ttl else 0
+        val = int(self._incr(keys=[self._k(key)], args=[int(amount), ms]))
+        if notify:
+            pipe = self._r.pipeline()
+            pipe.incr(self._k(self._META))
+            pipe.publish(self._channel, key)
+            pipe.execute()
+            self._version += 1
+        return val
+
+    def items(self, prefix: str) -> Dict[str, str]:
+        keys = list(self._r.scan_iter(match=self._k(prefix) + "*", count=500))
+        if not keys:
+            return {}
+        vals = self._r.mget(keys)
+        n = len(self._ns) + 1
+        return {k[n:]: v for k, v in zip(keys, vals) if v is not None}
+
+    def gcra(self, key: str, interval: float, tolerance: float) -> float:
+        return float(self._gcra(keys=[self._k(key)], args=[interval, tolerance]))
+
+    def version(self) -> int:
+        now = time.monotonic()
+        if now - self._polled >= self.poll_s:
+            self._polled = now
+            try:
+                meta = self._r.get(self._k(self._META))
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"State version poll failed: {e}")
+            else:
+                if meta != self._meta:
+                    self._meta = meta
+                    self._version += 1
+        return self._version
+
+
+class SharedState:
+    """Cached view of flags and sequence counters over a `StateBackend`.
+
+    Reads are served from a local snapshot of the ``flag:`` and ``seq:``
+    keys, refreshed only when the backend version changes.
+    """
+
+    _PREFIXES = ("flag:", "seq:")
+
+    def __init__(self, backend: StateBackend) -> None:
+        self.backend = backend
+        self._cache: Dict[str, str] = {}
+        self._cached_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _view(self) -> Dict[str, str]:
+        v = self.backend.version()
+        if v != self._cached_version:
+            with self._lock:
+                fresh: Dict[str, str] = {}
+                for p in self._PREFIXES:
+                    fresh.update(self.backend.items(p))
+                self._cache = fresh
+                self._cached_version = v
+        return self._cache
+
+    def get_flag(self, name: str, default: bool = False) -> bool:
+        raw = self._view().get(f"flag:{name}")
+        return default if raw is None else raw == "1"
+
+    def set_flag(self, name: str, enabled: bool) -> None:
+        self.backend.set(f"flag:{name}", "1" if enabled else "0")
+
+    def seq(self, name: str) -> int:
+        return int(self._view().get(f"seq:{name}", 0))
+
+    def bump(self, name: str) -> int:
+        return self.backend.incr(f"seq:{name}", notify=True)
+
+    @property
+    def shared(self) -> bool:
+        """True when state is visible to other processes."""
+        return not isinstance(self.backend, MemoryStateBackend)
+
+
+def build_backend(
+    kind: str, sqlite_path: str, redis_url: Optional[str]
+) -> StateBackend:
+    kind = (kind or "memory").strip().lower()
+    try:
+        if kind == "redis" and redis_url:
+            return RedisStateBackend(redis_url)
+        if kind == "sqlite":
+            return SQLiteStateBackend(sqlite_path)
+    except Exception as e:  # noqa: BLE001
+        logger.warning(f"State backend {kind!r} unavailable ({e}); using memory")
+    return MemoryStateBackend()
+
+
+_STATE: Optional[SharedState] = None
+
+
+def get_shared_state() -> SharedState:
+    global _STATE
+    if _STATE is None:
+        from src.core.config import get_settings
+
+        s = get_settings()
+        _STATE = SharedState(
+            build_backend(s.STATE_BACKEND, s.STATE_SQLITE_PATH, s.REDIS_URL)
+        )
+    return _STATE
+
+
+__all__ = [
+    "GCRA_LUA",
+    "MemoryStateBackend",
+    "RedisStateBackend",
+    "SQLiteStateBackend",
+    "SharedState",
+    "StateBackend",
+    "build_backend",
+    "gcra_step",
+    "get_shared_state",
+]
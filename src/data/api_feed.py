@@ -1,11 +1,9 @@
 from __future__ import annotations
 
-import time
 from typing import Dict, Iterable
 
-import requests
-
 from src.core.utils import safe_log_key
+from src.data.price_client import get_price_client
 
 
 def _map_symbol(sym: str) -> str:
@@ -13,26 +11,8 @@ def _map_symbol(sym: str) -> str:
 
 
 def get_prices(symbols: Iterable[str]) -> Dict[str, float]:
-    out: Dict[str, float] = {}
-    for s in symbols:
-        if s == "USDT":
-            out[s] = 1.0
-            continue
-        mapped = _map_symbol(s)
-        try:
-            r = requests.get(
-                "https://api.binance.com/api/v3/ticker/price",
-                params={"symbol": mapped},
-                timeout=5,
-            )
-            r.raise_for_status()
-            px = float(r.json()["price"])  # type: ignore[index]
-            out[s] = px
-        except Exception:
-            # fallback to 0 to skip
-            out[s] = out.get(s, 0.0)
-        time.sleep(0.2)
-    return out
+    # Shared pooled client: one bulk request for uncached symbols
+    return get_price_client().get_prices_sync(symbols)
 
 
 def place_order(
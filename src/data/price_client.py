@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import orjson
+
+_BINANCE_API = "https://api.binance.com"
+
+
+def _venue_symbol(sym: str) -> str:
+    return sym.replace("/", "").upper()
+
+
+class PriceClient:
+    """Binance last prices: pooled connections, bulk requests, short TTL cache.
+
+    A lookup serves fresh cache entries locally and fetches all missing
+    symbols in one ``/api/v3/ticker/price?symbols=[...]`` call. Concurrent
+    lookups for the same missing set share one in-flight request. A batch
+    rejected as a whole (unknown symbol) is retried per symbol. Failed
+    symbols soft-fail to 0.0 and are not cached.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 1.0,
+        timeout: float = 5.0,
+        base_url: str = _BINANCE_API,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        sync_transport: Optional[httpx.BaseTransport] = None,
+    ) -> None:
+        self.ttl_s = max(0.0, float(ttl_s))
+        self.timeout = float(timeout)
+        self.base_url = base_url.rstrip("/")
+        self._transport = transport
+        self._sync_transport = sync_transport
+        self._cache: Dict[str, Tuple[float, float]] = {}  # symbol -> (expiry, px)
+        self.requests = 0
+        # The async client and in-flight tasks belong to one event loop
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[Tuple[str, ...], asyncio.Task[Dict[str, float]]] = {}
+        self._sclient: Optional[httpx.Client] = None
+        self._sync_lock = threading.Lock()
+
+    # --- cache --------------------------------------------------------------
+
+    def _split(self, symbols: Iterable[str]) -> Tuple[Dict[str, float], List[str]]:
+        now = time.monotonic()
+        hits: Dict[str, float] = {}
+        missing: List[str] = []
+        for s in dict.fromkeys(symbols):
+            if s.upper() == "USDT":
+                hits[s] = 1.0
+                continue
+            ent = self._cache.get(s)
+            if ent is not None and ent[0] > now:
+                hits[s] = ent[1]
+            else:
+                missing.append(s)
+        return hits, missing
+
+    def _store(self, prices: Dict[str, float]) -> None:
+        exp = time.monotonic() + self.ttl_s
+        for s, px in prices.items():
+            if px > 0:
+                self._cache[s] = (exp, px)
+
+    def _bulk_params(self, symbols: List[str]) -> Dict[str, str]:
+        if len(symbols) == 1:
+            return {"symbol": _venue_symbol(symbols[0])}
+        venue = [_venue_symbol(s) for s in symbols]
+        return {"symbols": orjson.dumps(venue).decode()}
+
+    @staticmethod
+    def _parse(symbols: List[str], data: Any) -> Dict[str, float]:
+        rows = data if isinstance(data, list) else [data]
+        by_venue = {str(r.get("symbol")): float(r["price"]) for r in rows}
+        return {s: by_venue.get(_venue_symbol(s), 0.0) for s in symbols}
+
+    # --- async ----------------------------------------------------------------
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._loop is not loop:
+            if self._aclient is not None:
+                self._discard(self._aclient, self._loop)
+            self._aclient = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, transport=self._transport
+            )
+            self._loop = loop
+            self._inflight = {}
+        return self._aclient
+
+    @staticmethod
+    def _discard(
+        client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        """Close a client left behind by another event loop."""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+
+        async def close() -> None:
+            # The old loop is gone: its sockets can only be released here
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+        asyncio.ensure_future(close())
+
+    async def _get(self, symbols: List[str]) -> Dict[str, float]:
+        client = self._async_client()
+        self.requests += 1
+        r = await client.get("/api/v3/ticker/price", params=self._bulk_params(symbols))
+        if r.status_code == 400 and len(symbols) > 1:
+            # One bad symbol fails the batch: isolate it
+            parts = await asyncio.gather(*(self._get([s]) for s in symbols))
+            return {k: v for p in parts for k, v in p.items()}
+        if r.status_code >= 400:
+            return {s: 0.0 for s in symbols}
+        return self._parse(symbols, r.json())
+
+    async def _fetch(self, key: Tuple[str, ...]) -> Dict[str, float]:
+        try:
+            prices = await self._get(list(key))
+        except Exception:
+            prices = {s: 0.0 for s in key}
+        self._store(prices)
+        return prices
+
+    async def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        syms = list(symbols)
+        hits, missing = self._split(syms)
+        if missing:
+            self._async_client()  # resets in-flight state on a new loop
+            key = tuple(sorted(missing))
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(key))
+                self._inflight[key] = task
+                task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+            hits.update(await asyncio.shield(task))
+        return {s: hits.get(s, 0.0) for s in syms}
+
+    # --- sync -----------------------------------------------------------------
+
+    def get_prices_sync(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Blocking variant; concurrent threads wait for one fetch."""
+        syms = list(symbols)
+        hits, missing = self._split(syms)
+        if missing:
+            with self._sync_lock:
+                # Another thread may have fetched these while we waited
+                more, missing = self._split(missing)
+                hits.update(more)
+                if missing:
+                    hits.update(self._fetch_sync(missing))
+        return {s: hits.get(s, 0.0) for s in syms}
+
+    def _fetch_sync(self, symbols: List[str]) -> Dict[str, float]:
+        if self._sclient is None:
+            self._sclient = httpx.Client(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                transport=self._sync_transport,
+            )
+        try:
+            self.requests += 1
+            r = self._sclient.get(
+                "/api/v3/ticker/price", params=self._bulk_params(symbols)
+            )
+            if r.status_code == 400 and len(symbols) > 1:
+                prices: Dict[str, float] = {}
+                for s in symbols:
+                    prices.update(self._fetch_sync([s]))
+                return prices
+            prices = (
+                self._parse(symbols, r.json())
+                if r.status_code < 400
+                else {s: 0.0 for s in symbols}
+            )
+        except Exception:
+            prices = {s: 0.0 for s in symbols}
+        self._store(prices)
+        return prices
+
+
+_CLIENT: Optional[PriceClient] = None
+
+
+def get_price_client() -> PriceClient:
+    """Process-wide client shared by /data/price, the price hub and api_feed."""
+    global _CLIENT
+    if _CLIENT is None:
+        from src.core.config import get_settings
+
+        _CLIENT = PriceClient(ttl_s=get_settings().PRICE_CACHE_TTL_S)
+    return _CLIENT
+
+
+__all__ = ["PriceClient", "get_price_client"]
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import orjson
+
+from src.risk.guardrails import PriceFeed
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(ts: Any) -> float:
+    """Epoch seconds from a datetime (naive = UTC), ISO string, or s/ms number."""
+    if ts is None:
+        return time.time()
+    if isinstance(ts, datetime):
+        if ts.tzinfo is not None:
+            return ts.timestamp()
+        return (ts - _EPOCH).total_seconds()
+    if isinstance(ts, str):
+        try:
+            return float(ts)
+        except ValueError:
+            return _to_epoch(datetime.fromisoformat(ts.rstrip("Z")))
+    v = float(ts)
+    return v / 1000.0 if v > 1e11 else v
+
+
+class _Ring:
+    """Fixed-capacity (ts, price) ring ordered by time; oldest overwritten."""
+
+    __slots__ = ("ts", "px", "start", "size")
+
+    def __init__(self, capacity: int) -> None:
+        self.ts = array("d", bytes(8 * capacity))
+        self.px = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.size = 0
+
+    def _at(self, i: int) -> int:
+        return (self.start + i) % len(self.ts)
+
+    def append(self, ts: float, px: float) -> None:
+        cap = len(self.ts)
+        if self.size and ts < self.ts[self._at(self.size - 1)]:
+            return  # out-of-order tick: keep the series monotonic
+        if self.size == cap:
+            self.start = (self.start + 1) % cap
+            self.size -= 1
+        j = self._at(self.size)
+        self.ts[j] = ts
+        self.px[j] = px
+        self.size += 1
+
+    def trim_before(self, cutoff: float) -> None:
+        while self.size and self.ts[self.start] < cutoff:
+            self.start = (self.start + 1) % len(self.ts)
+            self.size -= 1
+
+    def last(self) -> Optional[Tuple[float, float]]:
+        if not self.size:
+            return None
+        j = self._at(self.size - 1)
+        return self.ts[j], self.px[j]
+
+    def at_or_before(self, ts: float) -> Optional[float]:
+        # Binary search over logical indices for the last point with t <= ts
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts[self._at(mid)] <= ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self.px[self._at(lo - 1)] if lo else None
+
+
+class PriceHistory:
+    """Per-symbol in-memory price history fed from ticks.
+
+    Each symbol keeps at most `max_points` samples and drops samples older
+    than `retention_s` relative to its newest one, so memory is bounded.
+    `price_at` is a binary search over the ring. Listeners added with
+    `add_listener` see every recorded ``(symbol, price, ts)``.
+    """
+
+    def __init__(self, retention_s: float = 7200.0, max_points: int = 20000) -> None:
+        self.retention_s = float(retention_s)
+        self.max_points = max(2, int(max_points))
+        self._rings: Dict[str, _Ring] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, float, float], None]] = []
+
+    def add_listener(self, fn: Callable[[str, float, float], None]) -> None:
+        self._listeners.append(fn)
+
+    def record(self, symbol: str, price: float, ts: Any = None) -> None:
+        px = float(price)
+        if not px > 0:
+            return
+        t = _to_epoch(ts)
+        with self._lock:
+            ring = self._rings.get(symbol)
+            if ring is None:
+                ring = self._rings[symbol] = _Ring(self.max_points)
+            ring.append(t, px)
+            if self.retention_s > 0:
+                ring.trim_before(t - self.retention_s)
+        for fn in self._listeners:
+            fn(symbol, px, t)
+
+    def on_tick(self, l1: Mapping[str, Any]) -> None:
+        """Record an L1 tick dict (`symbol`, `last` or bid/ask, optional `ts`)."""
+        px = l1.get("last")
+        if px is None and l1.get("bid") is not None and l1.get("ask") is not None:
+            px = (float(l1["bid"]) + float(l1["ask"])) / 2.0
+        if px is not None:
+            self.record(str(l1.get("symbol", "")), float(px), l1.get("ts"))
+
+    def record_many(self, prices: Mapping[str, float], ts: Any = None) -> None:
+        t = _to_epoch(ts)
+        for sym, px in prices.items():
+            self.record(sym, px, t)
+
+    def price_at(self, symbol: str, at: Any = None) -> Optional[float]:
+        """Last price at or before `at` (default: newest); None if not covered."""
+        with self._lock:
+            ring = self._rings.get(symbol)
+            if ring is None:
+                return None
+            if at is None:
+                last = ring.last()
+                return last[1] if last else None
+            return ring.at_or_before(_to_epoch(at))
+
+    def symbols(self) -> Iterable[str]:
+        return list(self._rings)
+
+    def load_jsonl(self, path: str) -> int:
+        """Replay ticks from a JSONL file (one L1 dict per line)."""
+        n = 0
+        p = Path(path)
+        if not p.exists():
+            return 0
+        with p.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    self.on_tick(orjson.loads(line))
+                    n += 1
+                except Exception:
+                    continue
+        return n
+
+
+class HistoryPriceFeed(PriceFeed):
+    """Guardrail PriceFeed answered from a `PriceHistory`."""
+
+    def __init__(self, history: PriceHistory) -> None:
+        self.history = history
+
+    def get_price(self, symbol: str, at: Optional[datetime] = None) -> Optional[float]:
+        if at is not None and at.tzinfo is None:
+            # Guardrails pass naive UTC datetimes
+            at = at.replace(tzinfo=timezone.utc)
+        return self.history.price_at(symbol, at)
+
+
+_HISTORY: Optional[PriceHistory] = None
+
+
+def get_price_history() -> PriceHistory:
+    """Process-wide history shared by the API routes and guardrails."""
+    global _HISTORY
+    if _HISTORY is None:
+        from src.core.config import get_settings
+
+        settings = get_settings()
+        _HISTORY = PriceHistory(
+            retention_s=settings.PRICE_HISTORY_RETENTION_S,
+            max_points=settings.PRICE_HISTORY_MAX_POINTS,
+        )
+        if settings.PRICE_REPLAY_PATH:
+            _HISTORY.load_jsonl(settings.PRICE_REPLAY_PATH)
+    return _HISTORY
+
+
+__all__ = ["HistoryPriceFeed", "PriceHistory", "get_price_history"]
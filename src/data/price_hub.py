@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+from src.data.price_history import PriceHistory
+
+# Upstream: fetch last prices for a set of symbols in one call
+Upstream = Callable[[List[str]], Awaitable[Dict[str, float]]]
+
+
+class MockUpstream:
+    """Deterministic sine-wave prices for tests and offline dashboards."""
+
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+        self._step = 0
+
+    async def __call__(self, symbols: List[str]) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for s in symbols:
+            idx = self._index.setdefault(s, len(self._index))
+            base = 100.0 + 10.0 * idx
+            out[s] = round(base + 2.0 * math.sin((self._step + idx) / 5.0), 4)
+        self._step += 1
+        return out
+
+
+class HubSubscription:
+    """A client's view of the hub: its symbols, at most one update per `interval`."""
+
+    def __init__(self, hub: "PriceHub", symbols: Iterable[str], interval: float):
+        self.hub = hub
+        self.symbols = list(dict.fromkeys(symbols))
+        self._set = set(self.symbols)
+        self.interval = max(0.0, float(interval))
+        self._event = asyncio.Event()
+        self._last = 0.0
+
+    def _notify(self, changed: Optional[Set[str]]) -> None:
+        # None: upstream error, relevant to everyone
+        if changed is None or not changed.isdisjoint(self._set):
+            self._event.set()
+
+    async def next(self) -> Dict[str, Any]:
+        """Wait for the next update ({"ticks": [...]} or {"error": ...})."""
+        delay = self._last + self.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self._event.wait()
+        self._event.clear()
+        self._last = time.monotonic()
+        if self.hub.error is not None:
+            return {"error": self.hub.error}
+        return {"ticks": self.hub.ticks(self.symbols)}
+
+
+class PriceHub:
+    """One upstream poller shared by every price subscriber.
+
+    The poll loop fetches the union of all subscribed symbols once per
+    cycle (the shortest requested interval, bounded by `min_poll_s`), keeps
+    the latest snapshot and wakes only subscribers whose symbols changed.
+    Each subscriber is throttled to its own interval, so adding dashboards
+    does not add upstream requests. Upstream errors back off exponentially
+    up to 30 s and are reported to subscribers.
+    """
+
+    def __init__(
+        self,
+        upstream: Upstream,
+        history: Optional[PriceHistory] = None,
+        min_poll_s: float = 0.1,
+    ) -> None:
+        self.upstream = upstream
+        self.history = history
+        self.min_poll_s = max(0.01, float(min_poll_s))
+        self.snapshot: Dict[str, Dict[str, Any]] = {}
+        self.error: Optional[str] = None
+        self.polls = 0
+        self._subs: Set[HubSubscription] = set()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def subscribe(
+        self, symbols: Iterable[str], interval: float = 1.0
+    ) -> HubSubscription:
+        sub = HubSubscription(self, symbols, interval)
+        self._subs.add(sub)
+        if all(s in self.snapshot for s in sub.symbols):
+            sub._event.set()  # serve the current snapshot right away
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="price-hub")
+        elif self._wake is not None:
+            self._wake.set()  # new symbols: poll now
+        return sub
+
+    def unsubscribe(self, sub: HubSubscription) -> None:
+        self._subs.discard(sub)
+        if not self._subs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def ticks(self, symbols: Iterable[str]) -> List[Dict[str, Any]]:
+        return [self.snapshot[s] for s in symbols if s in self.snapshot]
+
+    def _symbols(self) -> List[str]:
+        return list(dict.fromkeys(s for sub in self._subs for s in sub.symbols))
+
+    def _cycle_s(self) -> float:
+        shortest = min((sub.interval for sub in self._subs), default=1.0)
+        return max(self.min_poll_s, shortest)
+
+    async def poll_once(self) -> Set[str]:
+        syms = self._symbols()
+        if not syms:
+            return set()
+        # Soft-failed symbols come back as 0.0: keep their last good price
+        prices = {
+            s: px for s, px in (await self.upstream(syms)).items() if px and px > 0
+        }
+        if not prices:
+            raise RuntimeError("no prices from upstream")
+        now = time.time()
+        changed: Set[str] = set()
+        for s, px in prices.items():
+            prev = self.snapshot.get(s)
+            if prev is None or prev["last"] != px:
+                changed.add(s)
+            self.snapshot[s] = {"ts": now, "symbol": s, "last": px}
+        self.polls += 1
+        self.error = None
+        if self.history is not None:
+            self.history.record_many(prices, ts=now)
+        return changed
+
+    async def _run(self) -> None:
+        backoff = 0.0
+        try:
+            while True:
+                try:
+                    changed = await self.poll_once()
+                    backoff = 0.0
+                    for sub in list(self._subs):
+                        sub._notify(changed)
+                except Exception as e:  # noqa: BLE001
+                    self.error = str(e)
+                    backoff = min(max(backoff * 2.0, 1.0), 30.0)
+                    logger.warning(f"Price hub upstream failed: {e}")
+                    for sub in list(self._subs):
+                        sub._notify(None)
+                assert self._wake is not None
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(), max(self._cycle_s(), backoff)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            # Upstream connections belong to this task's event loop
+            close = getattr(self.upstream, "aclose", None)
+            if close is not None:
+                try:
+                    await close()
+                except Exception:
+                    pass
+
+
+_HUBS: Dict[str, PriceHub] = {}
+
+
+def get_price_hub(mock: bool = False) -> PriceHub:
+    """Process-wide hub: Binance-backed, or synthetic prices when `mock`."""
+    key = "mock" if mock else "live"
+    hub = _HUBS.get(key)
+    if hub is None:
+        if mock:
+            hub = PriceHub(MockUpstream())
+        else:
+            from src.data.price_client import get_price_client
+            from src.data.price_history import get_price_history
+
+            # Bulk, pooled and cached; shared with /data/price
+            hub = PriceHub(get_price_client().get_prices, history=get_price_history())
+        _HUBS[key] = hub
+    return hub
+
+
+def watch_prices(
+    symbols: Iterable[str], interval_s: float, hub: Optional[PriceHub] = None
+) -> Optional[HubSubscription]:
+    """Keep the hub polling `symbols` with no client attached.
+
+    The live hub records every poll into the price history, so the
+    guardrails' price checks see the whitelist even when nobody calls
+    /data/price or /ws/ticks. Returns the subscription to `unsubscribe`.
+    """
+    syms = list(symbols)
+    if interval_s <= 0 or not syms:
+        return None
+    return (hub or get_price_hub()).subscribe(syms, interval_s)
+
+
+__all__ = [
+    "HubSubscription",
+    "MockUpstream",
+    "PriceHub",
+    "Upstream",
+    "get_price_hub",
+    "watch_prices",
+]
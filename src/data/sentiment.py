@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import time
-from typing import Any, Dict, Optional
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, Tuple
 
 import httpx
-
-_CACHE: Dict[str, Any] = {"ts": 0.0, "score": 0.0}
+from loguru import logger
 
 
 def _normalize_fng(value_0_100: float) -> float:
@@ -32,33 +33,98 @@ async def fetch_fear_greed_async(timeout: float = 4.0) -> Optional[float]:
     return None
 
 
-def get_sentiment_score_cached(ttl: int = 300) -> float:
-    """Return cached sentiment score in [-1, 1].
+def fetch_enabled() -> bool:
+    """Network fetches happen only when SENTIMENT_FETCH=1."""
+    return (os.getenv("SENTIMENT_FETCH") or "").strip().lower() in {"1", "true", "yes"}
+
 
-    Fetches Fear & Greed only when SENTIMENT_FETCH=1 and cache is stale;
-    otherwise returns the last score (default 0.0 at startup).
+class SentimentRefresher:
+    """Fetches sentiment on its own schedule and publishes a smoothed score.
+
+    The published value is a single ``(score, ts)`` tuple swapped in one
+    assignment, so readers on the trading loop never block, never do I/O
+    and never see a half-updated pair. The score is the mean of the last
+    `smooth_n` successful fetches; failed fetches keep the last value.
     """
-    now = time.time()
-    if (_CACHE.get("ts", 0.0) or 0.0) + float(ttl) > now:
-        return float(_CACHE.get("score", 0.0) or 0.0)
-    # Only fetch if explicitly enabled; otherwise keep neutral 0.0
-    if (os.getenv("SENTIMENT_FETCH") or "").strip().lower() not in {"1", "true", "yes"}:
-        _CACHE["ts"] = now
-        _CACHE["score"] = float(_CACHE.get("score", 0.0) or 0.0)
-        return float(_CACHE["score"])  # neutral / last known
-    # Try a quick async fetch using httpx + anyio
-    score = None
-    try:
-        import anyio
 
-        score = anyio.run(fetch_fear_greed_async)
-    except Exception:
-        score = None
-    if score is None:
-        score = 0.0
-    _CACHE["ts"] = now
-    _CACHE["score"] = float(score)
-    return float(score)
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Optional[float]]] = fetch_fear_greed_async,
+        interval_s: float = 300.0,
+        smooth_n: int = 12,
+    ) -> None:
+        self.fetch = fetch
+        self.interval_s = max(1.0, float(interval_s))
+        self._window: Deque[float] = deque(maxlen=max(1, int(smooth_n)))
+        self.latest: Tuple[float, float] = (0.0, 0.0)  # (score, ts)
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def score(self) -> float:
+        return self.latest[0]
+
+    def push(self, raw: float) -> float:
+        """Fold one raw reading in [-1, 1] into the moving average and publish."""
+        self._window.append(max(-1.0, min(1.0, float(raw))))
+        score = sum(self._window) / len(self._window)
+        self.latest = (score, time.time())
+        return score
+
+    async def refresh_once(self) -> Optional[float]:
+        raw = await self.fetch()
+        if raw is None:
+            return None
+        return self.push(raw)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.refresh_once()
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Sentiment refresh failed: {e}")
+            await asyncio.sleep(self.interval_s)
+
+    def start(self) -> asyncio.Task[None]:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="sentiment-refresher")
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+_REFRESHER: Optional[SentimentRefresher] = None
+
+
+def get_sentiment_refresher() -> SentimentRefresher:
+    global _REFRESHER
+    if _REFRESHER is None:
+        from src.core.config import get_settings
+
+        s = get_settings()
+        _REFRESHER = SentimentRefresher(
+            interval_s=s.SENTIMENT_REFRESH_S, smooth_n=s.SENTIMENT_SMOOTH_N
+        )
+    return _REFRESHER
+
+
+def get_sentiment_score_cached(ttl: int = 300) -> float:
+    """Return the last published sentiment score in [-1, 1] (memory read only).
+
+    The background `SentimentRefresher` keeps it current; until its first
+    successful fetch (or with SENTIMENT_FETCH unset) the score is neutral
+    0.0. `ttl` is accepted for compatibility and ignored.
+    """
+    return get_sentiment_refresher().latest[0]
 
 
-__all__ = ["get_sentiment_score_cached", "fetch_fear_greed_async"]
+__all__ = [
+    "SentimentRefresher",
+    "fetch_enabled",
+    "fetch_fear_greed_async",
+    "get_sentiment_refresher",
+    "get_sentiment_score_cached",
+]
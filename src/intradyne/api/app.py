@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import List
+
 from fastapi import FastAPI, Depends
 import os as _os
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,7 +18,11 @@ from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from intradyne.api.deps import require_api_key
 from intradyne.api.models import FrontendConfig
 from intradyne.api.ratelimit import general_rate_limit
+from intradyne.core.config import get_settings, install_reload_signal
 from intradyne.core.logging import setup_logging
+from src.data.price_hub import HubSubscription, watch_prices
+from src.data.sentiment import fetch_enabled as sentiment_fetch_enabled
+from src.data.sentiment import get_sentiment_refresher
 
 
 def create_app() -> FastAPI:
@@ -53,9 +59,25 @@ def create_app() -> FastAPI:
     app.include_router(ws_router, tags=["WebSocket"])
     app.include_router(research_router, dependencies=deps_common, tags=["Research"])
 
+    watch: List[HubSubscription] = []
+
     @app.on_event("startup")
     def _startup() -> None:
         setup_logging(_os.getenv("LOG_LEVEL"))
+        install_reload_signal()
+        if sentiment_fetch_enabled():
+            get_sentiment_refresher().start()
+        # Guardrail price checks read the history this keeps filled
+        settings = get_settings()
+        sub = watch_prices(settings.allowed_crypto_list(), settings.PRICE_WATCH_S)
+        if sub is not None:
+            watch.append(sub)
+
+    @app.on_event("shutdown")
+    def _shutdown() -> None:
+        while watch:
+            sub = watch.pop()
+            sub.hub.unsubscribe(sub)
 
     return app
 
@@ -1,66 +1,88 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Optional
 
-from intradyne.core.config import load_settings
+from intradyne.core.config import get_settings as _settings_snapshot
+from intradyne.core.config import settings_version
 from intradyne.core.ledger import Ledger
-from intradyne.risk.guardrails import Guardrails, ShariahPolicy, PriceFeed, RiskData
+from intradyne.risk.guardrails import Guardrails, ShariahPolicy
+from src.data.price_history import HistoryPriceFeed, get_price_history
+from src.risk.equity_store import get_equity_store
+from src.risk.portfolio_var import get_portfolio_var
+from src.core.state import get_shared_state
 
 
-class _DefaultPriceFeed(PriceFeed):
-    def get_price(self, symbol: str, at: Optional[datetime] = None) -> Optional[float]:
-        return None
-
-
-class _DefaultRiskData(RiskData):
-    def equity_series_30d(self) -> List[Tuple[datetime, float]]:
-        return []
-
-    def equity_daily_returns_30d(self) -> List[float]:
-        return []
+_ENGINE: Optional[Guardrails] = None
+_ENGINE_VERSION = -1
 
 
-_ENGINE: Optional[Guardrails] = None
-_HALT_ENABLED: bool = False
+def _thresholds(settings) -> dict:
+    return {
+        "dd_warn": settings.DD_WARN_PCT,
+        "dd_halt": settings.DD_HALT_PCT,
+        "flash": settings.FLASH_CRASH_PCT,
+        "kill_switch": settings.KILL_SWITCH_BREACHES,
+        "var_max": settings.VAR_1D_MAX,
+        "batch_notional_max": settings.BATCH_NOTIONAL_MAX,
+    }
 
 
 def get_guardrails() -> Guardrails:
-    global _ENGINE
-    if _ENGINE is None:
-        settings = load_settings()
-        sh = ShariahPolicy(allowed_crypto=settings.allowed_crypto_list())
+    """Process-wide guardrails, kept in line with the settings snapshot.
+
+    After a settings reload the thresholds and Shariah whitelist are applied
+    in place (the breach counter survives); a new ledger path rebuilds it.
+    """
+    global _ENGINE, _ENGINE_VERSION
+    settings = _settings_snapshot()
+    version = settings_version()
+    if _ENGINE is not None and version == _ENGINE_VERSION:
+        return _ENGINE
+    sh = ShariahPolicy(allowed_crypto=settings.allowed_crypto_list())
+    if _ENGINE is None or _ENGINE.ledger.path != settings.EXPLAIN_LEDGER_PATH:
         _ENGINE = Guardrails(
-            price_feed=_DefaultPriceFeed(),
-            risk_data=_DefaultRiskData(),
+            price_feed=HistoryPriceFeed(get_price_history()),
+            risk_data=get_equity_store(),
             ledger=Ledger(path=settings.EXPLAIN_LEDGER_PATH),
             shariah=sh,
-            thresholds={
-                "dd_warn": settings.DD_WARN_PCT,
-                "dd_halt": settings.DD_HALT_PCT,
-                "flash": settings.FLASH_CRASH_PCT,
-                "kill_switch": settings.KILL_SWITCH_BREACHES,
-                "var_max": settings.VAR_1D_MAX,
-            },
+            thresholds=_thresholds(settings),
+            portfolio_var=get_portfolio_var(),
+            state=get_shared_state(),
         )
+    else:
+        _ENGINE.th.update(_thresholds(settings))
+        _ENGINE.shariah = sh
+    _ENGINE_VERSION = version
     return _ENGINE
 
 
 def get_settings():
-    return load_settings()
+    return _settings_snapshot()
 
 
 def get_ledger():
     return get_guardrails().ledger
 
 
+def ledger_etag(ledger: Ledger, n: int) -> str:
+    """ETag for a view of the last `n` records: changes with the chain head."""
+    return f'"{ledger.head() or "empty"}-{int(n)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
 def set_halt(enabled: bool) -> None:
-    global _HALT_ENABLED
-    _HALT_ENABLED = bool(enabled)
+    get_shared_state().set_flag("halt", bool(enabled))
 
 
 def is_halted() -> bool:
-    return _HALT_ENABLED
+    # Served from the shared-state cache; refreshed only when another worker writes
+    return get_shared_state().get_flag("halt")
 
 
 # Optional API key requirement for frontend/backend requests
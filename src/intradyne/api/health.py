@@ -26,9 +26,9 @@ def healthz():
 
 @router.get("/readyz")
 def readyz():
-    from intradyne.core.config import load_settings
+    from intradyne.core.config import get_settings
 
-    s = load_settings()
+    s = get_settings()
     db_ok = False
     redis_ok = False
     # DB check (sqlite only)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Dict, Optional, Set
+
+import orjson
+from loguru import logger
+
+
+class LedgerSubscription:
+    """One follower's bounded queue of pre-serialized ``{"record": ...}`` texts.
+
+    On overflow the ``drop`` policy discards the oldest queued message (and
+    counts it); ``close`` marks the subscription closed so the consumer can
+    hang up.
+    """
+
+    def __init__(self, maxsize: int, policy: str = "drop") -> None:
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max(1, int(maxsize)))
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, msg: str) -> None:
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(msg)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.policy == "close":
+            self.closed = True
+            # Wake a consumer blocked in get(); it checks `closed` first
+            self.queue.get_nowait()
+            self.queue.put_nowait("")
+            return
+        self.queue.get_nowait()
+        self.queue.put_nowait(msg)
+        self.dropped += 1
+
+    async def get(self) -> Optional[str]:
+        """Next message, or None once the subscription was closed for lag."""
+        msg = await self.queue.get()
+        return None if self.closed else msg
+
+
+class LedgerFollower:
+    """Single watcher per ledger file fanning appended records out to subscribers.
+
+    One task detects appends (inotify through the optional ``inotify_simple``
+    package, else stat polling every `poll_s`), reads only the new bytes,
+    parses each record once and hands the same serialized text to every
+    subscriber. The task runs while there is at least one subscriber.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        poll_s: float = 0.5,
+        queue_size: int = 256,
+        policy: str = "drop",
+    ) -> None:
+        self.path = path
+        self.poll_s = max(0.01, float(poll_s))
+        self.queue_size = max(1, int(queue_size))
+        self.policy = policy
+        self._subs: Set[LedgerSubscription] = set()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._pos = 0
+        self.records = 0
+
+    def subscribe(self) -> LedgerSubscription:
+        sub = LedgerSubscription(self.queue_size, self.policy)
+        self._subs.add(sub)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._start()
+        return sub
+
+    def unsubscribe(self, sub: LedgerSubscription) -> None:
+        self._subs.discard(sub)
+        if not self._subs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def _start(self) -> None:
+        try:
+            self._pos = os.path.getsize(self.path)
+        except OSError:
+            self._pos = 0
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="ledger-follower")
+
+    def _watch(self) -> Optional[Any]:
+        """Register an inotify watch on the ledger's directory, if available."""
+        try:
+            from inotify_simple import INotify, flags  # optional dependency
+        except Exception:
+            return None
+        try:
+            ino = INotify()
+            ino.add_watch(
+                os.path.dirname(os.path.abspath(self.path)),
+                flags.MODIFY | flags.CREATE | flags.MOVED_TO,
+            )
+
+            def _on_event() -> None:
+                ino.read(timeout=0)
+                if self._wake is not None:
+                    self._wake.set()
+
+            asyncio.get_running_loop().add_reader(ino.fileno(), _on_event)
+            return ino
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"inotify unavailable for {self.path}: {e}")
+            return None
+
+    async def _run(self) -> None:
+        ino = self._watch()
+        # With inotify, polling is only a safety net for missed events
+        timeout = self.poll_s * 10 if ino is not None else self.poll_s
+        try:
+            while True:
+                assert self._wake is not None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                try:
+                    self._read_new()
+                except Exception as e:  # noqa: BLE001
+                    logger.warning(f"Ledger follower read failed: {e}")
+        finally:
+            if ino is not None:
+                try:
+                    asyncio.get_running_loop().remove_reader(ino.fileno())
+                    ino.close()
+                except Exception:
+                    pass
+
+    def _read_new(self) -> None:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self._pos:
+            # Truncated or rotated: follow the new file from its start
+            self._pos = 0
+        if size == self._pos:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._pos)
+            data = f.read(size - self._pos)
+        # Leave a partially written last line for the next pass
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return
+        self._pos += end
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                orjson.loads(line)
+            except Exception:
+                continue
+            self.broadcast('{"record":' + line.decode("utf-8") + "}")
+
+    def broadcast(self, msg: str) -> None:
+        self.records += 1
+        for sub in list(self._subs):
+            sub.offer(msg)
+
+
+_FOLLOWERS: Dict[str, LedgerFollower] = {}
+
+
+def get_ledger_follower(path: str) -> LedgerFollower:
+    """Process-wide follower for `path` shared by all /ws/ledger clients."""
+    key = os.path.abspath(path)
+    fol = _FOLLOWERS.get(key)
+    if fol is None:
+        fol = _FOLLOWERS[key] = LedgerFollower(path)
+    return fol
+
+
+__all__ = ["LedgerFollower", "LedgerSubscription", "get_ledger_follower"]
@@ -1,25 +1,114 @@
 from __future__ import annotations
 
+import math
 import time
-from collections import defaultdict, deque
-import os
-from typing import Deque, Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from fastapi import HTTPException, Request, status
 
-from intradyne.core.config import load_settings
+from intradyne.core.config import Settings, get_settings, settings_version
+from src.core.state import GCRA_LUA, get_shared_state
 
 
-# In-memory sliding window counters keyed by (ip, route)
-_WINDOWS: Dict[Tuple[str, str], Deque[float]] = defaultdict(deque)
+@dataclass(frozen=True)
+class RatePolicy:
+    """`limit` requests per `window_s` seconds, bursting up to `burst`.
+
+    Enforced with GCRA: the only state per key is its theoretical arrival
+    time (TAT). A request is allowed while ``TAT - now <= tolerance`` and
+    then advances the TAT by one emission `interval`.
+    """
+
+    name: str
+    limit: float
+    window_s: float
+    burst: float = 0.0  # 0: same as limit
+    interval: float = field(init=False)
+    tolerance: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        limit = max(float(self.limit), 1e-9)
+        burst = float(self.burst) or limit
+        object.__setattr__(self, "interval", float(self.window_s) / limit)
+        object.__setattr__(self, "tolerance", self.interval * max(burst - 1.0, 0.0))
+
+
+# Route policies, declared once and built from the settings snapshot
+POLICIES: Dict[str, Callable[[Settings], RatePolicy]] = {
+    "general": lambda s: RatePolicy(
+        "general", int(s.RATE_LIMIT_REQS or 60), int(s.RATE_LIMIT_WINDOW or 60)
+    ),
+    # AI-specific limits when set, else the global ones
+    "ai": lambda s: RatePolicy(
+        "ai",
+        int(s.AI_RATE_LIMIT_REQS or 0) or int(s.RATE_LIMIT_REQS or 60),
+        int(s.AI_RATE_LIMIT_WINDOW or 0) or int(s.RATE_LIMIT_WINDOW or 60),
+    ),
+    # Token bucket for WebSocket sends: WS_BUCKET_RATE/s, WS_BUCKET_BURST deep
+    "ws": lambda s: RatePolicy(
+        "ws", float(s.WS_BUCKET_RATE), 1.0, burst=float(s.WS_BUCKET_BURST)
+    ),
+}
+
+
+class GCRALimiter:
+    """In-process GCRA state: one float per key in an LRU-ordered dict.
+
+    A key whose TAT has passed is indistinguishable from an unseen key, so
+    each check drops the coldest key once it is idle; `max_keys` bounds
+    memory when many clients are active at once. Not locked: the limiter
+    dependencies run on the event loop thread.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max(1, int(max_keys))
+        self._tat: OrderedDict[str, float] = OrderedDict()
+
+    def check(self, key: str, policy: RatePolicy, now: Optional[float] = None) -> float:
+        """0.0 if allowed (and counted), else seconds until it would be."""
+        if now is None:
+            now = time.time()
+        tats = self._tat
+        tat = tats.get(key, now)
+        if tat < now:
+            tat = now
+        if tat - now > policy.tolerance + 1e-9:  # float slack
+            return tat - now - policy.tolerance
+        tats[key] = tat + policy.interval
+        tats.move_to_end(key)
+        # Evict the coldest key when idle or over capacity
+        cold = next(iter(tats))
+        if tats[cold] <= now or len(tats) > self.max_keys:
+            del tats[cold]
+        return 0.0
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+_LIMITER = GCRALimiter()
 _REDIS = None  # lazy-initialized async client
+_REDIS_GCRA = None
+
+# Policies built from the settings snapshot, rebuilt when its version changes
+_LIMITS: Tuple[int, Dict[str, Any]] = (0, {})
 
-# Token-bucket state for WebSocket streaming (in-memory)
-_WS_BUCKETS: Dict[Tuple[str, str], Tuple[float, float]] = {}  # (tokens, last_ts)
+
+def _limits() -> Dict[str, Any]:
+    global _LIMITS
+    version, limits = _LIMITS
+    if version != settings_version() or not limits:
+        s = get_settings()
+        limits = {name: build(s) for name, build in POLICIES.items()}
+        limits["redis_url"] = s.REDIS_URL
+        _LIMITS = (settings_version(), limits)
+    return limits
 
 
 async def _get_redis(url: Optional[str]):
-    global _REDIS
+    global _REDIS, _REDIS_GCRA
     if _REDIS is not None:
         return _REDIS
     if not url:
@@ -28,176 +117,88 @@ async def _get_redis(url: Optional[str]):
         import redis.asyncio as redis
 
         _REDIS = redis.from_url(url)
+        _REDIS_GCRA = _REDIS.register_script(GCRA_LUA)
         return _REDIS
     except Exception:
         return None
 
 
-async def ai_rate_limit(request: Request) -> None:
-    s = load_settings()
-    # Prefer AI-specific limits if present, else fall back to global
-    try:
-        ai_reqs = int(getattr(s, "AI_RATE_LIMIT_REQS", 0) or 0)
-        ai_win = int(getattr(s, "AI_RATE_LIMIT_WINDOW", 0) or 0)
-    except Exception:  # pragma: no cover - defensive
-        ai_reqs, ai_win = 0, 0
-    max_reqs = ai_reqs or getattr(s, "RATE_LIMIT_REQS", 60)
-    win_s = ai_win or getattr(s, "RATE_LIMIT_WINDOW", 60)
-
-    now = time.time()
-    route = request.url.path.split("?")[0]
-    # Best-effort client IP detection
-    fwd = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
-    client_host = request.client.host if request.client else ""
-    ip = fwd or client_host or "unknown"
-    # Prefer Redis fixed-window counter when REDIS_URL is set; else fallback to in-memory sliding window.
-    red = await _get_redis(getattr(s, "REDIS_URL", None))
-    if red is not None:
-        # Use fixed window key with TTL
-        window_key = int(now // float(win_s))
-        rkey = f"rl:{route}:{ip}:{window_key}"
+async def check_rate(policy_name: str, key: str) -> float:
+    """Apply a named policy to `key`; 0.0 when allowed, else retry-after.
+
+    Redis (REDIS_URL) runs GCRA in one atomic script call; otherwise a
+    shared state backend (sqlite/redis per STATE_BACKEND) holds the TAT;
+    otherwise the in-process limiter. Backend errors fall through to the
+    next option.
+    """
+    lim = _limits()
+    policy: RatePolicy = lim[policy_name]
+    skey = f"rl:{policy.name}:{key}"
+    if await _get_redis(lim["redis_url"]) is not None:
         try:
-            cur = await red.incr(rkey)
-            if cur == 1:
-                await red.expire(rkey, int(win_s))
-            if int(cur) > int(max_reqs):
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail={
-                        "error": "rate_limited",
-                        "window_seconds": int(win_s),
-                        "max_requests": int(max_reqs),
-                    },
+            return float(
+                await _REDIS_GCRA(  # type: ignore[misc]
+                    keys=[skey], args=[policy.interval, policy.tolerance]
                 )
-            return
-        except HTTPException:
-            raise
+            )
         except Exception:
-            # Fallback on errors
             pass
+    st = get_shared_state()
+    if st.shared:
+        try:
+            return st.backend.gcra(skey, policy.interval, policy.tolerance)
+        except Exception:
+            pass
+    return _LIMITER.check(skey, policy)
+
+
+def _client_ip(request: Request) -> str:
+    # Best-effort client IP detection
+    fwd = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
+    client_host = request.client.host if request.client else ""
+    return fwd or client_host or "unknown"
+
 
-    key_t = (ip, route)
-    q = _WINDOWS[key_t]
-    cutoff = now - float(win_s)
-    while q and q[0] < cutoff:
-        q.popleft()
-    if len(q) >= int(max_reqs):
+async def _enforce(policy_name: str, request: Request) -> None:
+    route = request.url.path.split("?")[0]
+    retry = await check_rate(policy_name, f"{route}:{_client_ip(request)}")
+    if retry > 0.0:
+        policy: RatePolicy = _limits()[policy_name]
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
                 "error": "rate_limited",
-                "window_seconds": int(win_s),
-                "max_requests": int(max_reqs),
+                "window_seconds": int(policy.window_s),
+                "max_requests": int(policy.limit),
             },
+            headers={"Retry-After": str(max(1, math.ceil(retry)))},
         )
-    q.append(now)
+
+
+async def ai_rate_limit(request: Request) -> None:
+    """Rate limit for AI routes (AI_RATE_LIMIT_* over RATE_LIMIT_*)."""
+    await _enforce("ai", request)
+
+
+async def general_rate_limit(request: Request) -> None:
+    """General-purpose rate limiter for all HTTP routers.
+
+    Uses RATE_LIMIT_REQS per RATE_LIMIT_WINDOW; AI routes are additionally
+    checked against their own policy, counted separately.
+    """
+    await _enforce("general", request)
 
 
 async def ws_rate_limit(websocket, route: str) -> bool:
     """Token-bucket limiter for WebSocket streaming sends.
 
-    Env:
+    Settings:
       - WS_BUCKET_RATE: tokens per second (default 50)
       - WS_BUCKET_BURST: max bucket size (default 100)
-      - REDIS_URL (optional): when set, use fixed-window counts per send instead.
     Returns True if allowed, False if limited.
     """
-    s = load_settings()
-    now = time.time()
-    try:
-        rate = float(os.getenv("WS_BUCKET_RATE", "50"))
-        burst = float(os.getenv("WS_BUCKET_BURST", "100"))
-    except Exception:
-        rate, burst = 50.0, 100.0
-
-    # Identify client
     try:
         ip = websocket.client.host if websocket.client else "unknown"
     except Exception:
         ip = "unknown"
-
-    # Prefer Redis fixed-window when configured (best-effort)
-    red = await _get_redis(getattr(s, "REDIS_URL", None))
-    if red is not None:
-        window = 1.0  # 1-second windows for streaming
-        window_key = int(now // window)
-        key = f"rlws:{route}:{ip}:{window_key}"
-        try:
-            cur = await red.incr(key)
-            if cur == 1:
-                await red.expire(key, 2)
-            # Allow up to burst per second under Redis path
-            return int(cur) <= int(max(1, burst))
-        except Exception:
-            pass  # fall back to in-memory bucket
-
-    k = (ip, route)
-    tokens, last = _WS_BUCKETS.get(k, (burst, now))
-    # Refill
-    elapsed = max(0.0, now - last)
-    tokens = min(burst, tokens + rate * elapsed)
-    if tokens < 1.0:
-        _WS_BUCKETS[k] = (tokens, now)
-        return False
-    _WS_BUCKETS[k] = (tokens - 1.0, now)
-    return True
-
-
-async def general_rate_limit(request: Request) -> None:
-    """General-purpose rate limiter for all non-AI routes.
-
-    Uses global RATE_LIMIT_REQS and RATE_LIMIT_WINDOW. Shares Redis/in-memory
-    implementation with the AI limiter, but does not consider AI-specific
-    overrides.
-    """
-    s = load_settings()
-    try:
-        max_reqs = int(getattr(s, "RATE_LIMIT_REQS", 60))
-        win_s = int(getattr(s, "RATE_LIMIT_WINDOW", 60))
-    except Exception:  # pragma: no cover
-        max_reqs, win_s = 60, 60
-
-    now = time.time()
-    route = request.url.path.split("?")[0]
-    fwd = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
-    client_host = request.client.host if request.client else ""
-    ip = fwd or client_host or "unknown"
-
-    red = await _get_redis(getattr(s, "REDIS_URL", None))
-    if red is not None:
-        window_key = int(now // float(win_s))
-        rkey = f"rl:{route}:{ip}:{window_key}"
-        try:
-            cur = await red.incr(rkey)
-            if cur == 1:
-                await red.expire(rkey, int(win_s))
-            if int(cur) > int(max_reqs):
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail={
-                        "error": "rate_limited",
-                        "window_seconds": int(win_s),
-                        "max_requests": int(max_reqs),
-                    },
-                )
-            return
-        except HTTPException:
-            raise
-        except Exception:
-            pass
-
-    key_t = (ip, route)
-    q = _WINDOWS[key_t]
-    cutoff = now - float(win_s)
-    while q and q[0] < cutoff:
-        q.popleft()
-    if len(q) >= int(max_reqs):
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={
-                "error": "rate_limited",
-                "window_seconds": int(win_s),
-                "max_requests": int(max_reqs),
-            },
-        )
-    q.append(now)
+    return await check_rate("ws", f"{route}:{ip}") == 0.0
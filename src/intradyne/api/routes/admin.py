@@ -3,6 +3,8 @@ from __future__ import annotations
 from fastapi import APIRouter, Header, HTTPException
 
 from intradyne.api.deps import get_guardrails, set_halt, is_halted
+from intradyne.core.config import reload_settings, settings_version
+from src.core.state import get_shared_state
 
 
 router = APIRouter()
@@ -11,11 +13,17 @@ router = APIRouter()
 @router.post("/admin/kill-switch/toggle")
 def kill_switch_toggle(enabled: bool):
     gr = get_guardrails()
-    # Placeholder: record intent in ledger; actual enforcement handled via breach count
+    # Shared across workers; gate_trade skips the breach-count halt when off
+    get_shared_state().set_flag("kill_switch", bool(enabled))
     gr.ledger.append("admin_toggle", {"kill_switch_enabled": bool(enabled)})
     return {"ok": True, "kill_switch_enabled": bool(enabled)}
 
 
+@router.get("/admin/kill-switch")
+def kill_switch_status():
+    return {"kill_switch_enabled": get_guardrails().kill_switch_enabled()}
+
+
 @router.get("/admin/halt")
 def halt_status():
     return {"enabled": is_halted()}
@@ -37,3 +45,28 @@ def halt_set(
     gr = get_guardrails()
     gr.ledger.append("admin_halt", {"enabled": enabled})
     return {"enabled": enabled}
+
+
+@router.post("/admin/settings/reload")
+def settings_reload(
+    x_admin_secret: str | None = Header(default=None, alias="X-Admin-Secret"),
+):
+    # Same guard as /admin/halt; SIGHUP triggers the same reload
+    import os
+
+    req = os.getenv("ADMIN_SECRET")
+    if req and (x_admin_secret or "") != req:
+        raise HTTPException(status_code=401, detail="unauthorized")
+    try:
+        reload_settings()
+    except Exception as e:  # noqa: BLE001
+        # Previous snapshot stays active
+        raise HTTPException(status_code=400, detail=f"reload_failed: {e}")
+    version = settings_version()
+    get_guardrails().ledger.append("admin_settings_reload", {"version": version})
+    return {"ok": True, "version": version}
+
+
+@router.get("/admin/settings/version")
+def settings_version_status():
+    return {"version": settings_version()}
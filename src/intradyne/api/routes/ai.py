@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 
-from intradyne.api.deps import get_ledger
+from intradyne.api.deps import etag_matches, get_ledger, ledger_etag
 from src.core.ai import (
     AIUnavailable,
     ai_configured,
@@ -24,36 +24,39 @@ async def ai_status() -> Dict[str, Any]:
     return {"configured": ai_configured()}
 
 
+# Summaries by ledger ETag: unchanged ledger, no new model call
+_SUMMARIES: Dict[str, Any] = {}
+
+
 @router.post("/ai/summarize")
-async def ai_summarize(n: int = 100) -> Dict[str, Any]:
+async def ai_summarize(
+    response: Response,
+    n: int = 100,
+    if_none_match: Optional[str] = Header(default=None, alias="If-None-Match"),
+) -> Any:
     if not ai_configured():
         raise HTTPException(status_code=503, detail="AI not configured")
 
-    # Load last N records from the explainability ledger
     led = get_ledger()
-    path = led.path
-    buf: List[Dict[str, Any]] = []
-    try:
-        import orjson  # lazy import
-
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    rec = orjson.loads(line)
-                except Exception:
-                    continue
-                buf.append(rec)
-    except FileNotFoundError:
-        buf = []
+    n = max(0, int(n))
+    etag = ledger_etag(led, n)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    if etag in _SUMMARIES:
+        return {"summary": _SUMMARIES[etag]}
 
+    # Last N records of the explainability ledger (reverse-seek, cached)
+    buf: List[Dict[str, Any]] = led.tail(n)
     try:
-        summary = await summarize_guardrails_async(buf[-max(0, int(n)) :])
+        summary = await summarize_guardrails_async(buf)
     except AIUnavailable as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"AI error: {e}")
+    if len(_SUMMARIES) >= 16:
+        _SUMMARIES.clear()
+    _SUMMARIES[etag] = summary
     return {"summary": summary}
 
 
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import asyncio
 from pathlib import Path
 from typing import Any, Dict, List
 
 import httpx
 from fastapi import APIRouter, HTTPException, Query
 
+from src.data.price_client import get_price_client
+from src.data.price_history import get_price_history
+
 try:
     from prometheus_client import Gauge
 
@@ -53,25 +55,9 @@ async def get_ohlc(symbol: str, tf: str = "1d") -> Dict[str, Any]:
 @router.get("/data/price")
 async def get_price(symbols: str = Query("BTC/USDT,ETH/USDT")) -> Dict[str, float]:
     syms = [s.strip() for s in symbols.split(",") if s.strip()]
-    out: Dict[str, float] = {}
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for s in syms:
-            if s.upper() == "USDT":
-                out[s] = 1.0
-                continue
-            mapped = s.replace("/", "")
-            try:
-                r = await client.get(
-                    "https://api.binance.com/api/v3/ticker/price",
-                    params={"symbol": mapped},
-                )
-                r.raise_for_status()
-                data = r.json()
-                out[s] = float(data["price"])
-            except Exception:
-                # soft-fail with 0.0 when unreachable
-                out[s] = out.get(s, 0.0)
-            await asyncio.sleep(0)  # yield
+    # One pooled bulk request for uncached symbols; 0.0 when unreachable
+    out = await get_price_client().get_prices(syms)
+    get_price_history().record_many(out)
     return out
 
 
@@ -158,31 +144,23 @@ async def list_ohlc() -> List[Dict[str, Any]]:
 async def get_sentiment(refresh: int = 0) -> Dict[str, Any]:
     """Return a normalized sentiment score in [-1, 1].
 
-    - When `refresh=1`, attempts a fresh fetch (if allowed by env settings),
-      else returns cached/last-known score.
+    - Served from the background refresher's smoothed score (memory only).
+    - When `refresh=1`, fetches now and folds the reading into the average.
+    - `ts` is when the score was last updated (0 before the first fetch).
     """
     try:
-        from src.data.sentiment import (
-            get_sentiment_score_cached,
-            fetch_fear_greed_async,
-        )
+        from src.data.sentiment import get_sentiment_refresher
     except Exception:  # pragma: no cover
         raise HTTPException(status_code=503, detail="sentiment_unavailable")
 
-    score: float
+    refresher = get_sentiment_refresher()
     if int(refresh) == 1:
         try:
-            s = await fetch_fear_greed_async()
-            if s is None:
-                score = float(get_sentiment_score_cached())
-            else:
-                score = float(s)
+            # Folds a fresh reading into the smoothed score
+            await refresher.refresh_once()
         except Exception:
-            score = float(get_sentiment_score_cached())
-    else:
-        score = float(get_sentiment_score_cached())
-
-    import time as _time
+            pass
+    score, ts = refresher.latest
 
     try:
         if _SENTIMENT_GAUGE is not None:
@@ -193,6 +171,6 @@ async def get_sentiment(refresh: int = 0) -> Dict[str, Any]:
     return {
         "score": score,
         "source": "fear_greed",
-        "ts": int(_time.time()),
+        "ts": int(ts),
         "cached": int(refresh) == 0,
     }
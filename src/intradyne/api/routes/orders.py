@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import uuid
-from typing import Callable, Dict, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
@@ -19,6 +19,10 @@ class OrderIn(BaseModel):
     qty: float
 
 
+class OrderBatchIn(BaseModel):
+    orders: List[OrderIn]
+
+
 def submit_order(
     guardrails: Guardrails,
     order: OrderReq,
@@ -55,6 +59,7 @@ def submit_order(
         return False, {"error": action, "reasons": reasons}
 
     result = executor(adj)
+    guardrails.on_fill(adj)
     guardrails.ledger.append(
         "order_allowed",
         {
@@ -70,20 +75,92 @@ def submit_order(
     return True, result
 
 
+def submit_orders(
+    guardrails: Guardrails,
+    orders: List[OrderReq],
+    executor: Callable[[OrderReq], Dict],
+) -> List[Tuple[bool, Dict]]:
+    """Batch counterpart of `submit_order`.
+
+    Orders are gated together by `Guardrails.gate_trades`; breach and
+    order_allowed/order_blocked records go to the ledger in one append.
+    """
+    records: List[Tuple[str, Dict[str, Any]]] = []
+    out: List[Tuple[bool, Dict]] = []
+    try:
+        halted = is_halted()
+    except Exception:
+        halted = False
+    try:
+        if halted:
+            decisions = [("halt", ["admin_halt"], o) for o in orders]
+        else:
+            decisions = guardrails.gate_trades(orders, pending=records)
+        for order, (action, reasons, adj) in zip(orders, decisions):
+            if action != "allow":
+                records.append(
+                    (
+                        "order_blocked",
+                        {
+                            "symbol": order.symbol,
+                            "side": order.side,
+                            "qty": order.qty,
+                            "action": action,
+                            "reasons": reasons,
+                        },
+                    )
+                )
+                out.append((False, {"error": action, "reasons": reasons}))
+                continue
+            result = executor(adj)
+            guardrails.on_fill(adj)
+            records.append(
+                (
+                    "order_allowed",
+                    {
+                        "symbol": adj.symbol,
+                        "side": adj.side,
+                        "qty": adj.qty,
+                        "reasons": reasons,
+                        "exec": {
+                            k: result.get(k)
+                            for k in ("order_id", "status", "venue")
+                            if k in result
+                        },
+                    },
+                )
+            )
+            out.append((True, result))
+    finally:
+        guardrails.commit(records)
+    return out
+
+
+def _exec(o: OrderReq) -> Dict:
+    return {
+        "trade_id": str(uuid.uuid4()),
+        "order_id": str(uuid.uuid4()),
+        "status": "accepted",
+    }
+
+
 @router.post("/orders")
 def create_order(inp: OrderIn):
     gr = get_guardrails()
-
-    def _exec(o: OrderReq) -> Dict:
-        return {
-            "trade_id": str(uuid.uuid4()),
-            "order_id": str(uuid.uuid4()),
-            "status": "accepted",
-        }
-
     ok, payload = submit_order(
         gr, OrderReq(symbol=inp.symbol, side=inp.side, qty=inp.qty), _exec
     )
     if not ok:
         raise HTTPException(status_code=400, detail=payload)
     return payload
+
+
+@router.post("/orders/batch")
+def create_orders(inp: OrderBatchIn):
+    gr = get_guardrails()
+    reqs = [OrderReq(symbol=o.symbol, side=o.side, qty=o.qty) for o in inp.orders]
+    results = submit_orders(gr, reqs, _exec)
+    return {
+        "results": [{"ok": ok, **payload} for ok, payload in results],
+        "accepted": sum(1 for ok, _ in results if ok),
+    }
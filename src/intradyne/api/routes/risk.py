@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Response
 
 import orjson
-from intradyne.api.deps import get_guardrails
-from intradyne.core.config import load_settings
-from intradyne.risk.guardrails import dd_30d
+from intradyne.api.deps import etag_matches, get_guardrails, ledger_etag
+from intradyne.core.config import get_settings
 
 
 router = APIRouter()
@@ -17,11 +15,10 @@ router = APIRouter()
 @router.get("/risk/status")
 async def risk_status():
     gr = get_guardrails()
-    settings = load_settings()
-    since = datetime.utcnow() - timedelta(hours=24)
-    breaches = sum(1 for _ in gr.ledger.iter_recent(since))
+    settings = get_settings()
+    breaches = gr.sync_breaches().count("24h")
     try:
-        dd = dd_30d(gr.risk.equity_series_30d())
+        dd = gr.current_drawdown()
     except Exception:
         dd = 0.0
     return {
@@ -37,58 +34,56 @@ async def risk_status():
     }
 
 
-@router.get("/ledger/tail")
-async def ledger_tail(n: int = 100) -> List[Dict]:
-    gr = get_guardrails()
-    path = gr.ledger.path
-    lines: List[str] = []
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    lines.append(line)
-    except FileNotFoundError:
-        return []
-
+def _tail_records(n: int) -> List[Dict]:
     out: List[Dict] = []
-    for line in lines[-max(0, int(n)) :]:
-        try:
-            rec = orjson.loads(line)
-            rec.pop("SMTP_PASS", None)
-            out.append(rec)
-        except Exception:
-            continue
+    for rec in get_guardrails().ledger.tail(n):
+        if "SMTP_PASS" in rec:
+            # Cached records are shared; strip on a copy
+            rec = {k: v for k, v in rec.items() if k != "SMTP_PASS"}
+        out.append(rec)
     return out
 
 
+# Serialized /ledger/tail bodies by ETag; pollers repeat a handful of `n`s
+_TAIL_BODIES: Dict[str, bytes] = {}
+
+
+@router.get("/ledger/tail")
+async def ledger_tail(
+    n: int = 100,
+    if_none_match: Optional[str] = Header(default=None, alias="If-None-Match"),
+) -> Response:
+    n = max(0, int(n))
+    etag = ledger_etag(get_guardrails().ledger, n)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    body = _TAIL_BODIES.get(etag)
+    if body is None:
+        body = orjson.dumps(_tail_records(n))
+        if len(_TAIL_BODIES) >= 16:
+            _TAIL_BODIES.clear()
+        _TAIL_BODIES[etag] = body
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @router.get("/metrics")
 async def metrics():
     gr = get_guardrails()
-    now = datetime.utcnow()
-    counts = {
-        "breaches_1h": sum(
-            1
-            for r in gr.ledger.iter_recent(now - timedelta(hours=1))
-            if r.get("event") == "guardrail_breach"
-        ),
-        "breaches_24h": sum(
-            1
-            for r in gr.ledger.iter_recent(now - timedelta(hours=24))
-            if r.get("event") == "guardrail_breach"
-        ),
-        "breaches_7d": sum(
-            1
-            for r in gr.ledger.iter_recent(now - timedelta(days=7))
-            if r.get("event") == "guardrail_breach"
-        ),
-    }
+    breaches = gr.sync_breaches()
+    counts = {f"breaches_{w}": breaches.count(w) for w in ("1h", "24h", "7d")}
     try:
-        dd = dd_30d(gr.risk.equity_series_30d())
+        dd = gr.current_drawdown()
     except Exception:
         dd = 0.0
     return {"counts": counts, "dd_30d": dd}
 
 
+@router.get("/risk/metrics")
+async def risk_metrics():
+    gr = get_guardrails()
+    return {"breaches": gr.sync_breaches().snapshot()}
+
+
 @router.get("/overview")
 async def overview():
     st = await risk_status()
@@ -96,7 +91,7 @@ async def overview():
     from intradyne.api.health import VERSION as _V
 
     # Ledger last 5
-    tail = await ledger_tail(5)
+    tail = _tail_records(5)
     return {
         "version": _V,
         "risk": st,
@@ -1,42 +1,18 @@
 from __future__ import annotations
 
 import asyncio
-import math
 import time
-from typing import Dict, List
 
-import httpx
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 from intradyne.api.deps import get_ledger
 from intradyne.api.ratelimit import ws_rate_limit
+from src.data.price_hub import get_price_hub
+from intradyne.api.ledger_stream import get_ledger_follower
 
 
 router = APIRouter()
 
 
-async def _fetch_prices(
-    client: httpx.AsyncClient, symbols: List[str]
-) -> Dict[str, float]:
-    out: Dict[str, float] = {}
-    for s in symbols:
-        if s.upper() == "USDT":
-            out[s] = 1.0
-            continue
-        mapped = s.replace("/", "")
-        try:
-            r = await client.get(
-                "https://api.binance.com/api/v3/ticker/price",
-                params={"symbol": mapped},
-            )
-            r.raise_for_status()
-            data = r.json()
-            out[s] = float(data["price"])
-        except Exception:
-            out[s] = out.get(s, 0.0)
-        await asyncio.sleep(0)
-    return out
-
-
 @router.websocket("/ws/ticks")
 async def ws_ticks(
     websocket: WebSocket,
@@ -44,52 +20,23 @@ async def ws_ticks(
     interval: float = Query(1.0, ge=0.1, le=10.0),
     mock: int = Query(0, description="Use synthetic prices when 1 (for tests)"),
 ) -> None:
+    """Stream last prices for `symbols`, at most one update per `interval`.
+
+    All clients share one upstream poller (see `src.data.price_hub`).
+    """
     syms = [s.strip() for s in symbols.split(",") if s.strip()]
     await websocket.accept()
+    hub = get_price_hub(mock=bool(mock))
+    sub = hub.subscribe(syms, float(interval))
     try:
-        if mock:
-            # Synthetic sine-wave ticks for testing
-            i = 0
-            while True:
-                now = time.time()
-                payload = []
-                for idx, s in enumerate(syms):
-                    base = 100.0 + 10.0 * idx
-                    px = base + 2.0 * math.sin((i + idx) / 5.0)
-                    payload.append({"ts": now, "symbol": s, "last": round(px, 4)})
-                # Enforce WS rate limiter (token bucket)
-                if not await ws_rate_limit(websocket, "/ws/ticks"):
-                    await websocket.send_json({"error": "rate_limited"})
-                    await websocket.close()
-                    return
-                await websocket.send_json({"ticks": payload})
-                i += 1
-                await asyncio.sleep(max(0.05, float(interval)))
-        else:
-            backoff = 1.0
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                while True:
-                    try:
-                        now = time.time()
-                        prices = await _fetch_prices(client, syms)
-                        payload = [
-                            {"ts": now, "symbol": s, "last": prices.get(s, 0.0)}
-                            for s in syms
-                        ]
-                        if not await ws_rate_limit(websocket, "/ws/ticks"):
-                            await websocket.send_json({"error": "rate_limited"})
-                            await websocket.close()
-                            return
-                        await websocket.send_json({"ticks": payload})
-                        backoff = 1.0  # reset after success
-                    except Exception as e:
-                        try:
-                            await websocket.send_json({"error": str(e)})
-                        except Exception:
-                            pass
-                        # exponential backoff, capped at 30s
-                        backoff = min(backoff * 2.0, 30.0)
-                    await asyncio.sleep(max(float(interval), backoff))
+        while True:
+            msg = await sub.next()
+            # Enforce WS rate limiter (token bucket)
+            if not await ws_rate_limit(websocket, "/ws/ticks"):
+                await websocket.send_json({"error": "rate_limited"})
+                await websocket.close()
+                return
+            await websocket.send_json(msg)
     except WebSocketDisconnect:
         return
     except Exception as e:  # noqa: BLE001
@@ -98,6 +45,8 @@ async def ws_ticks(
         except Exception:
             pass
         await websocket.close()
+    finally:
+        hub.unsubscribe(sub)
 
 
 @router.websocket("/ws/ledger")
@@ -113,7 +62,8 @@ async def ws_ledger(
     - tail: number of recent lines to emit initially
     - follow: when 1, continue streaming new lines
     - mock: when 1, stream synthetic events for testing
-    - interval: poll interval when following a file
+    - interval: emit interval for mock records (file following is shared
+      and change-driven)
     """
     await websocket.accept()
     try:
@@ -137,62 +87,42 @@ async def ws_ledger(
             # Tail + follow file
             led = get_ledger()
             path = led.path
+
+            # Follow through the shared watcher: one reader per ledger file
+            # fans pre-serialized records out to every connected client.
+            # Subscribe before reading the tail so no append falls between.
+            follower = get_ledger_follower(path) if follow else None
+            sub = follower.subscribe() if follower is not None else None
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
-            except FileNotFoundError:
-                lines = []
-            import orjson
+                # Send tail records (reverse-seek read, shared cached view)
+                for rec in led.tail(int(tail)):
+                    try:
+                        if not await ws_rate_limit(websocket, "/ws/ledger"):
+                            await websocket.send_json({"error": "rate_limited"})
+                            await websocket.close()
+                            return
+                        await websocket.send_json({"record": rec})
+                    except Exception:
+                        continue
 
-            # Send tail records
-            for line in lines[-int(tail) :]:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
+                if sub is None:
+                    await websocket.close()
+                    return
+
+                while True:
+                    msg = await sub.get()
+                    if msg is None:
+                        await websocket.send_json({"error": "slow_consumer"})
+                        await websocket.close()
+                        return
                     if not await ws_rate_limit(websocket, "/ws/ledger"):
                         await websocket.send_json({"error": "rate_limited"})
                         await websocket.close()
                         return
-                    await websocket.send_json({"record": orjson.loads(line)})
-                except Exception:
-                    continue
-
-            if not follow:
-                await websocket.close()
-                return
-
-            # Follow by polling size and reading new lines
-            pos = 0
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    f.seek(0, 2)
-                    pos = f.tell()
-            except FileNotFoundError:
-                pos = 0
-
-            while True:
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        f.seek(pos)
-                        for line in f:
-                            if not line.strip():
-                                continue
-                            try:
-                                if not await ws_rate_limit(websocket, "/ws/ledger"):
-                                    await websocket.send_json({"error": "rate_limited"})
-                                    await websocket.close()
-                                    return
-                                await websocket.send_json(
-                                    {"record": orjson.loads(line)}
-                                )
-                            except Exception:
-                                continue
-                        pos = f.tell()
-                except FileNotFoundError:
-                    # File might be rotated; wait and retry
-                    pos = 0
-                await asyncio.sleep(float(interval))
+                    await websocket.send_text(msg)
+            finally:
+                if follower is not None and sub is not None:
+                    follower.unsubscribe(sub)
     except WebSocketDisconnect:
         return
     except Exception as e:  # noqa: BLE001
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from typing import List, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
 
 def dd_30d(equity_series: List[Tuple[datetime, float]]) -> float:
@@ -10,4 +10,78 @@ def dd_30d(equity_series: List[Tuple[datetime, float]]) -> float:
     return _dd(equity_series)
 
 
-__all__ = ["dd_30d"]
+# (peak, trough, max drawdown) of a run of consecutive points
+_Agg = Tuple[float, float, float]
+_EMPTY: _Agg = (float("-inf"), float("inf"), 0.0)
+
+
+def _combine(older: _Agg, newer: _Agg) -> _Agg:
+    peak, trough, dd = older
+    cross = (peak - newer[1]) / peak if peak > 0 and newer[1] < peak else 0.0
+    return (max(peak, newer[0]), min(trough, newer[1]), max(dd, newer[2], cross))
+
+
+def _point(eq: float) -> _Agg:
+    return (eq, eq, 0.0)
+
+
+class RollingDrawdown:
+    """Max drawdown over a sliding time window in amortized O(1) per point.
+
+    The window is a two-stack queue: each stack entry carries the running
+    (peak, trough, drawdown) of its stack segment, and two adjacent runs
+    combine exactly (the cross term is the older peak against the newer
+    trough). Appends and expiries are amortized O(1) and reads are O(1);
+    nothing is ever rescanned. Matches `dd_30d` over the points currently
+    in the window.
+    """
+
+    def __init__(self, window: timedelta = timedelta(days=30)) -> None:
+        self.window = window
+        # Oldest points, newest first; agg covers the entry and everything below
+        self._front: List[Tuple[datetime, float, _Agg]] = []
+        # Newest points, oldest first; agg covers everything up to the entry
+        self._back: List[Tuple[datetime, float, _Agg]] = []
+
+    def _pop_oldest(self) -> None:
+        if not self._front:
+            acc = _EMPTY
+            while self._back:
+                ts, eq, _agg = self._back.pop()
+                acc = _combine(_point(eq), acc)
+                self._front.append((ts, eq, acc))
+        self._front.pop()
+
+    def _oldest_ts(self) -> Optional[datetime]:
+        if self._front:
+            return self._front[-1][0]
+        return self._back[0][0] if self._back else None
+
+    def update(self, ts: datetime, equity: float) -> None:
+        eq = float(equity)
+        prev = self._back[-1][2] if self._back else _EMPTY
+        self._back.append((ts, eq, _combine(prev, _point(eq))))
+        cutoff = ts - self.window
+        oldest = self._oldest_ts()
+        while oldest is not None and oldest < cutoff:
+            self._pop_oldest()
+            oldest = self._oldest_ts()
+
+    def _agg(self) -> _Agg:
+        front = self._front[-1][2] if self._front else _EMPTY
+        back = self._back[-1][2] if self._back else _EMPTY
+        return _combine(front, back)
+
+    def value(self) -> float:
+        return self._agg()[2]
+
+    def value_with(self, equity: float) -> float:
+        """Drawdown as if `equity` were appended (e.g. a still-open bucket)."""
+        return _combine(self._agg(), _point(float(equity)))[2]
+
+    def series(self) -> List[Tuple[datetime, float]]:
+        older = [(ts, eq) for ts, eq, _ in reversed(self._front)]
+        return older + [(ts, eq) for ts, eq, _ in self._back]
+
+
+__all__ = ["RollingDrawdown", "dd_30d"]
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from src.risk.drawdown import RollingDrawdown
+from src.risk.guardrails import RiskData
+from src.risk.var_limit import RollingVaR
+
+# Rollup tables and their bucket width in seconds
+ROLLUPS: Dict[str, int] = {"1m": 60, "1h": 3600, "1d": 86400}
+_DAYS = 30
+
+
+class EquityStore(RiskData):
+    """Equity time series in SQLite: raw points plus 1m/1h/1d OHLC rollups.
+
+    Every `record` appends the raw point and upserts the three rollup
+    buckets in one transaction. The last 30 days of hourly closes and 31
+    daily closes are also kept in memory, so `equity_series_30d` and
+    `equity_daily_returns_30d` never query SQLite or touch raw points.
+    Drawdown (over hourly closes) and VaR (over completed days) are kept
+    incrementally as buckets complete, so guardrail reads are O(1).
+    Points recorded by another process (the trading loop) are picked up by
+    reloading the in-memory views when `PRAGMA data_version` changes.
+    """
+
+    def __init__(self, path: str = "data/equity.sqlite") -> None:
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS equity_raw (ts REAL NOT NULL, equity REAL NOT NULL)"
+        )
+        for name in ROLLUPS:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS equity_{name} ("
+                "bucket INTEGER PRIMARY KEY, open REAL, high REAL, low REAL,"
+                " close REAL, n INTEGER)"
+            )
+        self._conn.commit()
+        self._data_version: Optional[int] = None
+        self._reload()
+
+    def _reload(self) -> None:
+        self._hourly: Deque[Tuple[int, float]] = deque(maxlen=24 * _DAYS + 1)
+        self._daily: Deque[Tuple[int, float]] = deque(maxlen=_DAYS + 1)
+        # (window key, value); also invalidated when a new point is recorded
+        self._series_cache: Optional[Tuple[int, List[Tuple[datetime, float]]]] = None
+        self._returns_cache: Optional[Tuple[int, List[float]]] = None
+        # Completed hourly closes (the open hour is added at read time)
+        self._dd = RollingDrawdown(timedelta(hours=24 * _DAYS - 1))
+        self._var = RollingVaR(maxlen=_DAYS)
+        self._done_day: Optional[int] = None
+        self._done_close = 0.0
+        self._load_recent()
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync(self) -> None:
+        # data_version ignores this connection's own commits
+        dv = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if dv != self._data_version:
+            self._reload()
+
+    def _load_recent(self) -> None:
+        now = time.time()
+        for name, dq in (("1h", self._hourly), ("1d", self._daily)):
+            width = ROLLUPS[name]
+            since = int(now // width) - (dq.maxlen or 0)
+            rows = self._conn.execute(
+                f"SELECT bucket, close FROM equity_{name} WHERE bucket > ? ORDER BY bucket",
+                (since,),
+            ).fetchall()
+            dq.extend((int(b), float(c)) for b, c in rows)
+        for b, c in list(self._hourly)[:-1]:
+            self._dd.update(datetime.utcfromtimestamp(b * 3600), c)
+        today = int(now // 86400)
+        for b, c in self._daily:
+            if b < today:
+                self._complete_day(b, c)
+
+    def _complete_day(self, bucket: int, close: float) -> None:
+        if self._done_day is not None and bucket <= self._done_day:
+            return
+        if self._done_close > 0:
+            self._var.push(close / self._done_close - 1.0)
+        self._done_day, self._done_close = bucket, close
+
+    @staticmethod
+    def _push(dq: Deque[Tuple[int, float]], bucket: int, close: float) -> None:
+        if dq and dq[-1][0] == bucket:
+            dq[-1] = (bucket, close)
+        elif not dq or dq[-1][0] < bucket:
+            dq.append((bucket, close))
+
+    def record(self, equity: float, ts: Optional[float] = None) -> None:
+        """Append an equity point at epoch seconds `ts` (default: now)."""
+        t = time.time() if ts is None else float(ts)
+        eq = float(equity)
+        with self._lock:
+            self._sync()
+            cur = self._conn.cursor()
+            cur.execute("INSERT INTO equity_raw (ts, equity) VALUES (?, ?)", (t, eq))
+            for name, width in ROLLUPS.items():
+                cur.execute(
+                    f"INSERT INTO equity_{name} (bucket, open, high, low, close, n)"
+                    " VALUES (?, ?, ?, ?, ?, 1) ON CONFLICT(bucket) DO UPDATE SET"
+                    " high = max(high, excluded.high), low = min(low, excluded.low),"
+                    " close = excluded.close, n = n + 1",
+                    (int(t // width), eq, eq, eq, eq),
+                )
+            self._conn.commit()
+            hour, day = int(t // 3600), int(t // 86400)
+            if self._hourly and self._hourly[-1][0] < hour:
+                b, c = self._hourly[-1]
+                self._dd.update(datetime.utcfromtimestamp(b * 3600), c)
+            if self._daily and self._daily[-1][0] < day:
+                self._complete_day(*self._daily[-1])
+            self._push(self._hourly, hour, eq)
+            self._push(self._daily, day, eq)
+            self._series_cache = None
+            self._returns_cache = None
+
+    def rollup(
+        self, name: str, since: float, until: Optional[float] = None
+    ) -> List[Tuple[int, float, float, float, float, int]]:
+        """(bucket start ts, open, high, low, close, n) rows of one rollup."""
+        width = ROLLUPS[name]
+        hi = int((time.time() if until is None else until) // width)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT bucket, open, high, low, close, n FROM equity_{name}"
+                " WHERE bucket >= ? AND bucket <= ? ORDER BY bucket",
+                (int(since // width), hi),
+            ).fetchall()
+        return [(b * width, o, h, lo, c, n) for b, o, h, lo, c, n in rows]
+
+    def equity_series_30d(self) -> List[Tuple[datetime, float]]:
+        """Hourly closes over the last 30 days."""
+        hour = int(time.time() // 3600)
+        with self._lock:
+            self._sync()
+            if self._series_cache is None or self._series_cache[0] != hour:
+                first = hour - 24 * _DAYS
+                series = [
+                    (datetime.utcfromtimestamp(b * 3600), c)
+                    for b, c in self._hourly
+                    if b > first
+                ]
+                self._series_cache = (hour, series)
+            return self._series_cache[1]
+
+    def equity_daily_returns_30d(self) -> List[float]:
+        """Close-to-close returns of completed days (the current day excluded)."""
+        today = int(time.time() // 86400)
+        with self._lock:
+            self._sync()
+            if self._returns_cache is None or self._returns_cache[0] != today:
+                closes = [c for b, c in self._daily if b < today]
+                rets = [b / a - 1.0 for a, b in zip(closes, closes[1:]) if a > 0]
+                self._returns_cache = (today, rets[-_DAYS:])
+            return self._returns_cache[1]
+
+    def drawdown(self) -> float:
+        with self._lock:
+            self._sync()
+            if not self._hourly:
+                return 0.0
+            return self._dd.value_with(self._hourly[-1][1])
+
+    def var(self, alpha: float = 0.95) -> float:
+        with self._lock:
+            self._sync()
+            return self._var.value(alpha)
+
+    def latest_equity(self) -> float:
+        with self._lock:
+            self._sync()
+            return self._hourly[-1][1] if self._hourly else 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_STORE: Optional[EquityStore] = None
+
+
+def get_equity_store() -> EquityStore:
+    global _STORE
+    if _STORE is None:
+        from src.core.config import get_settings
+
+        _STORE = EquityStore(get_settings().EQUITY_DB_PATH)
+    return _STORE
+
+
+__all__ = ["EquityStore", "ROLLUPS", "get_equity_store"]
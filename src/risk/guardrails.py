@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import os
+import threading
 from dataclasses import dataclass, replace
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from src.core.ledger import Ledger
+from src.core.state import SharedState
+from src.risk.drawdown import RollingDrawdown
+from src.risk.kill_switch import BreachCounter
+from src.risk.portfolio_var import PortfolioVaR
+from src.risk.var_limit import RollingVaR
 from prometheus_client import Counter
 
 
@@ -14,6 +20,10 @@ DD_HALT_PCT = float(os.getenv("DD_HALT_PCT", 0.20))
 FLASH_CRASH_PCT = float(os.getenv("FLASH_CRASH_PCT", 0.30))
 KILL_SWITCH_BREACHES = int(os.getenv("KILL_SWITCH_BREACHES", 3))
 VAR_1D_MAX = float(os.getenv("VAR_1D_MAX", 0.05))
+# Aggregate notional cap per gate_trades batch (0 disables)
+BATCH_NOTIONAL_MAX = float(os.getenv("BATCH_NOTIONAL_MAX", 0.0))
+# Breach types recorded for visibility only; they never trip the kill switch
+KILL_SWITCH_EXEMPT = ("batch_exposure",)
 
 _BREACH_COUNTER = Counter(
     "intradyne_guardrail_breaches_total",
@@ -32,6 +42,10 @@ class OrderReq:
     def step_down(self, factor: float = 0.5) -> "OrderReq":
         return replace(self, qty=max(self.qty * factor, 0.0))
 
+    @property
+    def signed_qty(self) -> float:
+        return self.qty if self.side == "buy" else -self.qty
+
     # Ledger is provided by src.core.ledger
 
 
@@ -55,6 +69,72 @@ class RiskData:
     def equity_daily_returns_30d(self) -> List[float]:
         raise NotImplementedError
 
+    def drawdown(self) -> float:
+        """30-day drawdown; stores that keep it incrementally override this."""
+        return dd_30d(self.equity_series_30d())
+
+    def var(self, alpha: float = 0.95) -> float:
+        """1-day historical VaR over the daily returns."""
+        return historical_var(self.equity_daily_returns_30d(), alpha=alpha)
+
+    def latest_equity(self) -> float:
+        """Most recent equity point, 0.0 when there is none."""
+        series = self.equity_series_30d()
+        return float(series[-1][1]) if series else 0.0
+
+
+class RiskMetricsEngine(RiskData):
+    """RiskData fed by equity updates, with drawdown and VaR kept incrementally.
+
+    `update_equity` maintains a rolling 30-day drawdown and, at each UTC day
+    roll, pushes the previous day's close-to-close return into a rolling VaR
+    window. Guardrails read `drawdown()`/`var()` instead of recomputing the
+    statistics from the full series on every order.
+    """
+
+    def __init__(self, window_days: int = 30) -> None:
+        self._lock = threading.Lock()
+        self._dd = RollingDrawdown(timedelta(days=window_days))
+        self._var = RollingVaR(maxlen=window_days)
+        self._day: Optional[date] = None
+        self._close: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        self.version = 0
+
+    def update_equity(self, ts: datetime, equity: float) -> None:
+        eq = float(equity)
+        with self._lock:
+            self._dd.update(ts, eq)
+            day = ts.date()
+            if self._day is not None and day > self._day:
+                if self._prev_close and self._close is not None:
+                    self._var.push(self._close / self._prev_close - 1.0)
+                self._prev_close = self._close
+            if self._day is None or day >= self._day:
+                self._day = day
+                self._close = eq
+            self.version += 1
+
+    def load(self, series: Iterable[Tuple[datetime, float]]) -> None:
+        for ts, eq in series:
+            self.update_equity(ts, eq)
+
+    def drawdown(self) -> float:
+        with self._lock:
+            return self._dd.value()
+
+    def var(self, alpha: float = 0.95) -> float:
+        with self._lock:
+            return self._var.value(alpha)
+
+    def equity_series_30d(self) -> List[Tuple[datetime, float]]:
+        with self._lock:
+            return self._dd.series()
+
+    def equity_daily_returns_30d(self) -> List[float]:
+        with self._lock:
+            return self._var.returns()
+
 
 def _percentile(values: List[float], q: float) -> float:
     if not values:
@@ -113,6 +193,56 @@ class ShariahPolicy:
         return True, "ok"
 
 
+class _RiskSnapshot:
+    """Risk inputs read at most once per gating call and shared by its orders."""
+
+    def __init__(self, gr: "Guardrails") -> None:
+        self.gr = gr
+        self.now = datetime.utcnow()
+        self._dd: Optional[float] = None
+        self._var: Optional[float] = None
+        self._breaches: Optional[int] = None
+        self._pv: Optional[PortfolioVaR] = None
+        self._pv_read = False
+        # Net quantity per symbol of the orders allowed so far in the batch
+        self.deltas: Dict[str, float] = {}
+        self._prices: Dict[Tuple[str, datetime], Optional[float]] = {}
+
+    def drawdown(self) -> float:
+        if self._dd is None:
+            self._dd = self.gr.current_drawdown()
+        return self._dd
+
+    def var(self) -> float:
+        if self._var is None:
+            self._var = self.gr.current_var(alpha=0.95)
+        return self._var
+
+    def breach_count(self) -> int:
+        # Taken once, so breaches recorded mid-batch do not move the kill switch
+        if self._breaches is None:
+            self._breaches = self.gr._recent_breach_count(24)
+        return self._breaches
+
+    def portfolio_var(self) -> Optional[PortfolioVaR]:
+        """The what-if engine, marked to current equity; None until ready."""
+        if not self._pv_read:
+            self._pv_read = True
+            pv = self.gr.portfolio_var
+            if pv is not None:
+                equity = self.gr.risk.latest_equity()
+                if equity > 0:
+                    pv.equity = equity
+                self._pv = pv if pv.ready else None
+        return self._pv
+
+    def price(self, symbol: str, at: datetime) -> Optional[float]:
+        key = (symbol, at)
+        if key not in self._prices:
+            self._prices[key] = self.gr.price.get_price(symbol, at)
+        return self._prices[key]
+
+
 class Guardrails:
     def __init__(
         self,
@@ -121,8 +251,13 @@ class Guardrails:
         ledger: Optional[Ledger] = None,
         shariah: Optional[ShariahPolicy] = None,
         thresholds: Optional[Dict[str, Any]] = None,
+        portfolio_var: Optional[PortfolioVaR] = None,
+        state: Optional[SharedState] = None,
     ) -> None:
         self.price = price_feed
+        # When set (and ready), the VaR step-down uses pre-trade portfolio
+        # (what-if) VaR of the order on top of the batch allowed so far
+        self.portfolio_var = portfolio_var
         self.risk = risk_data
         self.ledger = ledger or Ledger()
         self.shariah = shariah or ShariahPolicy()
@@ -132,14 +267,52 @@ class Guardrails:
             "flash": FLASH_CRASH_PCT,
             "kill_switch": KILL_SWITCH_BREACHES,
             "var_max": VAR_1D_MAX,
+            "batch_notional_max": BATCH_NOTIONAL_MAX,
         }
         if thresholds:
             self.th.update(thresholds)
+        # Rolling breach counts served from memory; the ledger stays the record.
+        # With shared state, a breach sequence number tells this process when
+        # another worker has recorded breaches and the counter must be rebuilt.
+        self.state = state
+        self.breaches = BreachCounter()
+        self._breach_seq = state.seq("breaches") if state is not None else 0
+        self._rebuild_breaches()
+
+    def _rebuild_breaches(self) -> None:
+        horizon = max(self.breaches.windows.values())
+        self.breaches.rebuild(
+            self.ledger.iter_recent(datetime.utcnow() - timedelta(seconds=horizon))
+        )
 
-    def _breach(self, btype: str, **fields: Any) -> None:
+    def sync_breaches(self) -> BreachCounter:
+        """Breach counter, rebuilt first if other workers recorded breaches."""
+        if self.state is not None:
+            seq = self.state.seq("breaches")
+            if seq != self._breach_seq:
+                self._rebuild_breaches()
+                self._breach_seq = seq
+        return self.breaches
+
+    def kill_switch_enabled(self) -> bool:
+        if self.state is None:
+            return True
+        return self.state.get_flag("kill_switch", default=True)
+
+    def _breach(
+        self,
+        btype: str,
+        pending: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+        **fields: Any,
+    ) -> None:
         payload = {"type": btype}
         payload.update(fields)
-        self.ledger.append("guardrail_breach", payload)
+        if pending is not None:
+            # Counted and announced by `commit` once the record is written
+            pending.append(("guardrail_breach", payload))
+        else:
+            self.ledger.append("guardrail_breach", payload)
+            self._committed([payload])
         try:
             _BREACH_COUNTER.labels(
                 type=btype, action=str(fields.get("action", ""))
@@ -147,29 +320,131 @@ class Guardrails:
         except Exception:
             pass
 
+    def commit(self, records: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Append pending ledger records, then count the breaches among them.
+
+        Breaches only reach the counter and the shared sequence after the
+        ledger holds them, so a rebuild triggered by another worker never
+        drops them and other workers never rebuild before they can see them.
+        """
+        self.ledger.append_many(records)
+        self._committed([p for ev, p in records if ev == "guardrail_breach"])
+
+    def _committed(self, breaches: List[Dict[str, Any]]) -> None:
+        if not breaches:
+            return
+        for payload in breaches:
+            self.breaches.record(str(payload["type"]), str(payload.get("action", "")))
+        if self.state is not None:
+            seq = self.state.bump("breaches")
+            if seq == self._breach_seq + 1:
+                # Nobody else wrote in between: our counter is current
+                self._breach_seq = seq
+
     def _recent_breach_count(self, hours: int = 24) -> int:
+        window = f"{hours}h"
+        if window in self.breaches.windows:
+            return self.sync_breaches().count(window, exclude=KILL_SWITCH_EXEMPT)
         since = datetime.utcnow() - timedelta(hours=hours)
-        return sum(
-            1
-            for r in self.ledger.iter_recent(since)
-            if r.get("event") == "guardrail_breach"
-        )
+        return self.ledger.count_since([since], event="guardrail_breach")[0]
+
+    def on_fill(self, req: OrderReq) -> None:
+        """Count an executed order in the what-if positions."""
+        if self.portfolio_var is not None:
+            self.portfolio_var.apply_fill(req.symbol, req.signed_qty)
+
+    def current_drawdown(self) -> float:
+        return self.risk.drawdown()
+
+    def current_var(self, alpha: float = 0.95) -> float:
+        return self.risk.var(alpha)
 
     def gate_trade(self, req: OrderReq) -> Tuple[str, List[str], OrderReq]:
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        try:
+            return self._gate(req, _RiskSnapshot(self), pending)
+        finally:
+            self.commit(pending)
+
+    def gate_trades(
+        self,
+        orders: List[OrderReq],
+        pending: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+    ) -> List[Tuple[str, List[str], OrderReq]]:
+        """Gate a batch of orders against one snapshot of risk state.
+
+        Drawdown, VaR, prices and the kill-switch breach count are read once
+        for the whole batch. Allowed buys count towards the
+        `batch_notional_max` cap in order and allowed sells free it up; buys
+        over the cap are blocked with a single ``batch_exposure`` breach per
+        batch, which does not count towards the kill switch. Breach records
+        are written with one ledger append at the end, or added to `pending`
+        for the caller to `commit` with its own records.
+        """
+        snap = _RiskSnapshot(self)
+        buf: List[Tuple[str, Dict[str, Any]]] = [] if pending is None else pending
+        cap = float(self.th.get("batch_notional_max") or 0.0)
+        notional = 0.0
+        capped = False
+        out: List[Tuple[str, List[str], OrderReq]] = []
+        try:
+            for req in orders:
+                action, reasons, adj = self._gate(req, snap, buf)
+                if action == "allow" and cap > 0:
+                    px = snap.price(adj.symbol, snap.now)
+                    value = abs(adj.qty) * float(px) if px else 0.0
+                    if adj.side != "buy":
+                        notional -= value
+                    elif notional + value > cap:
+                        if not capped:
+                            capped = True
+                            self._breach(
+                                "batch_exposure",
+                                buf,
+                                symbol=adj.symbol,
+                                metric=round(notional + value, 6),
+                                threshold=cap,
+                                action="block",
+                            )
+                        out.append(("block", ["batch_exposure"], req))
+                        continue
+                    else:
+                        notional += value
+                if action == "allow":
+                    # Later orders are gated on top of the ones already allowed
+                    snap.deltas[adj.symbol] = (
+                        snap.deltas.get(adj.symbol, 0.0) + adj.signed_qty
+                    )
+                out.append((action, reasons, adj))
+        finally:
+            if pending is None:
+                self.commit(buf)
+        return out
+
+    def _gate(
+        self,
+        req: OrderReq,
+        snap: _RiskSnapshot,
+        pending: List[Tuple[str, Dict[str, Any]]],
+    ) -> Tuple[str, List[str], OrderReq]:
         reasons: List[str] = []
+        # Breaches this order raises count towards its own kill-switch check
+        first = len(pending)
 
         # 1) Shariah / whitelist
         ok, reason = self.shariah.check(req.symbol, req.meta or {})
         if not ok:
-            self._breach("compliance", symbol=req.symbol, reason=reason, action="block")
+            self._breach(
+                "compliance", pending, symbol=req.symbol, reason=reason, action="block"
+            )
             return "block", [reason], req
 
         # 2) Risk metrics
-        eq = self.risk.equity_series_30d()
-        dd = dd_30d(eq)
+        dd = snap.drawdown()
         if dd >= self.th["dd_halt"]:
             self._breach(
                 "dd_halt",
+                pending,
                 metric=round(dd, 6),
                 threshold=self.th["dd_halt"],
                 action="halt",
@@ -178,6 +453,7 @@ class Guardrails:
         if dd >= self.th["dd_warn"]:
             self._breach(
                 "dd_warn",
+                pending,
                 metric=round(dd, 6),
                 threshold=self.th["dd_warn"],
                 action="warn",
@@ -185,14 +461,14 @@ class Guardrails:
             reasons.append(f"dd_warn {dd:.3f}")
 
         # 3) Flash crash check (1h drop > threshold)
-        now = datetime.utcnow()
-        p_now = self.price.get_price(req.symbol, now)
-        p_1h = self.price.get_price(req.symbol, now - timedelta(hours=1))
+        p_now = snap.price(req.symbol, snap.now)
+        p_1h = snap.price(req.symbol, snap.now - timedelta(hours=1))
         if p_now and p_1h and p_1h > 0:
             drop = (p_1h - p_now) / p_1h
             if drop > self.th["flash"]:
                 self._breach(
                     "flash_crash",
+                    pending,
                     symbol=req.symbol,
                     metric=round(drop, 6),
                     threshold=self.th["flash"],
@@ -205,16 +481,29 @@ class Guardrails:
                 )
 
         # 4) Kill switch (N breaches in last 24h)
-        if self._recent_breach_count(24) >= int(self.th["kill_switch"]):
-            self._breach("kill_switch", action="halt")
+        raised = sum(
+            1
+            for ev, p in pending[first:]
+            if ev == "guardrail_breach" and p["type"] not in KILL_SWITCH_EXEMPT
+        )
+        if self.kill_switch_enabled() and snap.breach_count() + raised >= int(
+            self.th["kill_switch"]
+        ):
+            self._breach("kill_switch", pending, action="halt")
             return "halt", ["kill_switch"], req
 
         # 5) VaR step-down
-        rets = self.risk.equity_daily_returns_30d()
-        var = historical_var(rets, alpha=0.95)
+        pv = snap.portfolio_var()
+        if pv is not None:
+            deltas = dict(snap.deltas)
+            deltas[req.symbol] = deltas.get(req.symbol, 0.0) + req.signed_qty
+            var = pv.what_if_many_pct(deltas, alpha=0.95)
+        else:
+            var = snap.var()
         if var > self.th["var_max"]:
             self._breach(
                 "var_stepdown",
+                pending,
                 metric=round(var, 6),
                 threshold=self.th["var_max"],
                 action="stepdown",
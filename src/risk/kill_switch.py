@@ -1,5 +1,135 @@
 from __future__ import annotations
 
-# Placeholder module for rolling 24h breach counter
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
 
-__all__: list[str] = []
+# Rolling windows tracked by default (label -> seconds)
+DEFAULT_WINDOWS: Dict[str, int] = {"1h": 3600, "24h": 86400, "7d": 7 * 86400}
+
+_Key = Tuple[str, str]  # (breach type, action)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch_s(value: Any) -> Optional[float]:
+    try:
+        dt = datetime.fromisoformat(str(value).rstrip("Z"))
+    except Exception:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None) - (dt.utcoffset() or timedelta(0))
+    return (dt - _EPOCH).total_seconds()
+
+
+class BreachCounter:
+    """Time-bucketed rolling counts of guardrail breaches per (type, action).
+
+    Breaches land in fixed-width buckets; each window keeps running totals and
+    subtracts buckets as they age out, so queries cost O(number of distinct
+    type/action pairs) regardless of how many breaches the ledger holds. The
+    ledger stays the source of truth: rebuild with `rebuild()` on startup.
+    Counts are per process.
+    """
+
+    def __init__(
+        self, windows: Optional[Dict[str, int]] = None, bucket_s: int = 60
+    ) -> None:
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self.bucket_s = max(1, int(bucket_s))
+        self._lock = threading.Lock()
+        # Non-empty buckets, oldest first: (bucket id, counts)
+        self._buckets: Deque[Tuple[int, Counter[_Key]]] = deque()
+        self._totals: Dict[str, Counter[_Key]] = {w: Counter() for w in self.windows}
+        # Per window: number of leading buckets already outside it
+        self._edge: Dict[str, int] = {w: 0 for w in self.windows}
+
+    def _advance(self, now: float) -> None:
+        bucket_now = int(now // self.bucket_s)
+        for w, span in self.windows.items():
+            first = bucket_now - span // self.bucket_s + 1
+            edge = self._edge[w]
+            while edge < len(self._buckets) and self._buckets[edge][0] < first:
+                self._totals[w].subtract(self._buckets[edge][1])
+                edge += 1
+            self._edge[w] = edge
+        # Drop buckets that have left every window
+        drop = min(self._edge.values(), default=len(self._buckets))
+        for _ in range(drop):
+            self._buckets.popleft()
+        for w in self._edge:
+            self._edge[w] -= drop
+
+    def record(self, btype: str, action: str = "", ts: Optional[float] = None) -> None:
+        """Count one breach at epoch seconds `ts` (default: now)."""
+        ts = time.time() if ts is None else float(ts)
+        key = (str(btype), str(action))
+        bucket = int(ts // self.bucket_s)
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] >= bucket:
+                # Same bucket (or a slightly out-of-order timestamp)
+                self._buckets[-1][1][key] += 1
+            else:
+                self._buckets.append((bucket, Counter({key: 1})))
+            last = len(self._buckets) - 1
+            for w in self.windows:
+                if self._edge[w] <= last:
+                    self._totals[w][key] += 1
+            self._advance(time.time())
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Reset from ledger records (oldest first), keeping breach events only."""
+        with self._lock:
+            self._buckets.clear()
+            for w in self.windows:
+                self._totals[w] = Counter()
+                self._edge[w] = 0
+        for rec in records:
+            if rec.get("event") != "guardrail_breach":
+                continue
+            ts = _epoch_s(rec.get("ts"))
+            if ts is not None:
+                self.record(str(rec.get("type", "")), str(rec.get("action", "")), ts=ts)
+
+    def count(
+        self,
+        window: str = "24h",
+        btype: Optional[str] = None,
+        action: Optional[str] = None,
+        exclude: Iterable[str] = (),
+    ) -> int:
+        """Breaches in `window`, optionally filtered; `exclude` skips types."""
+        skip = set(exclude)
+        with self._lock:
+            self._advance(time.time())
+            return sum(
+                n
+                for (t, a), n in self._totals[window].items()
+                if n > 0
+                and t not in skip
+                and (btype is None or t == btype)
+                and (action is None or a == action)
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-window totals with breakdowns by type and by action."""
+        with self._lock:
+            self._advance(time.time())
+            out: Dict[str, Dict[str, Any]] = {}
+            for w, totals in self._totals.items():
+                by_type: Counter[str] = Counter()
+                by_action: Counter[str] = Counter()
+                for (t, a), n in totals.items():
+                    if n > 0:
+                        by_type[t] += n
+                        by_action[a] += n
+                out[w] = {
+                    "total": sum(by_type.values()),
+                    "by_type": dict(by_type),
+                    "by_action": dict(by_action),
+                }
+            return out
+
+
+__all__ = ["BreachCounter", "DEFAULT_WINDOWS"]
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import math
+import threading
+from statistics import NormalDist
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+
+class PortfolioVaR:
+    """Cross-asset VaR from an EWMA covariance of per-bar log returns.
+
+    `update_prices` folds one bar of returns into the covariance
+    (RiskMetrics-style ``S = lam*S + (1-lam)*r r'``). VaR is computed on the
+    current exposure vector (qty * last price): parametric as
+    ``z * sqrt(w' S w)`` and Monte Carlo via a cached Cholesky factor and a
+    fixed block of normal draws. `what_if` evaluates a candidate order in
+    O(n) from the cached ``S w``, which is cheap enough for per-order checks.
+    VaR figures are losses in quote currency over `horizon_bars` bars
+    (square-root-of-time scaling); divide by `equity` (or use the `*_pct`
+    helpers) for a fraction.
+
+    Live, `on_price` samples a price stream into bars of `bar_s` seconds
+    and `apply_fill` keeps the positions current; `ready` tells when at
+    least `min_bars` bars of returns are in.
+    """
+
+    def __init__(
+        self,
+        symbols: Optional[List[str]] = None,
+        lam: float = 0.94,
+        mc_paths: int = 10000,
+        seed: int = 7,
+        bar_s: float = 0.0,
+        horizon_bars: float = 1.0,
+        min_bars: int = 0,
+    ) -> None:
+        self.lam = float(lam)
+        self.mc_paths = max(100, int(mc_paths))
+        self.bar_s = max(0.0, float(bar_s))
+        self.horizon_bars = max(0.0, float(horizon_bars))
+        self.min_bars = max(0, int(min_bars))
+        # Open bar of `on_price`: bucket id and latest price per symbol
+        self._bar: Optional[int] = None
+        self._closes: Dict[str, float] = {}
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self.cov = np.zeros((0, 0))
+        self.prices = np.zeros(0)
+        self.qty = np.zeros(0)
+        self.equity = 0.0
+        self.bars = 0
+        # Derived values, recomputed lazily after cov/exposure changes
+        self._sw: Optional[np.ndarray] = None
+        self._base_var = 0.0
+        self._chol: Optional[np.ndarray] = None
+        self._draws: Optional[np.ndarray] = None
+        for s in symbols or []:
+            self._ensure(s)
+
+    def _ensure(self, symbol: str) -> int:
+        i = self._index.get(symbol)
+        if i is not None:
+            return i
+        i = len(self._index)
+        self._index[symbol] = i
+        cov = np.zeros((i + 1, i + 1))
+        cov[:i, :i] = self.cov
+        self.cov = cov
+        self.prices = np.append(self.prices, np.nan)
+        self.qty = np.append(self.qty, 0.0)
+        self._invalidate(cov_changed=True)
+        self._draws = None
+        return i
+
+    def _invalidate(self, cov_changed: bool = False) -> None:
+        self._sw = None
+        if cov_changed:
+            self._chol = None
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._index)
+
+    def update_prices(self, prices: Mapping[str, float]) -> None:
+        """Fold one bar of closes into the covariance (missing symbols: 0 return)."""
+        with self._lock:
+            for s in prices:
+                self._ensure(s)
+            new = self.prices.copy()
+            for s, px in prices.items():
+                if px and px > 0:
+                    new[self._index[s]] = float(px)
+            valid = np.isfinite(self.prices) & np.isfinite(new)
+            r = np.zeros(len(new))
+            r[valid] = np.log(new[valid] / self.prices[valid])
+            if valid.any():
+                self.cov *= self.lam
+                self.cov += (1.0 - self.lam) * np.outer(r, r)
+                self.bars += 1
+            self.prices = new
+            self._invalidate(cov_changed=True)
+
+    def on_price(self, symbol: str, price: float, ts: float) -> None:
+        """Sample a price stream: each completed `bar_s` bar folds its closes."""
+        if self.bar_s <= 0:
+            return
+        bucket = int(ts // self.bar_s)
+        if self._bar is not None and bucket > self._bar and self._closes:
+            closes, self._closes = self._closes, {}
+            self.update_prices(closes)
+        if self._bar is None or bucket >= self._bar:
+            self._bar = bucket
+            self._closes[symbol] = float(price)
+
+    @property
+    def ready(self) -> bool:
+        return self.bars >= self.min_bars and self.equity > 0
+
+    def set_positions(
+        self, qty: Mapping[str, float], equity: Optional[float] = None
+    ) -> None:
+        with self._lock:
+            for s in qty:
+                self._ensure(s)
+            self.qty[:] = 0.0
+            for s, q in qty.items():
+                self.qty[self._index[s]] = float(q)
+            if equity is not None:
+                self.equity = float(equity)
+            self._invalidate()
+
+    def apply_fill(self, symbol: str, delta_qty: float) -> None:
+        """Add an executed order to the positions (sell: negative)."""
+        with self._lock:
+            self.qty[self._ensure(symbol)] += float(delta_qty)
+            self._invalidate()
+
+    def _exposure(self) -> np.ndarray:
+        return np.nan_to_num(self.qty * self.prices)
+
+    def _sigma_w(self) -> np.ndarray:
+        if self._sw is None:
+            w = self._exposure()
+            self._sw = self.cov @ w
+            self._base_var = float(w @ self._sw)
+        return self._sw
+
+    @staticmethod
+    def _z(alpha: float) -> float:
+        return NormalDist().inv_cdf(alpha)
+
+    def _var(self, alpha: float, variance: float) -> float:
+        return self._z(alpha) * math.sqrt(max(variance, 0.0) * self.horizon_bars)
+
+    def parametric_var(self, alpha: float = 0.95) -> float:
+        with self._lock:
+            self._sigma_w()
+            variance = self._base_var
+        return self._var(alpha, variance)
+
+    def mc_var(self, alpha: float = 0.95) -> float:
+        with self._lock:
+            n = len(self._index)
+            if n == 0:
+                return 0.0
+            if self._chol is None:
+                # Jitter keeps the factorization stable for near-singular S
+                jitter = 1e-12 * max(1.0, float(np.trace(self.cov)))
+                self._chol = np.linalg.cholesky(self.cov + jitter * np.eye(n))
+            if self._draws is None:
+                self._draws = self._rng.standard_normal((self.mc_paths, n))
+            pnl = self._draws @ (self._chol.T @ self._exposure())
+        loss = -float(np.quantile(pnl, 1.0 - alpha))
+        return max(0.0, loss * math.sqrt(self.horizon_bars))
+
+    def what_if(
+        self,
+        symbol: str,
+        delta_qty: float,
+        price: Optional[float] = None,
+        alpha: float = 0.95,
+    ) -> float:
+        """Parametric VaR after adding `delta_qty` of `symbol` (sell: negative)."""
+        prices = {symbol: price} if price is not None else None
+        return self.what_if_many({symbol: delta_qty}, prices, alpha)
+
+    def what_if_many(
+        self,
+        deltas: Mapping[str, float],
+        prices: Optional[Mapping[str, float]] = None,
+        alpha: float = 0.95,
+    ) -> float:
+        """Parametric VaR after several position changes, e.g. a whole batch.
+
+        O(n*k) for k changed symbols: ``w'Sw + 2 d'Sw + d'Sd``.
+        """
+        with self._lock:
+            sw = self._sigma_w()
+            variance = self._base_var
+            idx: List[int] = []
+            d: List[float] = []
+            for s, q in deltas.items():
+                i = self._index.get(s)
+                if i is None:
+                    # No return history for the symbol yet: no covariance to add
+                    continue
+                px = prices.get(s) if prices else None
+                px = px if px is not None else self.prices[i]
+                idx.append(i)
+                d.append(float(q) * float(px) if px and px == px else 0.0)
+            if idx:
+                dv = np.asarray(d)
+                variance += 2.0 * float(dv @ sw[idx])
+                variance += float(dv @ self.cov[np.ix_(idx, idx)] @ dv)
+        return self._var(alpha, variance)
+
+    def _pct(self, var: float) -> float:
+        return var / self.equity if self.equity > 0 else 0.0
+
+    def parametric_var_pct(self, alpha: float = 0.95) -> float:
+        return self._pct(self.parametric_var(alpha))
+
+    def what_if_pct(
+        self,
+        symbol: str,
+        delta_qty: float,
+        price: Optional[float] = None,
+        alpha: float = 0.95,
+    ) -> float:
+        return self._pct(self.what_if(symbol, delta_qty, price, alpha))
+
+    def what_if_many_pct(
+        self,
+        deltas: Mapping[str, float],
+        prices: Optional[Mapping[str, float]] = None,
+        alpha: float = 0.95,
+    ) -> float:
+        return self._pct(self.what_if_many(deltas, prices, alpha))
+
+
+_PV: Optional[PortfolioVaR] = None
+
+
+def get_portfolio_var() -> Optional[PortfolioVaR]:
+    """Process-wide portfolio VaR sampling the API price history, or None.
+
+    Bars of `PORTFOLIO_VAR_BAR_S` seconds scale to a one-day horizon, to
+    match the ``var_max`` (1-day VaR) threshold.
+    """
+    global _PV
+    if _PV is None:
+        from src.core.config import get_settings
+        from src.data.price_history import get_price_history
+
+        settings = get_settings()
+        bar_s = float(settings.PORTFOLIO_VAR_BAR_S)
+        if bar_s <= 0:
+            return None
+        _PV = PortfolioVaR(
+            bar_s=bar_s,
+            horizon_bars=86400.0 / bar_s,
+            min_bars=settings.PORTFOLIO_VAR_MIN_BARS,
+        )
+        get_price_history().add_listener(_PV.on_price)
+    return _PV
+
+
+__all__ = ["PortfolioVaR", "get_portfolio_var"]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import List
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Dict, List
 
 
 def historical_var(returns: List[float], alpha: float = 0.95) -> float:
@@ -9,4 +11,46 @@ def historical_var(returns: List[float], alpha: float = 0.95) -> float:
     return _var(returns, alpha)
 
 
-__all__ = ["historical_var"]
+class RollingVaR:
+    """Historical VaR over the last `maxlen` returns.
+
+    Keeps the window in arrival order and in sorted order (bisect insert and
+    remove), so a quantile read is an index lookup instead of a sort. Results
+    are cached per alpha until the next return is pushed. Matches
+    `historical_var` over the same window.
+    """
+
+    def __init__(self, maxlen: int = 30) -> None:
+        self.maxlen = max(1, int(maxlen))
+        self._window: Deque[float] = deque()
+        self._sorted: List[float] = []
+        self._cache: Dict[float, float] = {}
+
+    def push(self, ret: float) -> None:
+        r = float(ret)
+        self._window.append(r)
+        insort(self._sorted, r)
+        if len(self._window) > self.maxlen:
+            old = self._window.popleft()
+            del self._sorted[bisect_left(self._sorted, old)]
+        self._cache.clear()
+
+    def value(self, alpha: float = 0.95) -> float:
+        cached = self._cache.get(alpha)
+        if cached is not None:
+            return cached
+        vs = self._sorted
+        var = 0.0
+        if vs:
+            q = min(max(1 - alpha, 0.0), 1.0)
+            # nearest-rank, as in guardrails._percentile
+            k = int(max(0, min(len(vs) - 1, round(q * (len(vs) - 1)))))
+            var = max(0.0, -float(vs[k]))
+        self._cache[alpha] = var
+        return var
+
+    def returns(self) -> List[float]:
+        return list(self._window)
+
+
+__all__ = ["RollingVaR", "historical_var"]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import pytest
+
+from intradyne.core.config import reload_settings
+from src.risk.guardrails import PriceFeed, RiskData
+
+
+class StubFeed(PriceFeed, RiskData):
+    """Fixed price and equity returns for Guardrails; counts the reads."""
+
+    def __init__(
+        self, price: Optional[float] = None, returns: Optional[List[float]] = None
+    ) -> None:
+        self.price = price
+        self.returns = list(returns or [])
+        self.price_calls = 0
+        self.risk_calls = 0
+
+    def get_price(self, symbol: str, at: Optional[datetime] = None) -> Optional[float]:
+        self.price_calls += 1
+        return self.price
+
+    def equity_series_30d(self) -> List[Tuple[datetime, float]]:
+        self.risk_calls += 1
+        return []
+
+    def equity_daily_returns_30d(self) -> List[float]:
+        self.risk_calls += 1
+        return list(self.returns)
+
+
+@pytest.fixture
+def stub_feed() -> StubFeed:
+    """Flat market and empty equity history; set `price`/`returns` as needed."""
+    return StubFeed()
+
+
+@pytest.fixture
+def tmp_ledger(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Point the API's explainability ledger at a fresh file under tmp_path."""
+    path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv("EXPLAIN_LEDGER_PATH", str(path))
+    reload_settings()
+    try:
+        yield path
+    finally:
+        monkeypatch.undo()
+        reload_settings()
@@ -22,10 +22,18 @@ def test_ai_summarize_returns_503_when_not_configured(monkeypatch):
 
 
 def test_ai_rate_limit(monkeypatch):
+    from intradyne.core.config import reload_settings
+
     # Tighten AI rate limits and verify 429 after threshold
     monkeypatch.setenv("AI_RATE_LIMIT_REQS", "2")
     monkeypatch.setenv("AI_RATE_LIMIT_WINDOW", "60")
-    rs = [client.get("/ai/status") for _ in range(4)]
+    # Limits are read from the cached settings snapshot
+    reload_settings()
+    try:
+        rs = [client.get("/ai/status") for _ in range(4)]
+    finally:
+        monkeypatch.undo()
+        reload_settings()
     # At least one request should be rate-limited under tight limits
     assert any(r.status_code == 429 for r in rs)
     body = next((r.json() for r in rs if r.status_code == 429), {})
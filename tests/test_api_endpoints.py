@@ -23,3 +23,9 @@ def test_healthz_includes_version():
     body = r.json()
     assert body["status"] == "ok"
     assert body["version"] == "v1.9.0-final"
+
+
+def test_equity_cannot_be_posted_to_the_guardrails():
+    # Equity reaches the guardrails only from the trading loop's store
+    r = client.post("/risk/equity", json={"equity": 1.0})
+    assert r.status_code in (404, 405)
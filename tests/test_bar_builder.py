@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from app.bars import Bar, BarBuilder
+from app.data_loader import DataLoader, LoaderConfig
+
+
+def _tick(ts: float, last: float, volume: float, sym: str = "BTC/USDT") -> dict:
+    return {"symbol": sym, "ts": ts, "last": last, "volume": volume}
+
+
+def test_bars_close_per_timeframe_with_ohlcv():
+    closed: list = []
+    b = BarBuilder(["1s", "1m"], on_close=closed.append)
+    # 24h volume grows 1000 -> 1003 inside the first second
+    b.on_tick(_tick(60.0, 100.0, 1000.0))
+    b.on_tick(_tick(60.2, 103.0, 1001.0))
+    b.on_tick(_tick(60.5, 98.0, 1003.0))
+    b.on_tick(_tick(60.9, 101.0, 1003.0))
+    assert closed == []
+    out = b.on_tick(_tick(61.1, 102.0, 1004.0))
+    assert out == closed and len(closed) == 1
+    bar = closed[0]
+    assert (bar.timeframe, bar.start_ms) == ("1s", 60_000)
+    assert (bar.open, bar.high, bar.low, bar.close) == (100.0, 103.0, 98.0, 101.0)
+    assert bar.volume == 3.0 and bar.ticks == 4
+    # The next minute closes both the 1s and the 1m bar
+    out = b.on_tick(_tick(120.0, 105.0, 1004.0))
+    assert [x.timeframe for x in out] == ["1s", "1m"]
+    m1 = out[1]
+    assert (m1.open, m1.high, m1.low, m1.close) == (100.0, 103.0, 98.0, 102.0)
+    assert m1.volume == 4.0 and m1.ticks == 5
+    assert b.open_bar("BTC/USDT", "1m").start_ms == 120_000
+
+
+def test_conflated_extremes_and_late_ticks():
+    b = BarBuilder(["1m"])
+    b.on_tick({"symbol": "X", "ts": 0.5, "last": 10.0, "high": 12.0, "low": 9.0})
+    # A late tick folds into the open bar instead of reopening the past
+    b.on_tick({"symbol": "X", "ts": 0.1, "last": 11.0})
+    bar = b.open_bar("X", "1m")
+    assert (bar.high, bar.low, bar.close, bar.ticks) == (12.0, 9.0, 11.0, 2)
+
+
+def test_closed_bars_append_to_ohlcv_cache(tmp_path: Path):
+    loader = DataLoader(LoaderConfig(data_dir=tmp_path, exchange="test"))
+    b = BarBuilder(["1m"], loader=loader, flush_s=3600)
+    for i in range(4):
+        b.on_tick(_tick(60.0 * i + 1, 100.0 + i, 10.0 + i))
+    # The first bar started at startup, not at its period: it is not cached
+    assert b.flush() == 2
+    # Already cached bars are not written twice
+    assert loader.append_bars("BTC/USDT", "1m", [[60_000, 1, 1, 1, 1, 0]]) == 0
+
+    async def load():
+        return await loader.load_ohlcv("BTC/USDT", "1m", 0, 120_000)
+
+    df = asyncio.run(load())
+    assert list(df["timestamp"]) == [60_000, 120_000]
+    assert list(df["close"]) == [101.0, 102.0]
+    # A fresh loader finds the cache tail on disk
+    fresh = DataLoader(LoaderConfig(data_dir=tmp_path, exchange="test"))
+    rows = [[120_000, 1, 1, 1, 1, 0], [180_000, 103, 103, 103, 103, 0]]
+    assert fresh.append_bars("BTC/USDT", "1m", rows) == 1
+
+
+def test_router_atr_uses_closed_bars(tmp_path: Path):
+    from app.broker_paper import PaperBroker
+    from app.execution import ExecContext, ExecutionManager
+    from app.ledger import ExplainabilityLedger
+    from app.portfolio import Portfolio
+    from app.risk import RiskManager
+    from app.router import StrategyRouter
+
+    pf = Portfolio()
+    ctx = ExecContext(
+        portfolio=pf,
+        paper=PaperBroker(pf, slippage_bps=0),
+        ledger=ExplainabilityLedger(path=str(tmp_path / "ledger.jsonl")),
+        whitelist=["BTC/USDT"],
+    )
+    risk = RiskManager(0.1, 0.01, 0.02, 0.5, 0.9, 0.9, 5, 3, atr_window=2)
+    router = StrategyRouter(["BTC/USDT"], risk, ExecutionManager(ctx), pf)
+    router.bar_timeframe = "1m"
+    router.on_bar(Bar("BTC/USDT", "1s", 0, 1, 9, 0, 1))  # other timeframe: ignored
+    for i in range(3):
+        router.on_bar(Bar("BTC/USDT", "1m", i * 60_000, 100, 102, 98, 100))
+    # Ticks no longer feed (last, last, last) into the ATR buffer
+    asyncio.run(router.on_tick({"symbol": "BTC/USDT", "ts": 200.0, "last": 100.0}))
+    st = router._symbol_state("BTC/USDT")
+    assert list(st.ohlc) == [(102, 98, 100)] * 3
+    assert router._compute_atr(st) == 4.0
+
+
+def test_live_bar_cache_then_backtest_fetches_missing_history(
+    tmp_path: Path, monkeypatch
+):
+    import pandas as pd
+
+    from app.backtest import run as run_backtest
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    t0 = int(pd.Timestamp("2024-01-01", tz="UTC").timestamp() * 1000)
+    live_start = t0 + 600 * 60_000
+    # A few minutes of live bars land in the cache first
+    loader = DataLoader(LoaderConfig(data_dir=tmp_path, exchange="bitget"))
+    b = BarBuilder(["1m"], loader=loader)
+    for i in range(6):
+        b.on_tick(_tick((live_start + i * 60_000) / 1000 + 1, 200.0 + i, 0.0))
+    b.flush()
+
+    calls: list = []
+
+    async def fake_fetch(self, symbol, timeframe, start_ms, end_ms):
+        calls.append((start_ms, end_ms))
+        ts = range(start_ms, end_ms + 1, 60_000)
+        return pd.DataFrame(
+            [[t, 100.0, 100.5, 99.5, 100.0, 1.0] for t in ts],
+            columns=["timestamp", "open", "high", "low", "close", "volume"],
+        )
+
+    monkeypatch.setattr(DataLoader, "fetch_ohlcv_ccxt", fake_fetch)
+    end = live_start + 4 * 60_000
+    res = run_backtest(
+        ["BTC/USDT"],
+        t0,
+        end,
+        "1m",
+        "momentum",
+        {},
+        2,
+        5,
+        2,
+        seed=1,
+        out_dir=tmp_path / "out",
+    )
+    assert isinstance(res.metrics.get("final_equity"), float)
+    # Only the history before the live bars was downloaded, including the
+    # partial first live bar, which was not cached
+    assert calls == [(t0, live_start)]
+
+    async def load(start, stop):
+        fresh = DataLoader(LoaderConfig(data_dir=tmp_path, exchange="bitget"))
+        return await fresh.load_ohlcv("BTC/USDT", "1m", start, stop)
+
+    df = asyncio.run(load(t0, end))
+    assert len(df) == 605 and df["timestamp"].diff().max() == 60_000
+    # The live bars are kept, not overwritten by the download
+    assert df["close"].iloc[-1] == 204.0
+    # Now covered: no further download
+    asyncio.run(load(t0, end))
+    assert len(calls) == 1
+
+
+def test_gap_between_download_and_live_bars_is_filled(tmp_path: Path, monkeypatch):
+    import pandas as pd
+
+    loader = DataLoader(LoaderConfig(data_dir=tmp_path, exchange="test"))
+    loader.append_bars("X/USDT", "1m", [[i * 60_000, 1, 1, 1, 1, 0] for i in range(10)])
+    loader.append_bars(
+        "X/USDT", "1m", [[i * 60_000, 2, 2, 2, 2, 0] for i in range(50, 55)]
+    )
+    calls: list = []
+
+    async def fake_fetch(self, symbol, timeframe, start_ms, end_ms):
+        calls.append((start_ms, end_ms))
+        return pd.DataFrame(
+            [[t, 3.0, 3.0, 3.0, 3.0, 0.0] for t in range(start_ms, end_ms + 1, 60_000)],
+            columns=["timestamp", "open", "high", "low", "close", "volume"],
+        )
+
+    monkeypatch.setattr(DataLoader, "fetch_ohlcv_ccxt", fake_fetch)
+    df = asyncio.run(loader.load_ohlcv("X/USDT", "1m", 0, 54 * 60_000))
+    assert calls == [(10 * 60_000, 49 * 60_000)]
+    assert len(df) == 55
+
+
+def test_failed_download_is_not_cached_and_retried(tmp_path: Path, monkeypatch):
+    import pandas as pd
+
+    loader = DataLoader(LoaderConfig(data_dir=tmp_path, exchange="test"))
+    live = [[i * 60_000, 2, 2, 2, 2, 0] for i in range(50, 55)]
+    loader.append_bars("X/USDT", "1m", live)
+    path = loader._symbol_path("X/USDT", "1m")
+    before = path.read_bytes()
+    calls: list = []
+
+    async def fake_fetch(self, symbol, timeframe, start_ms, end_ms):
+        calls.append((start_ms, end_ms))
+        if len(calls) == 1:
+            raise ConnectionError("exchange down")
+        return pd.DataFrame(
+            [[t, 3.0, 3.0, 3.0, 3.0, 0.0] for t in range(start_ms, end_ms + 1, 60_000)],
+            columns=["timestamp", "open", "high", "low", "close", "volume"],
+        )
+
+    monkeypatch.setattr(DataLoader, "fetch_ohlcv_ccxt", fake_fetch)
+    df = asyncio.run(loader.load_ohlcv("X/USDT", "1m", 0, 54 * 60_000))
+    # No random-walk bars next to the real ones, in the result or on disk
+    assert list(df["close"]) == [2.0] * 5
+    assert path.read_bytes() == before
+    df = asyncio.run(loader.load_ohlcv("X/USDT", "1m", 0, 54 * 60_000))
+    assert calls == [(0, 49 * 60_000)] * 2
+    assert len(df) == 55 and list(df["close"][:50]) == [3.0] * 50
+
+
+def test_first_bar_after_startup_is_partial():
+    b = BarBuilder(["1m"])
+    b.on_tick(_tick(30.0, 100.0, 1000.0))
+    (first,) = b.on_tick(_tick(61.0, 101.0, 1001.0))
+    (second,) = b.on_tick(_tick(121.0, 102.0, 1002.0))
+    assert first.partial and not second.partial
+    # Other symbols start their own partial bar
+    b.on_tick(_tick(121.0, 5.0, 0.0, sym="ETH/USDT"))
+    assert b.open_bar("ETH/USDT", "1m").partial
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.core.ledger import Ledger
+from src.risk.guardrails import Guardrails, OrderReq
+from src.risk.kill_switch import BreachCounter
+
+
+def test_counter_windows_expire_old_buckets():
+    bc = BreachCounter()
+    now = time.time()
+    bc.record("dd_warn", "warn", ts=now - 2 * 86400)
+    bc.record("flash_crash", "pause", ts=now - 2 * 3600)
+    bc.record("dd_warn", "warn", ts=now - 60)
+    bc.record("compliance", "block")
+
+    assert bc.count("1h") == 2
+    assert bc.count("24h") == 3
+    assert bc.count("7d") == 4
+    assert bc.count("7d", btype="dd_warn") == 2
+    assert bc.count("24h", action="pause") == 1
+    snap = bc.snapshot()
+    assert snap["1h"]["by_type"] == {"dd_warn": 1, "compliance": 1}
+
+
+def test_guardrails_rebuild_counter_and_trip_kill_switch(tmp_path: Path, stub_feed):
+    path = str(tmp_path / "ledger.jsonl")
+    old = (datetime.utcnow() - timedelta(days=2)).isoformat() + "Z"
+    led = Ledger(path=path)
+    led.append("guardrail_breach", {"type": "dd_warn", "action": "warn", "ts": old})
+    led.append("order", {"symbol": "BTC/USDT"})
+    for _ in range(2):
+        led.append("guardrail_breach", {"type": "compliance", "action": "block"})
+
+    feed = stub_feed
+    gr = Guardrails(feed, feed, ledger=Ledger(path=path), thresholds={"kill_switch": 3})
+    assert gr.breaches.count("24h") == 2
+    assert gr.breaches.count("7d") == 3
+
+    decision, _, _ = gr.gate_trade(OrderReq("BTC/USDT", "buy", 1.0))
+    assert decision == "allow"
+    gr._breach("compliance", action="block")
+    decision, reasons, _ = gr.gate_trade(OrderReq("BTC/USDT", "buy", 1.0))
+    assert (decision, reasons) == ("halt", ["kill_switch"])
+    assert gr.breaches.count("24h", btype="kill_switch") == 1
+
+
+def test_breach_raised_in_the_same_call_trips_the_kill_switch(
+    tmp_path: Path, stub_feed
+):
+    path = str(tmp_path / "ledger.jsonl")
+    led = Ledger(path=path)
+    for _ in range(2):
+        led.append("guardrail_breach", {"type": "compliance", "action": "block"})
+    gr = Guardrails(
+        stub_feed,
+        stub_feed,
+        ledger=Ledger(path=path),
+        thresholds={"kill_switch": 3, "dd_warn": 0.1, "dd_halt": 0.5},
+    )
+    gr.current_drawdown = lambda: 0.16  # type: ignore[method-assign]
+    # The dd_warn raised by this order is the third breach
+    decision, reasons, _ = gr.gate_trade(OrderReq("BTC/USDT", "buy", 1.0))
+    assert (decision, reasons) == ("halt", ["kill_switch"])
+    assert gr.breaches.count("24h", btype="dd_warn") == 1
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.conflate import TickConflator
+
+
+def _tick(sym: str, last: float, ts: float, volume: float = 1.0) -> dict:
+    return {"symbol": sym, "last": last, "ts": ts, "volume": volume}
+
+
+def test_conflation_keeps_newest_and_carries_extremes():
+    c = TickConflator(sum_volume=True)
+    c.put(_tick("BTC/USDT", 100.0, 1))
+    c.put(_tick("ETH/USDT", 10.0, 1))
+    c.put(_tick("BTC/USDT", 90.0, 2))
+    c.put(_tick("BTC/USDT", 95.0, 3))
+
+    async def drain() -> list:
+        c.close()
+        return [t async for t in c]
+
+    out = asyncio.run(drain())
+    # Symbol order follows first arrival; BTC collapsed into one tick
+    assert [t["symbol"] for t in out] == ["BTC/USDT", "ETH/USDT"]
+    btc = out[0]
+    assert btc["last"] == 95.0 and btc["ts"] == 3
+    assert btc["high"] == 100.0 and btc["low"] == 90.0
+    assert btc["volume"] == 3.0
+    assert btc["conflated"] == 2
+    assert c.conflated["BTC/USDT"] == 2
+    assert "conflated" not in out[1]
+
+
+def test_disabled_conflation_replays_every_tick_in_order():
+    c = TickConflator(enabled=False)
+    for i in range(3):
+        c.put(_tick("BTC/USDT", 100.0 + i, i))
+
+    async def drain() -> list:
+        c.close()
+        return [t async for t in c]
+
+    assert [t["last"] for t in asyncio.run(drain())] == [100.0, 101.0, 102.0]
+
+
+def test_disabled_conflation_bounds_the_fifo():
+    c = TickConflator(enabled=False, maxsize=4)
+
+    async def source():
+        for i in range(50):
+            yield _tick("BTC/USDT", 100.0 + i, i)
+
+    async def main() -> tuple:
+        pump = asyncio.create_task(c.pump(source()))
+        await asyncio.sleep(0.01)  # consumer stalled: the pump waits for room
+        depth = c.pending()
+        out = [t["ts"] async for t in c]
+        await pump
+        return depth, out
+
+    depth, out = asyncio.run(main())
+    assert depth == 4
+    assert out == list(range(50))
+
+
+def test_source_failure_reaches_the_consumer():
+    c = TickConflator(enabled=False)
+
+    async def source():
+        yield _tick("BTC/USDT", 100.0, 0)
+        raise ConnectionError("feed lost")
+
+    seen: list = []
+
+    async def main() -> None:
+        pump = asyncio.create_task(c.pump(source()))
+        try:
+            async for t in c:
+                seen.append(t["last"])
+        finally:
+            await asyncio.gather(pump, return_exceptions=True)
+
+    # Ticks already buffered are delivered first, then the loop fails loudly
+    with pytest.raises(ConnectionError, match="feed lost"):
+        asyncio.run(main())
+    assert seen == [100.0]
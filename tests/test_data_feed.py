@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+
+import ccxt.async_support as ccxt
+
+from app.data_ws import DataFeed
+
+
+class FakeExchange:
+    def __init__(self, bulk: bool = True, rate_limit: int = 50) -> None:
+        self.has = {"fetchTickers": bulk}
+        self.rateLimit = rate_limit
+        self.bulk_calls = 0
+        self.single_calls = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self.step = 0
+
+    async def load_markets(self) -> None:
+        return None
+
+    def _ticker(self, sym: str) -> dict:
+        return {
+            "timestamp": 1_700_000_000_000 + self.step,
+            "bid": 99.0,
+            "ask": 101.0,
+            "last": 100.0,
+            "baseVolume": 5.0,
+        }
+
+    async def fetch_tickers(self, symbols):
+        self.bulk_calls += 1
+        return {s: self._ticker(s) for s in symbols}
+
+    async def fetch_ticker(self, sym):
+        self.single_calls += 1
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        await asyncio.sleep(0.001)
+        self.inflight -= 1
+        return self._ticker(sym)
+
+
+SYMS = [f"C{i}/USDT" for i in range(20)]
+
+
+def test_bulk_poll_uses_one_request_and_exchange_timestamps():
+    ex = FakeExchange(bulk=True)
+    feed = DataFeed(exchange=ex)
+    ticks, requests = asyncio.run(feed.poll_once(ex, SYMS))
+    assert requests == 1 and ex.bulk_calls == 1 and ex.single_calls == 0
+    assert [t["symbol"] for t in ticks] == SYMS
+    assert ticks[0]["ts"] == 1_700_000_000.0
+    assert ticks[0]["volume"] == 5.0
+    # Same exchange timestamp next cycle: nothing new to emit
+    ticks, _ = asyncio.run(feed.poll_once(ex, SYMS))
+    assert ticks == []
+    ex.step = 1000
+    ticks, _ = asyncio.run(feed.poll_once(ex, SYMS))
+    assert len(ticks) == len(SYMS) and ticks[0]["ts"] == 1_700_000_001.0
+
+
+def test_concurrent_fallback_is_bounded():
+    ex = FakeExchange(bulk=False)
+    feed = DataFeed(exchange=ex, concurrency=4)
+    ticks, requests = asyncio.run(feed.poll_once(ex, SYMS))
+    assert requests == len(SYMS) and ex.single_calls == len(SYMS)
+    assert 1 < ex.max_inflight <= 4
+    assert len(ticks) == len(SYMS)
+
+
+def test_unsupported_bulk_falls_back_to_concurrent():
+    ex = FakeExchange(bulk=True)
+
+    async def unsupported(symbols):
+        raise ccxt.NotSupported("no")
+
+    ex.fetch_tickers = unsupported  # type: ignore[method-assign]
+    feed = DataFeed(exchange=ex)
+    ticks, _ = asyncio.run(feed.poll_once(ex, SYMS[:3]))
+    assert len(ticks) == 3 and ex.single_calls == 3
+    assert feed._bulk is False
+
+
+def test_cycle_adapts_to_rate_limit():
+    ex = FakeExchange(rate_limit=100)
+    feed = DataFeed(exchange=ex, min_cycle_s=1.0)
+    assert feed._cycle_s(ex, 1) == 1.0
+    # 30 single requests at 100 ms apart cannot fit in a 1 s cycle
+    assert abs(feed._cycle_s(ex, 30) - 3.0) < 1e-9
+    feed._penalty = 2.0
+    assert feed._cycle_s(ex, 1) == 2.0
+
+
+def test_start_streams_ticks_until_stopped():
+    ex = FakeExchange(bulk=True, rate_limit=0)
+    feed = DataFeed(exchange=ex, min_cycle_s=0.0)
+
+    async def run() -> list:
+        out = []
+        async for l1 in feed.start(SYMS[:2]):
+            out.append(l1)
+            ex.step += 1
+            if len(out) == 4:
+                await feed.stop()
+        return out
+
+    out = asyncio.run(run())
+    assert len(out) >= 4 and ex.bulk_calls >= 2
+
+
+def test_ws_stream_reconnects_on_gap_and_drop():
+    import orjson
+    from websockets.server import serve
+
+    from app.data_ws import WebSocketTransport
+
+    subs: list = []
+
+    async def handler(ws):
+        sub = orjson.loads(await ws.recv())
+        subs.append(sub)
+        n = len(subs)
+
+        def msg(seq: int, px: float) -> str:
+            tick = {"symbol": "BTC/USDT", "timestamp": seq * 1000 + n, "last": px}
+            return orjson.dumps({"seq": seq, "data": [tick]}).decode()
+
+        if n == 1:
+            # seq 3 skips 2: the feed must resubscribe
+            for seq in (1, 3):
+                await ws.send(msg(seq, 100.0 + seq))
+            await ws.wait_closed()
+        elif n == 2:
+            await ws.send(msg(10, 110.0))
+            # drop the connection: the feed must reconnect
+        else:
+            await ws.send(msg(20, 120.0))
+            await ws.wait_closed()
+
+    async def run():
+        async with serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            feed = DataFeed(
+                mode="ws", transport=WebSocketTransport(f"ws://127.0.0.1:{port}")
+            )
+            out = []
+
+            async def consume():
+                async for l1 in feed.start(["BTC/USDT"]):
+                    out.append(l1)
+                    if len(out) == 3:
+                        await feed.stop()
+
+            await asyncio.wait_for(consume(), 10)
+            return feed, out
+
+    feed, out = asyncio.run(run())
+    assert [t["last"] for t in out] == [101.0, 110.0, 120.0]
+    assert out[0]["ts"] == 1.001
+    assert subs[0] == {"op": "subscribe", "symbols": ["BTC/USDT"]}
+    assert feed.gaps == 1 and feed.connects == 3
+
+
+def test_ws_stream_reconnects_when_stale():
+    class Silent:
+        def __init__(self):
+            self.connects = 0
+
+        async def connect(self, symbols):
+            self.connects += 1
+
+        async def recv(self):
+            if self.connects == 1:
+                await asyncio.sleep(10)
+            return None, [{"symbol": "ETH/USDT", "timestamp": 5000, "last": 5.0}]
+
+        async def close(self):
+            pass
+
+    tr = Silent()
+    feed = DataFeed(mode="ws", transport=tr, stale_s=0.05)
+
+    async def run():
+        async for l1 in feed.start(["ETH/USDT"]):
+            await feed.stop()
+            return l1
+
+    l1 = asyncio.run(asyncio.wait_for(run(), 5))
+    assert l1["last"] == 5.0 and l1["ts"] == 5.0 and tr.connects == 2
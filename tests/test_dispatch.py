@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+from app.dispatch import ShardedTickDispatcher
+
+
+def test_per_symbol_order_kept_and_slow_symbol_does_not_block_others():
+    seen: Dict[str, List[int]] = {}
+
+    async def main() -> Dict[str, List[int]]:
+        done = asyncio.Event()
+
+        async def handler(l1: Dict[str, Any]) -> None:
+            sym = l1["symbol"]
+            if sym == "SLOW/USDT":
+                await asyncio.sleep(0.05)
+            seen.setdefault(sym, []).append(l1["i"])
+            if sym == "FAST/USDT" and len(seen[sym]) == 5:
+                done.set()
+
+        d = ShardedTickDispatcher(handler, shards=8, maxsize=100)
+        assert d.shard_for("SLOW/USDT") != d.shard_for("FAST/USDT")
+        d.start()
+        for i in range(5):
+            await d.submit({"symbol": "SLOW/USDT", "i": i})
+            await d.submit({"symbol": "FAST/USDT", "i": i})
+        # Fast symbol finishes while the slow shard is still working
+        await asyncio.wait_for(done.wait(), 0.2)
+        assert len(seen.get("SLOW/USDT", [])) < 5
+        await d.stop()
+        return seen
+
+    out = asyncio.run(main())
+    assert out["SLOW/USDT"] == [0, 1, 2, 3, 4]
+    assert out["FAST/USDT"] == [0, 1, 2, 3, 4]
+
+
+def test_conflating_shards_keep_one_pending_tick_per_symbol():
+    seen: List[Dict[str, Any]] = []
+
+    async def main() -> ShardedTickDispatcher:
+        gate = asyncio.Event()
+
+        async def handler(l1: Dict[str, Any]) -> None:
+            await gate.wait()
+            seen.append(l1)
+
+        d = ShardedTickDispatcher(handler, shards=2, maxsize=1, conflate=True)
+        d.start()
+        # The shard is busy with tick 0; the rest never block on maxsize
+        for i in range(50):
+            await asyncio.wait_for(
+                d.submit({"symbol": "BTC/USDT", "i": i, "last": 100.0 + i}), 0.1
+            )
+            await asyncio.sleep(0)
+        idx = d.shard_for("BTC/USDT")
+        assert d.stats()[idx]["depth"] == 1.0
+        gate.set()
+        await d.stop()
+        return d
+
+    d = asyncio.run(main())
+    assert [t["i"] for t in seen] == [0, 49]
+    assert seen[-1]["last"] == 149.0
+    assert d.stats()[d.shard_for("BTC/USDT")]["processed"] == 2.0
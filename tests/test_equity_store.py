@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from src.risk.equity_store import EquityStore
+from src.risk.guardrails import dd_30d, historical_var
+
+
+def test_rollups_and_risk_series(tmp_path: Path):
+    path = str(tmp_path / "equity.sqlite")
+    store = EquityStore(path)
+    day = 86400
+    today = int(time.time() // day) * day
+    # Four completed days with intraday points, then a partial current day
+    for d, closes in enumerate([[100, 90, 100], [100, 110], [120, 99], [99, 104]]):
+        start = today - (4 - d) * day
+        for i, eq in enumerate(closes):
+            store.record(eq, ts=start + 3600 * (i + 1))
+    store.record(80.0, ts=today + 60)
+
+    rets = store.equity_daily_returns_30d()
+    assert [round(r, 6) for r in rets] == [0.1, -0.1, round(104 / 99 - 1, 6)]
+
+    series = store.equity_series_30d()
+    assert len(series) == 10
+    assert series[-1][1] == 80.0
+    assert abs(dd_30d(series) - (120 - 80) / 120) < 1e-12
+    # Incremental reads agree with the full recompute
+    assert abs(store.drawdown() - dd_30d(series)) < 1e-12
+    assert store.var(0.95) == historical_var(rets, 0.95)
+
+    daily = store.rollup("1d", today - 4 * day)
+    assert [(o, h, lo, c, n) for _, o, h, lo, c, n in daily][0] == (
+        100.0,
+        100.0,
+        90.0,
+        100.0,
+        3,
+    )
+    store_dd = store.drawdown()
+    store.close()
+
+    # Reopening restores the in-memory views from the rollup tables
+    again = EquityStore(path)
+    assert again.equity_daily_returns_30d() == rets
+    assert again.equity_series_30d() == series
+    assert abs(again.drawdown() - store_dd) < 1e-12
+    assert again.var(0.95) == historical_var(rets, 0.95)
+    again.close()
+
+
+def test_reader_picks_up_points_from_another_process(tmp_path: Path):
+    path = str(tmp_path / "equity.sqlite")
+    api, trader = EquityStore(path), EquityStore(path)
+    now = time.time()
+    assert api.drawdown() == 0.0
+    trader.record(100.0, ts=now - 7200)
+    trader.record(90.0, ts=now)
+    assert [c for _, c in api.equity_series_30d()] == [100.0, 90.0]
+    assert abs(api.drawdown() - 0.1) < 1e-12
+    api.close()
+    trader.close()
+
+
+def test_trading_loop_marks_portfolio_equity_into_store(tmp_path: Path):
+    import asyncio
+
+    from app.equity import EquityMarker
+    from app.portfolio import Portfolio
+
+    pf = Portfolio()
+    pf.balances[pf.quote_ccy] = 1_000.0
+    pos = pf.get_position("BTC/USDT")
+    pos.base, pos.avg_price = 1.0, 100.0
+    store = EquityStore(str(tmp_path / "equity.sqlite"))
+    marker = EquityMarker(pf, store.record, interval_s=60)
+    t0 = (int(time.time() // 3600) - 1) * 3600 + 10.0  # one hour bucket
+    ticks = [
+        {"symbol": "BTC/USDT", "ts": t0, "last": 110.0},
+        {"symbol": "ETH/USDT", "ts": t0 + 30, "last": 5.0},  # within the interval
+        {"symbol": "BTC/USDT", "ts": t0 + 60, "last": 90.0},
+    ]
+
+    async def source():
+        for t in ticks:
+            yield t
+
+    async def drain():
+        return [t async for t in marker.tap(source())]
+
+    assert asyncio.run(drain()) == ticks
+    # Two interval marks plus the final one when the stream ends
+    assert marker.recorded == 3
+    assert [c for _, c in store.equity_series_30d()][-1] == 1_090.0
+    # Valued at the latest mark: 1000 cash + 1 BTC at 110, then at 90
+    _, _, high, low, _, n = store.rollup("1h", t0)[0]
+    assert (high, low) == (1_110.0, 1_090.0) and n >= 2
+    store.close()
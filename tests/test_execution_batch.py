@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+from app.broker_paper import PaperBroker
+from app.execution import ExecContext, ExecutionManager, OrderSpec
+from app.ledger import ExplainabilityLedger
+from app.portfolio import Portfolio
+
+L1 = {"symbol": "BTC/USDT", "bid": 100.0, "ask": 100.0, "last": 100.0, "ts": 1.0}
+
+
+def _ctx(tmp_path: Path, **kw: Any) -> ExecContext:
+    pf = Portfolio()
+    return ExecContext(
+        portfolio=pf,
+        paper=PaperBroker(pf, slippage_bps=0),
+        ledger=ExplainabilityLedger(path=str(tmp_path / "ledger.jsonl")),
+        whitelist=["BTC/USDT"],
+        **kw,
+    )
+
+
+def test_paper_batch_fills_all_children_and_chains_ledger(tmp_path: Path):
+    ctx = _ctx(tmp_path)
+    em = ExecutionManager(ctx)
+    orders = [OrderSpec("BTC/USDT", "buy", "market", 0.5, strategy_id="t")] * 3
+    res = asyncio.run(em.submit_batch(orders, L1))
+    assert [r["status"] for r in res] == ["filled"] * 3
+    assert ctx.trades == 3
+    assert abs(ctx.portfolio.get_position("BTC/USDT").base - 1.5) < 1e-12
+    recs = [
+        orjson.loads(x) for x in (tmp_path / "ledger.jsonl").read_bytes().splitlines()
+    ]
+    assert len(recs) == 3
+    assert recs[0]["prev_hash"] == ""
+    assert recs[1]["prev_hash"] == recs[0]["hash"]
+    assert recs[2]["prev_hash"] == recs[1]["hash"]
+
+
+class _SlowBroker:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+
+    async def place_order(
+        self, symbol: str, side: str, type_: str, qty: float, price: Optional[float]
+    ) -> Dict[str, Any]:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {"id": "x", "timestamp": 1, "price": 100.0, "amount": qty}
+
+
+def test_live_batch_dispatches_concurrently_within_budget(tmp_path: Path):
+    broker = _SlowBroker()
+    ctx = _ctx(tmp_path, live_broker=broker, live_enabled=True, live_concurrency=2)
+    em = ExecutionManager(ctx)
+    orders = [OrderSpec("BTC/USDT", "buy", "market", 0.1)] * 5
+    res = asyncio.run(em.submit_batch(orders, L1))
+    assert len(res) == 5
+    assert broker.peak == 2
+    lines = (tmp_path / "ledger.jsonl").read_bytes().splitlines()
+    assert len(lines) == 5
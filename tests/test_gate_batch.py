@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import orjson
+from fastapi.testclient import TestClient
+
+from intradyne.api.app import app
+import src.intradyne.api.routes.orders as orders_routes
+from src.core.ledger import Ledger
+from src.risk.guardrails import Guardrails, OrderReq
+
+
+def _guardrails(tmp_path: Path, stub, **th: float) -> Guardrails:
+    stub.price, stub.returns = 100.0, [-0.1, 0.01]
+    led = Ledger(path=str(tmp_path / "ledger.jsonl"))
+    return Guardrails(stub, stub, ledger=led, thresholds=th)
+
+
+def test_gate_trades_uses_one_snapshot_and_caps_notional(tmp_path: Path, stub_feed):
+    gr = _guardrails(tmp_path, stub_feed, batch_notional_max=250.0, kill_switch=100)
+    orders = [OrderReq("BTC/USDT", "buy", 2.0) for _ in range(4)]
+    out = gr.gate_trades(orders)
+
+    # VaR step-down halves each order to 1.0 (notional 100): two fit the cap
+    assert [a for a, _, _ in out] == ["allow", "allow", "block", "block"]
+    assert out[0][2].qty == 1.0
+    assert out[2][1] == ["batch_exposure"]
+    assert stub_feed.risk_calls == 2
+    assert stub_feed.price_calls == 2  # now and 1h ago, once for the symbol
+
+    lines = (tmp_path / "ledger.jsonl").read_bytes().splitlines()
+    types = [orjson.loads(x)["type"] for x in lines]
+    # One batch_exposure breach however many orders the cap blocks
+    assert types == ["var_stepdown"] * 3 + ["batch_exposure", "var_stepdown"]
+
+
+def test_batch_cap_ignores_sells_and_spares_the_kill_switch(tmp_path: Path, stub_feed):
+    gr = _guardrails(tmp_path, stub_feed, batch_notional_max=150.0, kill_switch=3)
+    orders = [
+        OrderReq("BTC/USDT", "buy", 2.0),
+        OrderReq("BTC/USDT", "buy", 2.0),
+        OrderReq("BTC/USDT", "sell", 4.0),
+        OrderReq("BTC/USDT", "buy", 2.0),
+    ]
+    out = gr.gate_trades(orders)
+    # The sell is never capped and frees room for the buy after it
+    assert [a for a, _, _ in out] == ["allow", "block", "allow", "allow"]
+    # Four var_stepdown breaches recorded mid-batch did not halt it either
+    assert gr.breaches.count("24h") == 5
+    assert gr._recent_breach_count(24) == 4
+    action, reasons, _ = gr.gate_trade(OrderReq("BTC/USDT", "buy", 1.0))
+    assert (action, reasons) == ("halt", ["kill_switch"])
+
+
+def test_orders_batch_endpoint(tmp_path: Path, monkeypatch, stub_feed):
+    gr = _guardrails(tmp_path, stub_feed, var_max=1.0, kill_switch=100)
+    monkeypatch.setattr(orders_routes, "get_guardrails", lambda: gr)
+    client = TestClient(app)
+    r = client.post(
+        "/orders/batch",
+        json={
+            "orders": [
+                {"symbol": "BTC/USDT", "side": "buy", "qty": 1},
+                {"symbol": "ETH/USDT", "side": "buy", "qty": 2},
+            ]
+        },
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["accepted"] == 2
+    assert all(res["status"] == "accepted" for res in body["results"])
+    events = [
+        orjson.loads(x)["event"]
+        for x in (tmp_path / "ledger.jsonl").read_bytes().splitlines()
+    ]
+    assert events == ["order_allowed", "order_allowed"]
@@ -31,3 +31,35 @@ def test_ledger_hash_chain(tmp_path: Path) -> None:
 
         assert rec["hash"] == _L._hash_record(rec)
         prev_hash = rec["hash"]
+
+
+def test_ledger_head_shared_between_writers(tmp_path: Path) -> None:
+    import orjson
+
+    path = tmp_path / "ledger.jsonl"
+    a = Ledger(path=str(path))
+    b = Ledger(path=str(path))
+    for i in range(6):
+        (a if i % 2 else b).append("event", {"i": i})
+
+    recs = [orjson.loads(x) for x in path.read_bytes().splitlines()]
+    for prev, rec in zip(recs, recs[1:]):
+        assert rec["hash_prev"] == prev["hash"]
+
+    # A fresh instance recovers the head from the end of the file
+    c = Ledger(path=str(path))
+    assert c._last_hash() == recs[-1]["hash"]
+    assert c.append("event", {"i": 6})["hash_prev"] == recs[-1]["hash"]
+
+
+def test_iter_lines_reverse_small_blocks(tmp_path: Path) -> None:
+    from src.core.ledger import iter_lines_reverse
+
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"one\ntwo\n\nthree-long-line\n")
+    with path.open("rb") as f:
+        assert list(iter_lines_reverse(f, block_size=4)) == [
+            b"three-long-line",
+            b"two",
+            b"one",
+        ]
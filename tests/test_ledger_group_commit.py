@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import orjson
+import pytest
+
+from app.ledger import ExplainabilityLedger, GroupCommitWriter
+
+
+def test_group_commit_matches_sync_chain(tmp_path: Path):
+    sync = ExplainabilityLedger(path=str(tmp_path / "sync.jsonl"))
+    grp = ExplainabilityLedger(
+        path=str(tmp_path / "grp.jsonl"), group_commit=True, fsync_every=7
+    )
+    for i in range(50):
+        rec = {"ts": i, "event": "tick", "i": i}
+        sync.append(rec)
+        grp.append(rec)
+    grp.flush()
+    assert (tmp_path / "grp.jsonl").read_bytes() == (
+        tmp_path / "sync.jsonl"
+    ).read_bytes()
+
+    grp.append_many([{"ts": 50, "i": 50}, {"ts": 51, "i": 51}])
+    grp.close()
+    recs = [orjson.loads(x) for x in (tmp_path / "grp.jsonl").read_bytes().splitlines()]
+    assert len(recs) == 52
+    for prev, cur in zip(recs, recs[1:]):
+        assert cur["prev_hash"] == prev["hash"]
+
+    # Reopening resumes the chain from the last flushed record
+    again = ExplainabilityLedger(path=str(tmp_path / "grp.jsonl"))
+    assert again._last_hash == recs[-1]["hash"]
+
+
+class _FailingOnce:
+    """File handle that writes half a batch, then fails, once."""
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.failed = False
+
+    def write(self, data: bytes) -> int:
+        if not self.failed:
+            self.failed = True
+            self.fh.write(data[: len(data) // 2])
+            self.fh.flush()
+            raise OSError("disk full")
+        return self.fh.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.fh, name)
+
+
+def test_failed_write_is_rolled_back_retried_and_reported_once(tmp_path: Path):
+    path = tmp_path / "ledger.jsonl"
+    w = GroupCommitWriter(path, retry_s=0.2)
+    w.submit([b'{"i":0}\n'])
+    w.flush()
+    w._fh = _FailingOnce(w._fh)
+    w.submit([b'{"i":1}\n', b'{"i":2}\n'])
+    with pytest.raises(OSError, match="disk full"):
+        w.flush(timeout=5)
+    w.submit([b'{"i":3}\n'])
+    # The retry lands the failed batch, in order, without the partial line
+    w.flush(timeout=5)
+    w.close()
+    assert path.read_bytes() == b'{"i":0}\n{"i":1}\n{"i":2}\n{"i":3}\n'
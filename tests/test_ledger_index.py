@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.core.ledger import Ledger
+
+
+def _fill(led: Ledger, start: datetime, n: int) -> None:
+    for i in range(n):
+        ts = (start + timedelta(minutes=i)).isoformat() + "Z"
+        event = "guardrail_breach" if i % 2 else "order"
+        led.append(event, {"ts": ts, "i": i})
+
+
+def test_range_reads_seek_via_index(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    led = Ledger(path=str(path), index_stride=512)
+    start = datetime(2026, 1, 1)
+    _fill(led, start, 200)
+
+    assert Path(led.index_path).stat().st_size > 16
+    since = start + timedelta(minutes=150)
+    assert (
+        led._seek_offset(int((since - datetime(1970, 1, 1)).total_seconds() * 1e3)) > 0
+    )
+    assert [r["i"] for r in led.iter_recent(since)] == list(range(150, 200))
+
+    cuts = [start + timedelta(minutes=m) for m in (190, 100, 0)]
+    assert led.count_since(cuts) == [10, 100, 200]
+    assert led.count_since(cuts, event="guardrail_breach") == [5, 50, 100]
+
+
+def test_index_rebuilt_for_existing_ledger(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    led = Ledger(path=str(path), index_stride=256)
+    start = datetime(2026, 1, 1)
+    _fill(led, start, 50)
+
+    Path(led.index_path).unlink()
+    fresh = Ledger(path=str(path), index_stride=256)
+    assert Path(fresh.index_path).stat().st_size > 0
+    since = start + timedelta(minutes=45)
+    assert [r["i"] for r in fresh.iter_recent(since)] == list(range(45, 50))
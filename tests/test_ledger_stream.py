@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from intradyne.api.app import app
+from src.core.ledger import Ledger
+from src.intradyne.api.ledger_stream import LedgerFollower
+
+
+def test_one_reader_fans_out_same_payload(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    led = Ledger(path=str(path))
+    led.append("order", {"i": 0})
+
+    async def main():
+        fol = LedgerFollower(str(path), poll_s=0.01)
+        a, b = fol.subscribe(), fol.subscribe()
+        led.append("order", {"i": 1})
+        led.append("order", {"i": 2})
+        got_a = [await asyncio.wait_for(a.get(), 1.0) for _ in range(2)]
+        got_b = [await asyncio.wait_for(b.get(), 1.0) for _ in range(2)]
+        fol.unsubscribe(a)
+        fol.unsubscribe(b)
+        return fol, got_a, got_b
+
+    fol, got_a, got_b = asyncio.run(main())
+    # Records parsed once and shared; the pre-existing record is not replayed
+    assert fol.records == 2
+    assert got_a == got_b and got_a[0] is got_b[0]
+    assert '"i":1' in got_a[0] and got_a[0].startswith('{"record":')
+    assert fol.subscribers == 0 and fol._task is None
+
+
+def test_partial_lines_and_truncation(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    path.write_bytes(b"")
+
+    async def main():
+        fol = LedgerFollower(str(path), poll_s=0.01)
+        sub = fol.subscribe()
+        with path.open("ab") as f:
+            f.write(b'{"i": 1}\n{"i": ')
+        first = await asyncio.wait_for(sub.get(), 1.0)
+        with path.open("ab") as f:
+            f.write(b"2}\n")
+        second = await asyncio.wait_for(sub.get(), 1.0)
+        path.write_bytes(b'{"i": 3}\n')  # rotated
+        third = await asyncio.wait_for(sub.get(), 1.0)
+        fol.unsubscribe(sub)
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert '"i": 1' in first and '"i": 2' in second and '"i": 3' in third
+
+
+def test_slow_consumer_policies(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    path.write_bytes(b"")
+
+    async def main():
+        drop = LedgerFollower(str(path), queue_size=2, policy="drop")
+        close = LedgerFollower(str(path), queue_size=2, policy="close")
+        d, c = drop.subscribe(), close.subscribe()
+        for i in range(5):
+            drop.broadcast(f"m{i}")
+            close.broadcast(f"m{i}")
+        out = [await d.get(), await d.get()], d.dropped, await c.get(), c.closed
+        drop.unsubscribe(d)
+        close.unsubscribe(c)
+        return out
+
+    kept, dropped, closed_msg, closed = asyncio.run(main())
+    assert kept == ["m3", "m4"] and dropped == 3
+    assert closed_msg is None and closed
+
+
+def test_ws_ledger_follow_streams_new_records(tmp_ledger: Path) -> None:
+    led = Ledger(path=str(tmp_ledger))
+    led.append("order", {"i": 0})
+    client = TestClient(app)
+    with client.websocket_connect("/ws/ledger?tail=1&follow=1") as ws:
+        first = ws.receive_json()
+        assert first["record"]["i"] == 0
+        led.append("order", {"i": 1})
+        msg = ws.receive_json()
+        assert msg["record"]["i"] == 1
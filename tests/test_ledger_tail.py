@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from intradyne.api.app import app
+from src.core.ledger import Ledger
+
+
+def test_tail_reads_backwards_and_tracks_appends(tmp_path: Path) -> None:
+    path = tmp_path / "ledger.jsonl"
+    led = Ledger(path=str(path))
+    for i in range(50):
+        led.append("order", {"i": i})
+    assert [r["i"] for r in led.tail(5)] == [45, 46, 47, 48, 49]
+    assert led.tail(0) == []
+
+    # Our own appends extend the cached view without a re-read
+    led.append_many([("order", {"i": 50}), ("order", {"i": 51})])
+    assert [r["i"] for r in led.tail(3)] == [49, 50, 51]
+    assert led._tail_cache[0] == path.stat().st_size
+
+    # Another writer's append is picked up via the file size
+    other = Ledger(path=str(path))
+    other.append("order", {"i": 52})
+    assert [r["i"] for r in led.tail(2)] == [51, 52]
+    assert len(led.tail(500)) == 53
+    assert led.head() == other.head()
+
+
+def test_ledger_tail_etag_and_304(tmp_ledger: Path) -> None:
+    Ledger(path=str(tmp_ledger)).append("order", {"i": 0})
+    client = TestClient(app)
+    r = client.get("/ledger/tail", params={"n": 3})
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert [x["event"] for x in r.json()] == ["order"]
+
+    r2 = client.get("/ledger/tail", params={"n": 3}, headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    # A different view size is a different representation
+    r3 = client.get("/ledger/tail", params={"n": 4}, headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+
+    # Any append moves the chain head and invalidates the ETag
+    Ledger(path=str(tmp_ledger)).append("order", {"i": 1})
+    r4 = client.get("/ledger/tail", params={"n": 3}, headers={"If-None-Match": etag})
+    assert r4.status_code == 200
+    assert r4.headers["etag"] != etag
+    assert r4.json()[-1]["i"] == 1
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import numpy as np
+
+from src.core.ledger import Ledger
+from src.risk.guardrails import Guardrails, OrderReq
+from src.risk.portfolio_var import PortfolioVaR
+
+
+def _fed(n_bars: int = 500) -> PortfolioVaR:
+    rng = np.random.default_rng(1)
+    pv = PortfolioVaR(lam=0.97, mc_paths=20000)
+    px = np.array([100.0, 50.0])
+    # Strongly correlated pair
+    chol = np.linalg.cholesky(np.array([[4e-4, 3.6e-4], [3.6e-4, 4e-4]]))
+    pv.update_prices({"BTC/USDT": px[0], "ETH/USDT": px[1]})
+    for _ in range(n_bars):
+        px = px * np.exp(chol @ rng.standard_normal(2))
+        pv.update_prices({"BTC/USDT": px[0], "ETH/USDT": px[1]})
+    return pv
+
+
+def test_parametric_and_mc_var_agree_and_hedge_reduces_var():
+    pv = _fed()
+    btc_px = pv.prices[0]
+    pv.set_positions({"BTC/USDT": 10.0}, equity=10_000.0)
+    w = pv.qty * pv.prices
+    expected = 1.6448536269514722 * math.sqrt(w @ pv.cov @ w)
+    assert abs(pv.parametric_var(0.95) - expected) < 1e-9
+    assert abs(pv.mc_var(0.95) / expected - 1.0) < 0.05
+
+    # What-if matches a full recompute with the order applied
+    wi = pv.what_if("BTC/USDT", 5.0)
+    pv.set_positions({"BTC/USDT": 15.0}, equity=10_000.0)
+    assert abs(wi - pv.parametric_var(0.95)) < 1e-9
+
+    # Shorting the correlated asset hedges the book
+    pv.set_positions({"BTC/USDT": 10.0}, equity=10_000.0)
+    hedge = -10.0 * btc_px / pv.prices[1]
+    assert pv.what_if("ETH/USDT", hedge) < 0.5 * pv.parametric_var(0.95)
+
+
+def test_guardrails_step_down_on_what_if_var(tmp_path: Path, stub_feed):
+    pv = _fed()
+    pv.set_positions({}, equity=1_000.0)
+    stub = stub_feed
+    gr = Guardrails(
+        stub,
+        stub,
+        ledger=Ledger(path=str(tmp_path / "ledger.jsonl")),
+        thresholds={"var_max": 0.05},
+        portfolio_var=pv,
+    )
+    action, reasons, adj = gr.gate_trade(OrderReq("BTC/USDT", "buy", 0.01))
+    assert (action, reasons, adj.qty) == ("allow", [], 0.01)
+    action, reasons, adj = gr.gate_trade(OrderReq("BTC/USDT", "buy", 100.0))
+    assert action == "allow" and adj.qty == 50.0
+    assert reasons[0].startswith("var ")
+
+
+def test_what_if_many_and_bar_sampling():
+    pv = _fed()
+    pv.set_positions({"BTC/USDT": 10.0}, equity=10_000.0)
+    wi = pv.what_if_many({"BTC/USDT": 5.0, "ETH/USDT": -20.0})
+    pv.set_positions({"BTC/USDT": 15.0, "ETH/USDT": -20.0})
+    assert abs(wi - pv.parametric_var(0.95)) < 1e-9
+
+    live = PortfolioVaR(bar_s=60, horizon_bars=4, min_bars=2)
+    for ts, px in [(0, 100.0), (30, 101.0), (60, 102.0), (120, 99.0), (150, 98.0)]:
+        live.on_price("BTC/USDT", px, ts)
+    # Closes 101 (bar 0) and 102 (bar 1): one return so far, bar 2 still open
+    assert live.bars == 1 and live.prices[0] == 102.0
+    live.on_price("BTC/USDT", 97.0, 180)
+    live.apply_fill("BTC/USDT", 2.0)
+    live.apply_fill("BTC/USDT", -1.0)
+    live.equity = 1_000.0
+    assert live.ready and live.qty[0] == 1.0
+    one_bar = live.parametric_var() / 2.0  # sqrt(4) bars
+    live.horizon_bars = 1.0
+    assert abs(live.parametric_var() - one_bar) < 1e-12
+
+
+def test_gate_trades_stacks_allowed_orders_in_what_if(tmp_path: Path, stub_feed):
+    pv = _fed()
+    pv.set_positions({}, equity=1_000.0)
+    gr = Guardrails(
+        stub_feed,
+        stub_feed,
+        ledger=Ledger(path=str(tmp_path / "ledger.jsonl")),
+        thresholds={"var_max": 0.05},
+        portfolio_var=pv,
+    )
+    # Each order alone is at 70% of the limit, two together are over it
+    q = 0.035 / pv.what_if_pct("BTC/USDT", 1.0)
+    alone = gr.gate_trade(OrderReq("BTC/USDT", "buy", q))
+    assert (alone[0], alone[1]) == ("allow", [])
+    out = gr.gate_trades([OrderReq("BTC/USDT", "buy", q)] * 2)
+    assert [(a, adj.qty) for a, _, adj in out] == [("allow", q), ("allow", q / 2)]
+    assert out[1][1][0].startswith("var ")
+
+    # Executed orders become positions: the next order sees them
+    gr.on_fill(out[0][2])
+    assert gr.gate_trade(OrderReq("BTC/USDT", "buy", q))[2].qty == q / 2
+    # A sell against the position reduces VaR instead
+    assert gr.gate_trade(OrderReq("BTC/USDT", "sell", q))[1] == []
+
+
+def test_api_guardrails_sample_price_history(tmp_ledger: Path):
+    from intradyne.api.deps import get_guardrails
+    from src.data.price_history import get_price_history
+    from src.risk.portfolio_var import get_portfolio_var
+
+    pv = get_guardrails().portfolio_var
+    assert pv is not None and pv is get_portfolio_var()
+    assert pv.bar_s == 3600.0 and pv.horizon_bars == 24.0
+    assert pv.on_price in get_price_history()._listeners
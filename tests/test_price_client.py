@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import List
+
+import httpx
+
+from src.data.price_client import PriceClient
+
+_PRICES = {"BTCUSDT": 50000.0, "ETHUSDT": 3000.0, "SOLUSDT": 150.0}
+
+
+def _handler(seen: List[httpx.Request]):
+    def handle(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if "symbols" in request.url.params:
+            syms = json.loads(request.url.params["symbols"])
+            if any(s not in _PRICES for s in syms):
+                return httpx.Response(400, json={"code": -1121})
+            return httpx.Response(
+                200, json=[{"symbol": s, "price": str(_PRICES[s])} for s in syms]
+            )
+        s = request.url.params["symbol"]
+        if s not in _PRICES:
+            return httpx.Response(400, json={"code": -1121})
+        return httpx.Response(200, json={"symbol": s, "price": str(_PRICES[s])})
+
+    return handle
+
+
+def test_bulk_lookup_is_one_round_trip_then_cached():
+    seen: List[httpx.Request] = []
+    pc = PriceClient(ttl_s=60, transport=httpx.MockTransport(_handler(seen)))
+
+    async def main():
+        a = await pc.get_prices(["BTC/USDT", "ETH/USDT", "USDT"])
+        b = await pc.get_prices(["ETH/USDT", "BTC/USDT"])
+        return a, b
+
+    a, b = asyncio.run(main())
+    assert a == {"BTC/USDT": 50000.0, "ETH/USDT": 3000.0, "USDT": 1.0}
+    assert b == {"ETH/USDT": 3000.0, "BTC/USDT": 50000.0}
+    assert len(seen) == 1 and "symbols" in seen[0].url.params
+
+
+def test_concurrent_identical_lookups_share_one_request():
+    seen: List[httpx.Request] = []
+    pc = PriceClient(ttl_s=0, transport=httpx.MockTransport(_handler(seen)))
+
+    async def main():
+        return await asyncio.gather(
+            *(pc.get_prices(["SOL/USDT", "ETH/USDT"]) for _ in range(10))
+        )
+
+    results = asyncio.run(main())
+    assert len(seen) == 1
+    assert all(r == {"SOL/USDT": 150.0, "ETH/USDT": 3000.0} for r in results)
+
+
+def test_bad_symbol_isolated_and_not_cached():
+    seen: List[httpx.Request] = []
+    pc = PriceClient(ttl_s=60, transport=httpx.MockTransport(_handler(seen)))
+    out = asyncio.run(pc.get_prices(["BTC/USDT", "NOPE/USDT"]))
+    assert out == {"BTC/USDT": 50000.0, "NOPE/USDT": 0.0}
+    n = len(seen)
+    asyncio.run(pc.get_prices(["BTC/USDT", "NOPE/USDT"]))
+    # BTC is cached; only the failed symbol is retried
+    assert len(seen) == n + 1
+
+
+def test_sync_lookup_shares_the_cache():
+    seen: List[httpx.Request] = []
+    pc = PriceClient(ttl_s=60, sync_transport=httpx.MockTransport(_handler(seen)))
+    assert pc.get_prices_sync(["BTC/USDT", "SOL/USDT"]) == {
+        "BTC/USDT": 50000.0,
+        "SOL/USDT": 150.0,
+    }
+    assert pc.get_prices_sync(["SOL/USDT"]) == {"SOL/USDT": 150.0}
+    assert len(seen) == 1
+
+
+def test_client_from_a_finished_loop_is_closed_on_reuse():
+    pc = PriceClient(ttl_s=0.0, transport=httpx.MockTransport(_handler([])))
+    asyncio.run(pc.get_prices(["BTC/USDT"]))
+    old = pc._aclient
+    assert old is not None and not old.is_closed
+
+    async def again():
+        out = await pc.get_prices(["ETH/USDT"])
+        await asyncio.sleep(0)  # let the old client's close run
+        return out
+
+    assert asyncio.run(again()) == {"ETH/USDT": 3000.0}
+    assert old.is_closed and pc._aclient is not old
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Tuple
+
+from src.core.ledger import Ledger
+from src.data.price_history import HistoryPriceFeed, PriceHistory
+from src.risk.guardrails import Guardrails, OrderReq, RiskData
+
+
+class _NoRisk(RiskData):
+    def equity_series_30d(self) -> List[Tuple[datetime, float]]:
+        return []
+
+    def equity_daily_returns_30d(self) -> List[float]:
+        return []
+
+
+def test_price_at_binary_search_and_bounds():
+    h = PriceHistory(retention_s=100, max_points=5)
+    for t in range(10):
+        h.record("BTC/USDT", 100.0 + t, ts=1000.0 + t)
+    # Only the newest 5 points are kept
+    assert h.price_at("BTC/USDT", 1004.5) is None
+    assert h.price_at("BTC/USDT", 1005.0) == 105.0
+    assert h.price_at("BTC/USDT", 1007.9) == 107.0
+    assert h.price_at("BTC/USDT") == 109.0
+    assert h.price_at("ETH/USDT") is None
+
+    # Retention drops points older than newest - retention_s
+    h.record("BTC/USDT", 200.0, ts=1200.0)
+    assert h.price_at("BTC/USDT", 1199.0) is None
+    assert h.price_at("BTC/USDT", 1200.0) == 200.0
+
+
+def test_history_feed_triggers_flash_crash(tmp_path: Path):
+    h = PriceHistory(retention_s=7200)
+    now = datetime.utcnow()
+    h.on_tick({"symbol": "BTC/USDT", "last": 100.0, "ts": now - timedelta(minutes=90)})
+    h.on_tick({"symbol": "BTC/USDT", "bid": 59.0, "ask": 61.0, "ts": now})
+    gr = Guardrails(
+        HistoryPriceFeed(h),
+        _NoRisk(),
+        ledger=Ledger(path=str(tmp_path / "ledger.jsonl")),
+    )
+    action, reasons, _ = gr.gate_trade(OrderReq("BTC/USDT", "buy", 1.0))
+    assert action == "pause"
+    assert reasons[0].startswith("flash_crash")
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from src.data.price_history import PriceHistory
+from src.data.price_hub import HubSubscription, MockUpstream, PriceHub
+
+
+class _CountingUpstream:
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+        self.fail = False
+
+    async def __call__(self, symbols: List[str]) -> Dict[str, float]:
+        self.calls.append(list(symbols))
+        if self.fail:
+            raise RuntimeError("upstream down")
+        n = len(self.calls)
+        return {s: 100.0 + n + i for i, s in enumerate(symbols)}
+
+
+def test_one_upstream_poll_serves_all_subscribers():
+    up = _CountingUpstream()
+    history = PriceHistory()
+
+    async def main():
+        hub = PriceHub(up, history=history, min_poll_s=0.01)
+        subs = [hub.subscribe(["BTC/USDT", "ETH/USDT"], 0.01) for _ in range(20)]
+        solo = hub.subscribe(["SOL/USDT"], 0.01)
+        msgs = [await asyncio.wait_for(s.next(), 1.0) for s in subs]
+        solo_msg = await asyncio.wait_for(solo.next(), 1.0)
+        for s in subs + [solo]:
+            hub.unsubscribe(s)
+        return hub, msgs, solo_msg
+
+    hub, msgs, solo_msg = asyncio.run(main())
+    # Every upstream call fetched the union of symbols once
+    assert all(sorted(c) == ["BTC/USDT", "ETH/USDT", "SOL/USDT"] for c in up.calls)
+    assert len(up.calls) == hub.polls
+    assert [t["symbol"] for t in msgs[0]["ticks"]] == ["BTC/USDT", "ETH/USDT"]
+    assert [t["symbol"] for t in solo_msg["ticks"]] == ["SOL/USDT"]
+    assert history.price_at("BTC/USDT") is not None
+    assert hub._task is None
+
+
+def test_subscriber_throttled_to_its_interval():
+    async def main():
+        hub = PriceHub(MockUpstream(), min_poll_s=0.01)
+        fast = hub.subscribe(["X"], 0.01)
+        slow = hub.subscribe(["X"], 0.1)
+
+        async def count(sub) -> int:
+            n = 0
+            loop = asyncio.get_running_loop()
+            end = loop.time() + 0.35
+            while loop.time() < end:
+                await sub.next()
+                n += 1
+            return n
+
+        n_fast, n_slow = await asyncio.gather(count(fast), count(slow))
+        hub.unsubscribe(fast)
+        hub.unsubscribe(slow)
+        return n_fast, n_slow
+
+    n_fast, n_slow = asyncio.run(main())
+    assert n_slow <= 5
+    assert n_fast > n_slow
+
+
+def test_upstream_errors_reported_to_subscribers():
+    up = _CountingUpstream()
+    up.fail = True
+
+    async def main():
+        hub = PriceHub(up, min_poll_s=0.01)
+        sub = hub.subscribe(["BTC/USDT"], 0.01)
+        msg = await asyncio.wait_for(sub.next(), 1.0)
+        hub.unsubscribe(sub)
+        return msg
+
+    assert asyncio.run(main()) == {"error": "upstream down"}
+
+
+def test_soft_failed_prices_keep_the_last_good_tick():
+    history = PriceHistory()
+    prices = {"BTC/USDT": 100.0, "ETH/USDT": 10.0}
+
+    async def up(symbols: List[str]) -> Dict[str, float]:
+        return {s: prices[s] for s in symbols}
+
+    async def main():
+        hub = PriceHub(up, history=history)
+        hub._subs.add(HubSubscription(hub, ["BTC/USDT", "ETH/USDT"], 10.0))
+        await hub.poll_once()
+        prices["BTC/USDT"] = 0.0
+        prices["ETH/USDT"] = 11.0
+        changed = await hub.poll_once()
+        snap = hub.ticks(["BTC/USDT", "ETH/USDT"])
+        # Nothing priced at all is an upstream error
+        prices["ETH/USDT"] = 0.0
+        with pytest.raises(RuntimeError, match="no prices"):
+            await hub.poll_once()
+        return changed, snap
+
+    changed, snap = asyncio.run(main())
+    assert changed == {"ETH/USDT"}
+    assert [t["last"] for t in snap] == [100.0, 11.0]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from intradyne.api.app import app
+from src.core.state import MemoryStateBackend, SQLiteStateBackend
+from src.intradyne.api.ratelimit import GCRALimiter, RatePolicy
+
+
+def test_policy_allows_burst_then_spaces_requests():
+    p = RatePolicy("t", limit=4, window_s=2.0)
+    lim = GCRALimiter()
+    now = 1000.0
+    assert [lim.check("k", p, now) for _ in range(4)] == [0.0] * 4
+    retry = lim.check("k", p, now)
+    assert abs(retry - 0.5) < 1e-9  # one emission interval
+    assert lim.check("k", p, now + 0.5) == 0.0
+    assert lim.check("k", p, now + 0.5) > 0.0
+    # Other keys are independent
+    assert lim.check("other", p, now) == 0.0
+
+
+def test_token_bucket_burst_differs_from_rate():
+    p = RatePolicy("ws", limit=10, window_s=1.0, burst=3)
+    lim = GCRALimiter()
+    assert [lim.check("k", p, 0.0) == 0.0 for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert lim.check("k", p, 0.1) == 0.0
+
+
+def test_idle_keys_evicted_and_key_space_bounded():
+    p = RatePolicy("t", limit=1, window_s=1.0)
+    lim = GCRALimiter(max_keys=100)
+    for i in range(1000):
+        lim.check(f"ip{i}", p, now=float(i) * 0.001)
+    assert len(lim) <= 100
+    # Long after every TAT passed, checks sweep the idle keys away
+    for i in range(150):
+        lim.check("fresh", p, now=10_000.0 + i * 2)
+    assert len(lim) < 5
+
+
+def test_backend_gcra_is_shared(tmp_path: Path):
+    a = SQLiteStateBackend(str(tmp_path / "s.sqlite"))
+    b = SQLiteStateBackend(str(tmp_path / "s.sqlite"))
+    p = RatePolicy("t", limit=2, window_s=60)
+    assert a.gcra("rl:x", p.interval, p.tolerance) == 0.0
+    assert b.gcra("rl:x", p.interval, p.tolerance) == 0.0
+    assert a.gcra("rl:x", p.interval, p.tolerance) > 0.0
+    # Limiter state never invalidates shared-state caches
+    assert a.version() == 0
+    m = MemoryStateBackend()
+    assert m.gcra("k", 0.05, 0.0) == 0.0
+    assert m.gcra("k", 0.05, 0.0) > 0.0
+    time.sleep(0.06)
+    assert m.gcra("k", 0.05, 0.0) == 0.0
+
+
+def test_429_carries_retry_after(monkeypatch):
+    from intradyne.core.config import reload_settings
+
+    monkeypatch.setenv("AI_RATE_LIMIT_REQS", "1")
+    monkeypatch.setenv("AI_RATE_LIMIT_WINDOW", "60")
+    reload_settings()
+    try:
+        client = TestClient(app)
+        rs = [
+            client.get("/ai/status", headers={"x-forwarded-for": "10.9.9.9"})
+            for _ in range(2)
+        ]
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+    assert rs[0].status_code == 200
+    assert rs[1].status_code == 429
+    assert int(rs[1].headers["retry-after"]) >= 1
+    assert rs[1].json()["detail"]["max_requests"] == 1
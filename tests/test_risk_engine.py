@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+from src.risk.drawdown import RollingDrawdown
+from src.risk.guardrails import RiskMetricsEngine, dd_30d, historical_var
+from src.risk.var_limit import RollingVaR
+
+
+def test_rolling_drawdown_matches_full_recompute():
+    rng = random.Random(7)
+    dd = RollingDrawdown(timedelta(days=30))
+    t0 = datetime(2026, 1, 1)
+    eq = 100.0
+    for i in range(24 * 90):
+        ts = t0 + timedelta(hours=i)
+        eq *= 1 + rng.gauss(0, 0.01)
+        dd.update(ts, eq)
+        if i % 97 == 0:
+            assert abs(dd.value() - dd_30d(dd.series())) < 1e-12
+    assert dd.series()[0][0] >= ts - timedelta(days=30)
+
+
+def test_rolling_var_matches_historical_var():
+    rng = random.Random(3)
+    var = RollingVaR(maxlen=30)
+    rets = []
+    for _ in range(200):
+        r = rng.gauss(0, 0.02)
+        rets.append(r)
+        var.push(r)
+        for alpha in (0.95, 0.99):
+            assert var.value(alpha) == historical_var(rets[-30:], alpha)
+
+
+def test_engine_daily_returns_and_cached_reads():
+    eng = RiskMetricsEngine()
+    t0 = datetime(2026, 3, 1, 12)
+    for day, eq in enumerate([100.0, 110.0, 99.0, 104.0]):
+        eng.update_equity(t0 + timedelta(days=day), eq)
+        eng.update_equity(t0 + timedelta(days=day, hours=6), eq)
+    # The current (incomplete) day's return is pushed on the next day roll
+    assert [round(r, 6) for r in eng.equity_daily_returns_30d()] == [0.1, -0.1]
+    eng.update_equity(t0 + timedelta(days=4), 104.0)
+    rets = eng.equity_daily_returns_30d()
+    assert [round(r, 6) for r in rets] == [0.1, -0.1, round(104 / 99 - 1, 6)]
+    assert abs(eng.drawdown() - 0.1) < 1e-12
+    assert eng.var(0.95) == historical_var(rets, 0.95)
+
+
+def test_rolling_drawdown_expiry_is_exact_without_rescans():
+    rng = random.Random(11)
+    dd = RollingDrawdown(timedelta(hours=50))
+    t0 = datetime(2026, 1, 1)
+    eq = 100.0
+    for i in range(1000):
+        eq *= 1 + rng.gauss(0, 0.02)
+        dd.update(t0 + timedelta(hours=i), eq)
+        assert abs(dd.value() - dd_30d(dd.series())) < 1e-12
+        assert (
+            abs(dd.value_with(eq * 0.9) - dd_30d(dd.series() + [(t0, eq * 0.9)]))
+            < 1e-12
+        )
+    assert len(dd.series()) == 51
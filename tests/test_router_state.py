@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from app.broker_paper import PaperBroker
+from app.execution import ExecContext, ExecutionManager
+from app.ledger import ExplainabilityLedger
+from app.portfolio import Portfolio
+from app.risk import RiskManager
+from app.router import StrategyRouter
+
+
+def _router(tmp_path: Path) -> StrategyRouter:
+    pf = Portfolio()
+    ctx = ExecContext(
+        portfolio=pf,
+        paper=PaperBroker(pf, slippage_bps=0),
+        ledger=ExplainabilityLedger(path=str(tmp_path / "ledger.jsonl")),
+        whitelist=["BTC/USDT"],
+    )
+    risk = RiskManager(0.1, 0.01, 0.02, 0.5, 0.9, 0.9, 5, 3)
+    params = {"momentum": {"breakout_window": 2, "min_range_bps": 1}}
+    return StrategyRouter(["BTC/USDT"], risk, ExecutionManager(ctx), pf, params)
+
+
+def test_trade_state_created_on_entry_and_cleared_on_exit(tmp_path: Path):
+    router = _router(tmp_path)
+
+    async def feed(prices: list[float]) -> None:
+        for i, px in enumerate(prices):
+            l1 = {"symbol": "BTC/USDT", "bid": px, "ask": px, "last": px, "ts": i}
+            await router.on_tick(l1)
+
+    asyncio.run(feed([100.0, 101.0]))
+    st = router._state["BTC/USDT"]
+    assert st.trade is not None
+    assert st.trade.entry_price == 101.0
+    assert router.portfolio.get_position("BTC/USDT").base > 0
+
+    # Drop through the 1% stop: position flattened and trade record dropped
+    asyncio.run(feed([99.0]))
+    assert st.trade is None
+    assert router.portfolio.get_position("BTC/USDT").base == 0
+
+
+def test_concurrent_entries_respect_max_open_positions(tmp_path: Path):
+    syms = ["BTC/USDT", "ETH/USDT"]
+    pf = Portfolio()
+    ctx = ExecContext(
+        portfolio=pf,
+        paper=PaperBroker(pf, slippage_bps=0),
+        ledger=ExplainabilityLedger(path=str(tmp_path / "ledger.jsonl")),
+        whitelist=syms,
+    )
+    # At most one open position
+    risk = RiskManager(0.1, 0.01, 0.02, 0.5, 0.9, 0.9, 1, 3)
+    params = {"momentum": {"breakout_window": 2, "min_range_bps": 1}}
+    execman = ExecutionManager(ctx)
+    router = StrategyRouter(syms, risk, execman, pf, params)
+    submit = execman.submit_batch
+
+    async def slow_submit(orders, l1):
+        await asyncio.sleep(0.01)  # order in flight, not yet filled
+        return await submit(orders, l1)
+
+    execman.submit_batch = slow_submit  # type: ignore[method-assign]
+
+    def tick(sym: str, px: float, ts: float) -> dict:
+        return {"symbol": sym, "bid": px, "ask": px, "last": px, "ts": ts}
+
+    async def main() -> None:
+        for s in syms:
+            await router.on_tick(tick(s, 100.0, 0))
+        # Both symbols break out at once, as on two dispatcher shards
+        await asyncio.gather(*(router.on_tick(tick(s, 101.0, 1)) for s in syms))
+
+    asyncio.run(main())
+    held = [s for s in syms if pf.get_position(s).base > 0]
+    assert len(held) == 1
+    assert [s for s in syms if router._state[s].trade is not None] == held
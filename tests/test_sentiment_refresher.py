@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional
+
+from src.data.sentiment import SentimentRefresher
+
+
+def test_scores_are_smoothed_over_last_n():
+    r = SentimentRefresher(smooth_n=3)
+    assert r.score == 0.0 and r.latest[1] == 0.0
+    assert r.push(0.6) == 0.6
+    r.push(0.0)
+    r.push(-0.3)
+    assert abs(r.score - 0.1) < 1e-12
+    r.push(0.9)  # oldest reading (0.6) leaves the window
+    assert abs(r.score - 0.2) < 1e-12
+    assert r.latest[1] > 0
+
+
+def test_background_task_fetches_on_its_own_schedule():
+    readings: List[Optional[float]] = [0.4, None, 0.8]
+    calls = 0
+
+    async def fetch() -> Optional[float]:
+        nonlocal calls
+        calls += 1
+        return readings[min(calls, len(readings)) - 1]
+
+    async def main():
+        r = SentimentRefresher(fetch=fetch, smooth_n=2)
+        r.interval_s = 0.01  # below the 1 s production floor
+        r.start()
+        while calls < 3:
+            await asyncio.sleep(0.005)
+        await r.stop()
+        return r
+
+    r = asyncio.run(main())
+    # The failed fetch kept the last value; smoothing covers 0.4 and 0.8
+    assert abs(r.score - 0.6) < 1e-12
+    assert r._task is None
+
+
+def test_router_read_never_fetches(monkeypatch):
+    import src.data.sentiment as sentiment
+
+    async def boom():  # pragma: no cover - must not be called
+        raise AssertionError("network fetch on the read path")
+
+    monkeypatch.setenv("SENTIMENT_FETCH", "1")
+    monkeypatch.setattr(sentiment, "_REFRESHER", SentimentRefresher(fetch=boom))
+    sentiment.get_sentiment_refresher().push(0.5)
+    assert sentiment.get_sentiment_score_cached() == 0.5
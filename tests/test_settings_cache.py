@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from intradyne.api.app import app
+from intradyne.core.config import get_settings, reload_settings, settings_version
+
+
+client = TestClient(app)
+
+
+def test_snapshot_is_cached_until_reload(monkeypatch):
+    s1 = get_settings()
+    v1 = settings_version()
+    assert get_settings() is s1
+    monkeypatch.setenv("RATE_LIMIT_REQS", "7")
+    # Env changes are not picked up until an explicit reload
+    assert get_settings() is s1
+    s2 = reload_settings()
+    try:
+        assert settings_version() == v1 + 1
+        assert get_settings() is s2
+        assert s2.RATE_LIMIT_REQS == 7
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+
+
+def test_failed_reload_keeps_previous_snapshot(monkeypatch):
+    import src.core.config as cfg
+
+    s1 = get_settings()
+    v1 = settings_version()
+
+    def _boom():
+        raise RuntimeError("Missing required credentials in production")
+
+    monkeypatch.setattr(cfg, "load_settings", _boom)
+    try:
+        reload_settings()
+    except RuntimeError:
+        pass
+    assert get_settings() is s1
+    assert settings_version() == v1
+
+
+def test_limiter_follows_reloaded_settings(monkeypatch):
+    from src.intradyne.api import ratelimit
+
+    monkeypatch.setenv("AI_RATE_LIMIT_REQS", "3")
+    monkeypatch.setenv("AI_RATE_LIMIT_WINDOW", "30")
+    try:
+        reload_settings()
+        ai = ratelimit._limits()["ai"]
+        assert (ai.limit, ai.window_s) == (3, 30)
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+    assert ratelimit._limits()["ai"] is not ai
+
+
+def test_admin_reload_endpoint_bumps_version(monkeypatch, tmp_path):
+    monkeypatch.delenv("ADMIN_SECRET", raising=False)
+    # The reload picks this up, so the audit records land in tmp_path
+    monkeypatch.setenv("EXPLAIN_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    try:
+        v1 = client.get("/admin/settings/version").json()["version"]
+        r = client.post("/admin/settings/reload")
+        assert r.status_code == 200
+        assert r.json()["version"] == v1 + 1
+        monkeypatch.setenv("ADMIN_SECRET", "s3cret")
+        assert client.post("/admin/settings/reload").status_code == 401
+        r = client.post("/admin/settings/reload", headers={"X-Admin-Secret": "s3cret"})
+        assert r.status_code == 200
+        lines = (tmp_path / "ledger.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+
+
+def test_guardrails_follow_reloaded_thresholds(monkeypatch, tmp_path):
+    from intradyne.api.deps import get_guardrails
+
+    monkeypatch.setenv("EXPLAIN_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    monkeypatch.setenv("KILL_SWITCH_BREACHES", "7")
+    try:
+        reload_settings()
+        gr = get_guardrails()
+        assert gr.ledger.path == str(tmp_path / "ledger.jsonl")
+        assert gr.th["kill_switch"] == 7
+        gr.breaches.record("compliance", "block")
+        monkeypatch.setenv("KILL_SWITCH_BREACHES", "9")
+        monkeypatch.setenv("VAR_1D_MAX", "0.2")
+        reload_settings()
+        # Re-thresholded in place: the breach counter is kept
+        assert get_guardrails() is gr
+        assert (gr.th["kill_switch"], gr.th["var_max"]) == (9, 0.2)
+        assert gr.breaches.count("24h") == 1
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+    assert get_guardrails() is not gr
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from src.core.ledger import Ledger
+from src.core.state import MemoryStateBackend, SharedState, SQLiteStateBackend
+from src.risk.guardrails import Guardrails, OrderReq
+
+
+def test_sqlite_backend_shares_flags_between_workers(tmp_path: Path):
+    path = str(tmp_path / "state.sqlite")
+    a = SharedState(SQLiteStateBackend(path))
+    b = SharedState(SQLiteStateBackend(path))
+
+    assert b.get_flag("halt") is False
+    a.set_flag("halt", True)
+    assert b.get_flag("halt") is True
+    assert a.get_flag("halt") is True
+
+    # Counter writes do not invalidate flag caches
+    v = b.backend.version()
+    assert a.backend.incr("rl:x", ttl=60) == 1
+    assert b.backend.incr("rl:x", ttl=60) == 2
+    assert b.backend.version() == v
+
+    assert a.bump("breaches") == 1
+    assert b.seq("breaches") == 1
+
+
+def test_incr_ttl_restarts_expired_counter(tmp_path: Path):
+    for backend in (MemoryStateBackend(), SQLiteStateBackend(str(tmp_path / "s.db"))):
+        assert backend.incr("k", ttl=0.05) == 1
+        assert backend.incr("k", ttl=0.05) == 2
+        time.sleep(0.08)
+        assert backend.incr("k", ttl=0.05) == 1
+
+
+def test_guardrails_pick_up_breaches_from_other_workers(tmp_path: Path, stub_feed):
+    ledger_path = str(tmp_path / "ledger.jsonl")
+    state_path = str(tmp_path / "state.sqlite")
+    stub = stub_feed
+
+    def worker() -> Guardrails:
+        return Guardrails(
+            stub,
+            stub,
+            ledger=Ledger(path=ledger_path),
+            thresholds={"kill_switch": 2},
+            state=SharedState(SQLiteStateBackend(state_path)),
+        )
+
+    a, b = worker(), worker()
+    a._breach("compliance", action="block")
+    a._breach("compliance", action="block")
+    assert a.sync_breaches().count("24h") == 2
+    assert b.sync_breaches().count("24h") == 2
+
+    # Kill switch disabled through shared state on another worker
+    a.state.set_flag("kill_switch", False)
+    assert b.gate_trade(OrderReq("BTC/USDT", "buy", 1.0))[0] == "allow"
+    a.state.set_flag("kill_switch", True)
+    assert b.gate_trade(OrderReq("BTC/USDT", "buy", 1.0))[0] == "halt"
+
+
+def test_pending_breaches_are_announced_after_the_ledger_commit(
+    tmp_path: Path, stub_feed
+):
+    ledger_path = str(tmp_path / "ledger.jsonl")
+    state_path = str(tmp_path / "state.sqlite")
+    stub = stub_feed
+
+    def worker() -> Guardrails:
+        return Guardrails(
+            stub,
+            stub,
+            ledger=Ledger(path=ledger_path),
+            state=SharedState(SQLiteStateBackend(state_path)),
+        )
+
+    a, b = worker(), worker()
+    pending: list = []
+    a._breach("compliance", pending, action="block")
+    # Not yet in the ledger: neither counted nor announced
+    assert a.state.seq("breaches") == 0
+    assert a.breaches.count("24h") == 0
+    # Another worker's breach forces a rebuild on `a` meanwhile
+    b._breach("compliance", action="block")
+    assert a.sync_breaches().count("24h") == 1
+    a.commit(pending)
+    assert a.sync_breaches().count("24h") == 2
+    assert b.sync_breaches().count("24h") == 2
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.tickrec import RECORD_BYTES, TickRecorder, TickReplay
+
+DAY = pd.Timestamp("2024-03-01", tz="UTC").timestamp()
+
+
+def _ticks(n: int, t0: float = DAY, step: float = 0.5) -> list:
+    syms = ["BTC/USDT", "ETH/USDT"]
+    return [
+        {
+            "ts": t0 + i * step,
+            "symbol": syms[i % 2],
+            "bid": 100.0 + i,
+            "ask": 100.5 + i,
+            "last": 100.25 + i,
+            "volume": 1000.0 + i,
+        }
+        for i in range(n)
+    ]
+
+
+def test_round_trip_chunked_compressed_per_day(tmp_path: Path):
+    rec = TickRecorder(tmp_path, chunk_records=100, flush_s=3600)
+    ticks = _ticks(250) + _ticks(10, t0=DAY + 86_400)
+    ticks[3]["bid"] = None
+    for t in ticks:
+        rec.record(t)
+    rec.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "2024-03-01.ticks",
+        "2024-03-02.ticks",
+    ]
+    assert rec.records == 260
+    assert rec.bytes_written < 260 * RECORD_BYTES
+    out = list(TickReplay(tmp_path))
+    assert out == ticks
+    assert out[3]["bid"] is None
+
+
+def test_filters_and_damaged_tail(tmp_path: Path):
+    rec = TickRecorder(tmp_path, chunk_records=50, flush_s=3600)
+    for t in _ticks(200):
+        rec.record(t)
+    rec.close()
+    path = tmp_path / "2024-03-01.ticks"
+    # A crash mid-write leaves a partial frame: replay stops before it
+    path.write_bytes(path.read_bytes()[:-10])
+    start_ms = int((DAY + 10) * 1000)
+    out = list(TickReplay(tmp_path, symbols=["ETH/USDT"], start_ms=start_ms))
+    assert {t["symbol"] for t in out} == {"ETH/USDT"}
+    assert out[0]["ts"] == DAY + 10.5
+    assert out[-1]["ts"] == DAY + 74.5  # last ETH tick in the first 3 chunks
+
+
+def test_stream_pacing(tmp_path: Path):
+    rec = TickRecorder(tmp_path)
+    for t in _ticks(11, step=0.02):  # 0.2 s of recorded time
+        rec.record(t)
+    rec.close()
+    replay = TickReplay(tmp_path)
+
+    async def drain(speed: float) -> float:
+        t = time.monotonic()
+        n = 0
+        async for _ in replay.stream(speed):
+            n += 1
+        assert n == 11
+        return time.monotonic() - t
+
+    assert asyncio.run(drain(1.0)) >= 0.19
+    assert asyncio.run(drain(0.0)) < 0.1
+
+
+def test_backtest_replays_recorded_ticks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    from app.backtest import run as run_backtest
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path / "data"))
+    rec = TickRecorder(tmp_path / "ticks")
+    prices = [100.0] * 5 + [101.0] * 5 + [98.0] * 5
+    for i, p in enumerate(prices):
+        rec.record(
+            {"ts": DAY + i * 60, "symbol": "BTC/USDT", "last": p, "bid": p, "ask": p}
+        )
+    rec.close()
+    res = run_backtest(
+        ["BTC/USDT"],
+        int(DAY * 1000),
+        int((DAY + 900) * 1000),
+        "1m",
+        "momentum",
+        {"momentum": {"breakout_window": 2, "min_range_bps": 1}},
+        2,
+        5,
+        2,
+        seed=7,
+        out_dir=tmp_path / "out",
+        ticks_dir=tmp_path / "ticks",
+    )
+    assert isinstance(res.metrics.get("final_equity"), float)
+    assert res.metrics["trades"] > 0
+
+
+def test_tick_backtest_skips_quote_only_ticks_and_annualizes_by_spacing(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    import app.backtest as bt
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path / "data"))
+    rec = TickRecorder(tmp_path / "ticks")
+    for i in range(20):
+        p = 100.0 + (i % 3)
+        # Every fifth tick is a quote update without a trade price
+        last = None if i % 5 == 4 else p
+        rec.record(
+            {"ts": DAY + i * 2, "symbol": "BTC/USDT", "last": last, "bid": p, "ask": p}
+        )
+    rec.close()
+    steps: list = []
+    real = bt._annualization_factor
+    monkeypatch.setattr(
+        bt, "_annualization_factor", lambda s: steps.append(s) or real(s)
+    )
+    res = bt.run(
+        ["BTC/USDT"],
+        int(DAY * 1000),
+        int((DAY + 60) * 1000),
+        "1h",
+        "momentum",
+        {},
+        2,
+        5,
+        2,
+        seed=7,
+        out_dir=tmp_path / "out",
+        ticks_dir=tmp_path / "ticks",
+    )
+    assert isinstance(res.metrics.get("final_equity"), float)
+    # 16 priced ticks over 36 s, not one-hour bars
+    assert steps == [pytest.approx(36 / 15)]
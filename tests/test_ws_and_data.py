@@ -34,3 +34,26 @@ def test_ws_ticks_mock_stream():
         assert "ticks" in msg
         assert isinstance(msg["ticks"], list)
         assert len(msg["ticks"]) >= 1
+
+
+def test_guardrails_see_whitelist_prices_without_clients(monkeypatch):
+    import time
+
+    from intradyne.api.deps import get_guardrails
+    from src.data import price_hub
+    from src.data.price_history import get_price_history
+
+    async def upstream(symbols):
+        return {s: 42.0 for s in symbols}
+
+    hub = price_hub.PriceHub(upstream, history=get_price_history())
+    monkeypatch.setitem(price_hub._HUBS, "live", hub)
+    feed = get_guardrails().price
+    # Startup subscribes the whitelist; no /data/price or /ws/ticks call
+    with TestClient(app):
+        deadline = time.monotonic() + 5.0
+        while feed.get_price("DOT/USDT") is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert feed.get_price("DOT/USDT") == 42.0
+        assert hub.subscribers == 1
+    assert hub.subscribers == 0